@@ -1,12 +1,11 @@
 import streamlit as st
 import pandas as pd
-import tempfile
 import os
-from extrator_ofx import ExtratorOFX
-from categorizador_despesas import CategorizadorDespesas
-from gerenciador_persistencia_unificado import GerenciadorPersistenciaUnificado
-from categorizador_receitas_simples import CategorizadorReceitasSimples
-from estilo_unificado import aplicar_estilo_pagina, card_categoria, metrica_customizada
+from extrator_ofx import montar_lote_colunar, formatar_datas, ConteudoOFX
+from dinheiro import COLUNA_CENTAVOS, centavos_para_reais
+from ingestao_lote import ProcessadorLoteOFX
+from cache_ofx import CacheOFX
+from estilo_unificado import aplicar_estilo_pagina
 
 LOGO_PATH = os.path.join(os.path.dirname(__file__), "logo_humaniza.png")
 
@@ -126,31 +125,51 @@ def pagina_dashboard():
     st.title("📊 Dashboard - Análise de Extrato")
     st.markdown("**Faça upload de um arquivo OFX para análise completa dos dados bancários**")
     
-    # Upload de arquivo
-    uploaded_file = st.file_uploader("Escolha um arquivo OFX", type=['ofx'])
+    # Upload de arquivos (exportações parciais: Parte1, Parte2, ...)
+    uploaded_files = st.file_uploader("Escolha um ou mais arquivos OFX (ou .zip/.gz de extratos)", type=['ofx', 'zip', 'gz'], accept_multiple_files=True)
     
-    if uploaded_file:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.ofx') as tmp:
-            tmp.write(uploaded_file.getvalue())
-            tmp_path = tmp.name
+    if uploaded_files:
+        nome_origem = ', '.join(f.name for f in uploaded_files)
+        nome_download = uploaded_files[0].name.replace('.ofx', '') if len(uploaded_files) == 1 else 'lote'
+        
+        # Conteúdo lido direto da memória (sem arquivos temporários); o nome
+        # original mantém a ordem natural das partes
+        fontes = [ConteudoOFX(os.path.basename(f.name), f.getvalue()) for f in uploaded_files]
         
         try:
-            with st.spinner('Processando arquivo OFX...'):
-                # Extrair dados
-                extrator = ExtratorOFX()
-                transacoes = extrator.processar_arquivo(tmp_path)
-                stats = extrator.obter_estatisticas_filtros()
+            with st.spinner(f'Processando {len(uploaded_files)} arquivo(s) OFX...'):
+                # Extrair dados (arquivos processados em paralelo, em threads:
+                # nenhum pool de processos é criado a cada rerun)
+                lote = ProcessadorLoteOFX(cache=CacheOFX(), usar_processos=False).processar(fontes)
+                # Lote colunar compacto (datas datetime64, colunas categóricas)
+                df = montar_lote_colunar(lote.pop('transacoes'))
+                stats = {
+                    'transacoes_validas': len(df),
+                    'transacoes_filtradas': len(lote['transacoes_filtradas']),
+                    'detalhes_filtradas': lote['transacoes_filtradas']
+                }
+            
+            for erro in lote['erros']:
+                st.error(f"Erro ao processar {erro['arquivo']}: {erro['erro']}")
+            for aviso in lote['avisos']:
+                st.warning(f"⚠️ {aviso['arquivo']}: {aviso['aviso']}")
             
-            if transacoes:
+            if len(lote['por_arquivo']) > 1:
+                with st.expander(f"📂 {len(lote['por_arquivo'])} arquivos processados em {lote['tempo_total']:.1f}s"):
+                    st.dataframe(pd.DataFrame(lote['por_arquivo']), use_container_width=True, hide_index=True)
+            
+            if not df.empty:
                 # Informações sobre filtros aplicados
                 if stats['transacoes_filtradas'] > 0:
                     st.info(f"ℹ️ **{stats['transacoes_filtradas']} lançamentos informativos** foram filtrados e não aparecem nos cálculos")
                 
                 # Calcular valores
-                creditos = [t for t in transacoes if t['Valor'] > 0]
-                debitos = [t for t in transacoes if t['Valor'] < 0]
-                total_creditos = sum(t['Valor'] for t in creditos)
-                total_debitos = sum(t['Valor'] for t in debitos)
+                mascara_creditos = df['Valor'] > 0
+                mascara_debitos = df['Valor'] < 0
+                qtd_creditos = int(mascara_creditos.sum())
+                qtd_debitos = int(mascara_debitos.sum())
+                total_creditos = centavos_para_reais(int(df.loc[mascara_creditos, COLUNA_CENTAVOS].sum()))
+                total_debitos = centavos_para_reais(int(df.loc[mascara_debitos, COLUNA_CENTAVOS].sum()))
                 saldo = total_creditos + total_debitos
                 
                 # Resumo com layout personalizado
@@ -159,14 +178,14 @@ def pagina_dashboard():
                 col1, col2, col3, col4 = st.columns(4)
                 
                 with col1:
-                    st.metric("Transações Válidas", len(transacoes))
+                    st.metric("Transações Válidas", len(df))
                 
                 with col2:
                     # Créditos com estilo personalizado
                     st.markdown(f"""
                     <div class="metric-credito">
                         <div class="metric-label">💰 Créditos</div>
-                        <div class="metric-value">{len(creditos)} transações</div>
+                        <div class="metric-value">{qtd_creditos} transações</div>
                         <div class="metric-value">↗️ R$ {total_creditos:,.2f}</div>
                     </div>
                     """, unsafe_allow_html=True)
@@ -177,7 +196,7 @@ def pagina_dashboard():
                     st.markdown(f"""
                     <div class="metric-debito">
                         <div class="metric-label">💸 Débitos</div>
-                        <div class="metric-value">{len(debitos)} transações</div>
+                        <div class="metric-value">{qtd_debitos} transações</div>
                         <div class="metric-value">↘️ R$ {valor_absoluto_debitos:,.2f}</div>
                     </div>
                     """, unsafe_allow_html=True)
@@ -239,9 +258,7 @@ def pagina_dashboard():
                 
                 with col2:
                     st.subheader("Transações por Data")
-                    df = pd.DataFrame(transacoes)
-                    df['Data_obj'] = pd.to_datetime(df['Data'], format='%d/%m/%Y')
-                    transacoes_por_data = df.groupby('Data_obj').size()
+                    transacoes_por_data = df.groupby('Data').size()
                     st.line_chart(transacoes_por_data)
                 
                 # Análise adicional
@@ -251,8 +268,9 @@ def pagina_dashboard():
                 
                 with col1:
                     st.subheader("Maiores Créditos")
-                    if creditos:
-                        maiores_creditos = df[df['Valor'] > 0].nlargest(5, 'Valor')[['Data', 'Razao Social', 'Valor']]
+                    if qtd_creditos:
+                        maiores_creditos = df[mascara_creditos].nlargest(5, 'Valor')[['Data', 'Razao Social', 'Valor']]
+                        maiores_creditos['Data'] = formatar_datas(maiores_creditos['Data'])
                         maiores_creditos['Valor'] = maiores_creditos['Valor'].apply(lambda x: f"R$ {x:,.2f}")
                         st.dataframe(maiores_creditos, hide_index=True)
                     else:
@@ -260,8 +278,9 @@ def pagina_dashboard():
                 
                 with col2:
                     st.subheader("Maiores Débitos")
-                    if debitos:
-                        maiores_debitos = df[df['Valor'] < 0].nsmallest(5, 'Valor')[['Data', 'Razao Social', 'Valor']]
+                    if qtd_debitos:
+                        maiores_debitos = df[mascara_debitos].nsmallest(5, 'Valor')[['Data', 'Razao Social', 'Valor']]
+                        maiores_debitos['Data'] = formatar_datas(maiores_debitos['Data'])
                         maiores_debitos['Valor'] = maiores_debitos['Valor'].apply(lambda x: f"R$ {x:,.2f}")
                         st.dataframe(maiores_debitos, hide_index=True)
                     else:
@@ -280,7 +299,7 @@ def pagina_dashboard():
                     valor_min = st.number_input("Valor mínimo (R$):", min_value=0.0, value=0.0, step=10.0)
                 
                 # Aplicar filtros
-                df_filtrado = df.copy()
+                df_filtrado = df
                 
                 if tipo_filtro != "Todos":
                     df_filtrado = df_filtrado[df_filtrado['Tipo'] == tipo_filtro]
@@ -290,6 +309,7 @@ def pagina_dashboard():
                 
                 # Formatar valores para exibição
                 df_display = df_filtrado.copy()
+                df_display['Data'] = formatar_datas(df_display['Data'])
                 df_display['Valor'] = df_display['Valor'].apply(lambda x: f"R$ {x:,.2f}")
                 
                 st.dataframe(df_display, use_container_width=True, hide_index=True)
@@ -301,11 +321,11 @@ def pagina_dashboard():
                 
                 with col1:
                     # CSV das transações válidas
-                    csv_data = df.to_csv(index=False, encoding='utf-8')
+                    csv_data = df.assign(Data=formatar_datas(df['Data'])).to_csv(index=False, encoding='utf-8')
                     st.download_button(
                         label="📥 Baixar Transações Válidas (CSV)",
                         data=csv_data,
-                        file_name=f"extrato_valido_{uploaded_file.name.replace('.ofx', '')}.csv",
+                        file_name=f"extrato_valido_{nome_download}.csv",
                         mime="text/csv"
                     )
                 
@@ -316,16 +336,16 @@ def pagina_dashboard():
                     with col2a:
                         if st.button("🏷️ Ir para Despesas", type="primary"):
                             # Salvar dados na sessão para usar na página de despesas
-                            st.session_state.transacoes_processadas = transacoes
-                            st.session_state.arquivo_origem = uploaded_file.name
+                            st.session_state.transacoes_processadas = df
+                            st.session_state.arquivo_origem = nome_origem
                             st.session_state.pagina_atual = "despesas"
                             st.rerun()
                     
                     with col2b:
                         if st.button("💰 Ir para Receitas", type="primary"):
                             # Salvar dados na sessão para usar na página de receitas
-                            st.session_state.transacoes_processadas = transacoes
-                            st.session_state.arquivo_origem = uploaded_file.name
+                            st.session_state.transacoes_processadas = df
+                            st.session_state.arquivo_origem = nome_origem
                             st.session_state.pagina_atual = "receitas"
                             st.rerun()
                 
@@ -338,7 +358,8 @@ def pagina_dashboard():
                             {
                                 'Descrição': item['memo'],
                                 'Valor': f"R$ {item['valor']:,.2f}",
-                                'Motivo': item['motivo']
+                                'Motivo': item['motivo'],
+                                'Filtro': item.get('padrao', '')
                             }
                             for item in stats['detalhes_filtradas']
                         ])
@@ -352,16 +373,12 @@ def pagina_dashboard():
         except Exception as e:
             st.error(f"Erro ao processar arquivo: {str(e)}")
             st.info("Tente novamente com um arquivo OFX válido.")
-            
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
     
     else:
         st.info("""
         👆 **Como usar o Dashboard:**
         
-        1. Faça upload de um arquivo OFX do seu banco
+        1. Faça upload de um ou mais arquivos OFX do seu banco
         2. Aguarde o processamento automático  
         3. Visualize a análise completa dos dados
         4. Use os filtros para explorar as transações
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do IndiceTrigramas (casamento_aproximado): construção incremental
+do índice e tempo por busca, comparando o resultado com a busca exaustiva
+(Dice contra todos os pagadores).
+
+Uso:
+    python benchmark_aproximado.py [quantidade_pagadores] [quantidade_buscas]
+"""
+
+import sys
+import time
+import random
+
+from casamento_aproximado import MARGEM_AMBIGUIDADE, IndiceTrigramas, normalizar_nome, trigramas
+
+NOMES = ['MARIA', 'JOSE', 'ANA', 'CARLOS', 'PAULA', 'RICARDO', 'FERNANDA', 'LUCAS',
+         'BEATRIZ', 'RAFAELA', 'GISELE', 'FILIPE', 'CAISSA', 'MARCOS', 'JULIANA',
+         'NATÁLIA', 'LETÍCIA', 'JOÃO', 'GILBERTO', 'ADRIANA', 'LORRAN', 'APARECIDA']
+SOBRENOMES = ['SILVA', 'SOUZA', 'OLIVEIRA', 'PEREIRA', 'COSTA', 'RIBEIRO', 'MAGALHÃES',
+              'FRANÇA', 'CUNHA', 'MATTOS', 'RICART', 'MENDONÇA', 'CONCEIÇÃO', 'ALMEIDA',
+              'GOHN', 'ALVES', 'MORAES', 'SARENTO', 'VAZ', 'SANTOS', 'RODRIGUES']
+# Sílabas dos sobrenomes inventados (consoante + vogal)
+SILABAS = [consoante + vogal for consoante in 'BCDFGJLMNPRSTVZ' for vogal in 'AEIOU']
+PREFIXOS = ['', '', 'PIX RECEBIDO ', 'TED ', 'DOC ']
+
+
+def gerar_pagadores(quantidade, aleatorio):
+    """Nomes distintos de pagadores (nome, sobrenome, sobrenome inventado)."""
+    pagadores = {}
+    while len(pagadores) < quantidade:
+        inventado = ''.join(aleatorio.choice(SILABAS) for _ in range(aleatorio.randint(2, 4)))
+        nome = f'{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)} {inventado}'
+        pagadores[nome] = f'PACIENTE {len(pagadores):05d}'
+    return pagadores
+
+
+def variar(nome, aleatorio):
+    """Outra grafia do mesmo pagador: prefixo, letra trocada ou sobrenome a mais."""
+    letras = list(nome)
+    if aleatorio.random() < 0.5:
+        posicao = aleatorio.randrange(len(letras))
+        letras[posicao] = aleatorio.choice('ABCDEFGHIJLMNOPRSTUVZ')
+    variante = ''.join(letras)
+    if aleatorio.random() < 0.3:
+        variante = f'{variante} {aleatorio.choice(SOBRENOMES)}'
+    return f'{aleatorio.choice(PREFIXOS)}{variante}'
+
+
+def buscar_exaustivo(pagadores, texto, limiar):
+    """Mesmo critério de IndiceTrigramas.buscar, comparando com todos os pagadores (referência)."""
+    consulta = trigramas(normalizar_nome(texto))
+    pontuados = []
+    for nome, paciente in pagadores.items():
+        grupo = trigramas(normalizar_nome(nome))
+        pontuacao = 2 * len(consulta & grupo) / (len(consulta) + len(grupo))
+        if pontuacao >= limiar:
+            pontuados.append((pontuacao, paciente))
+    if not pontuados:
+        return None
+
+    pontuados.sort(key=lambda item: -item[0])
+    melhor_pontuacao, melhor = pontuados[0]
+    if any(paciente != melhor and pontuacao >= melhor_pontuacao - MARGEM_AMBIGUIDADE
+           for pontuacao, paciente in pontuados[1:]):
+        return None
+    return melhor, melhor_pontuacao
+
+
+if __name__ == "__main__":
+    quantidade_pagadores = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    quantidade_buscas = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+
+    print("=" * 80)
+    print(f"BENCHMARK: IndiceTrigramas com {quantidade_pagadores:,} pagadores × "
+          f"{quantidade_buscas:,} buscas")
+    print("=" * 80 + "\n")
+
+    aleatorio = random.Random(42)
+    pagadores = gerar_pagadores(quantidade_pagadores, aleatorio)
+    nomes = list(pagadores)
+
+    indice = IndiceTrigramas()
+    inicio = time.perf_counter()
+    for nome, paciente in pagadores.items():
+        indice.adicionar(nome, paciente)
+    duracao_construcao = time.perf_counter() - inicio
+
+    # Metade das buscas é outra grafia de um pagador conhecido, metade é desconhecida
+    buscas = []
+    for _ in range(quantidade_buscas):
+        if aleatorio.random() < 0.5:
+            buscas.append(variar(aleatorio.choice(nomes), aleatorio))
+        else:
+            buscas.append(f'{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)} LTDA')
+
+    tempos = []
+    resultados = []
+    for texto in buscas:
+        inicio = time.perf_counter()
+        resultados.append(indice.buscar(texto))
+        tempos.append(time.perf_counter() - inicio)
+    tempos.sort()
+
+    print(f"Construção incremental: {duracao_construcao:.3f}s "
+          f"({duracao_construcao / quantidade_pagadores * 1e6:.1f} µs por pagador)\n")
+    print(f"{'Busca':<12}{'Tempo (ms)':>12}")
+    print(f"{'Média':<12}{sum(tempos) / len(tempos) * 1e3:>12.3f}")
+    print(f"{'Mediana':<12}{tempos[len(tempos) // 2] * 1e3:>12.3f}")
+    print(f"{'p99':<12}{tempos[int(len(tempos) * 0.99)] * 1e3:>12.3f}")
+    print(f"{'Máximo':<12}{tempos[-1] * 1e3:>12.3f}")
+
+    casadas = sum(resultado is not None for resultado in resultados)
+    print(f"\nBuscas com pagador acima do limiar: {casadas:,} de {quantidade_buscas:,}")
+
+    # Conferência contra a busca exaustiva numa amostra
+    amostra = aleatorio.sample(range(quantidade_buscas), min(200, quantidade_buscas))
+    divergentes = 0
+    for i in amostra:
+        referencia = buscar_exaustivo(pagadores, buscas[i], indice.limiar)
+        obtido = (resultados[i][0], resultados[i][2]) if resultados[i] else None
+        if (referencia is None) != (obtido is None) or \
+                (referencia and (referencia[0] != obtido[0] or abs(referencia[1] - obtido[1]) > 1e-9)):
+            divergentes += 1
+    print(f"Idêntico à busca exaustiva (amostra de {len(amostra)}): "
+          f"{'sim' if not divergentes else f'NÃO ({divergentes} divergentes)'}")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do CategorizadorDespesas: laço aninhado sobre regras × palavras
+(versão original) contra o autômato Aho-Corasick de casamento_padroes, e
+processar_debitos linha a linha contra o lote vetorizado.
+
+Uso:
+    python benchmark_categorizador.py [quantidade_regras] [quantidade_debitos]
+"""
+
+import sys
+import time
+import random
+from datetime import datetime
+
+import pandas as pd
+
+from categorizador_despesas import CategorizadorDespesas
+from extrator_ofx import montar_lote_colunar
+
+NOMES = ['MARIA', 'JOSE', 'ANA', 'CARLOS', 'PAULA', 'RICARDO', 'FERNANDA', 'LUCAS',
+         'BEATRIZ', 'RAFAELA', 'GISELE', 'FILIPE', 'CAISSA', 'MARCOS', 'JULIANA']
+SOBRENOMES = ['SILVA', 'SOUZA', 'OLIVEIRA', 'PEREIRA', 'COSTA', 'RIBEIRO', 'MAGALHAES',
+              'FRANCA', 'CUNHA', 'MATTOS', 'RICART', 'MENDONCA', 'CONCEICAO', 'ALMEIDA']
+SUFIXOS = ['LTDA', 'S A', 'ME', 'EIRELI', 'SERVICOS', 'COMERCIO', 'PAGAMENTOS']
+
+# Pagadores recorrentes no lote de processar_debitos (os mesmos todo mês)
+QUANTIDADE_PAGADORES = 2_000
+
+
+def gerar_regras(quantidade, aleatorio):
+    """Regras sintéticas: quantidade categorias com 1 a 3 fornecedores cada."""
+    regras = {}
+    for i in range(quantidade):
+        regras[f'Categoria {i:04d}'] = [
+            f'{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)} {i}{j}'
+            for j in range(aleatorio.randint(1, 3))
+        ]
+    return regras
+
+
+def gerar_razoes(quantidade, regras, aleatorio):
+    """Razões sociais de débitos: metade cita um fornecedor das regras."""
+    palavras = [palavra for lista in regras.values() for palavra in lista]
+    razoes = []
+    for _ in range(quantidade):
+        nome = f'{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)} {aleatorio.choice(SUFIXOS)}'
+        if aleatorio.random() < 0.5:
+            nome = f'{nome} {aleatorio.choice(palavras).lower()}'
+        razoes.append(nome)
+    return razoes
+
+
+def categorizar_legado(regras, razao_social):
+    """Reprodução do categorizar_despesa original (laço aninhado)."""
+    if not razao_social:
+        return 'Diversos'
+    razao_upper = razao_social.upper().strip()
+    for categoria, palavras_chave in regras.items():
+        for palavra in palavras_chave:
+            if palavra.upper() in razao_upper:
+                return categoria
+    return 'Diversos'
+
+
+def gerar_transacoes(razoes, aleatorio):
+    """Débitos no formato de ExtratorOFX.processar_arquivo, com pagadores recorrentes."""
+    recorrentes = razoes[:QUANTIDADE_PAGADORES]
+    return [
+        {
+            'Data': f'{aleatorio.randint(1, 28):02d}/{aleatorio.randint(1, 12):02d}/2025',
+            'Razao Social': aleatorio.choice(recorrentes),
+            'Valor': -aleatorio.randint(1, 500000) / 100,
+            'FITID': str(i)
+        }
+        for i in range(len(razoes))
+    ]
+
+
+def processar_debitos_legado(categorizador, transacoes):
+    """Reprodução do processar_debitos original (um dict e um carimbo por linha)."""
+    despesas = []
+    for transacao in transacoes:
+        if transacao['Valor'] < 0:
+            despesas.append({
+                'Data': transacao['Data'],
+                'Descricao': categorizador.categorizar_despesa(transacao['Razao Social']),
+                'Valor': abs(transacao['Valor']),
+                'Razao_Social_Original': transacao['Razao Social'],
+                'Data_Processamento': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+                'FITID': transacao.get('FITID', '')
+            })
+    return pd.DataFrame(despesas)
+
+
+def medir(funcao, razoes):
+    inicio = time.perf_counter()
+    categorias = [funcao(razao) for razao in razoes]
+    return time.perf_counter() - inicio, categorias
+
+
+if __name__ == "__main__":
+    quantidade_regras = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    quantidade_debitos = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+
+    print("=" * 80)
+    print(f"BENCHMARK: CategorizadorDespesas com {quantidade_regras:,} regras × "
+          f"{quantidade_debitos:,} débitos")
+    print("=" * 80 + "\n")
+
+    aleatorio = random.Random(42)
+    regras = gerar_regras(quantidade_regras, aleatorio)
+    razoes = gerar_razoes(quantidade_debitos, regras, aleatorio)
+
+    categorizador = CategorizadorDespesas()
+    categorizador.regras_categorizacao = regras
+    inicio = time.perf_counter()
+    categorizador.recompilar_regras()
+    duracao_compilacao = time.perf_counter() - inicio
+
+    duracao_legado, categorias_legado = medir(lambda razao: categorizar_legado(regras, razao), razoes)
+    duracao_atual, categorias_atual = medir(categorizador.categorizar_despesa, razoes)
+
+    print(f"Compilação do autômato: {duracao_compilacao:.3f}s\n")
+    print(f"{'Versão':<12}{'Tempo (s)':>12}{'Débitos/s':>16}")
+    print(f"{'Antes':<12}{duracao_legado:>12.2f}{quantidade_debitos / duracao_legado:>16,.0f}")
+    print(f"{'Depois':<12}{duracao_atual:>12.2f}{quantidade_debitos / duracao_atual:>16,.0f}")
+    print(f"\nGanho: {duracao_legado / duracao_atual:.2f}x")
+    print(f"Categorias idênticas: {'sim' if categorias_legado == categorias_atual else 'NÃO'}")
+
+    # processar_debitos sobre o lote (mesmas razões sociais, autômato nos dois casos)
+    transacoes = gerar_transacoes(razoes, aleatorio)
+    lote = montar_lote_colunar(transacoes)
+
+    inicio = time.perf_counter()
+    despesas_legado = processar_debitos_legado(categorizador, transacoes)
+    duracao_linhas = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    despesas_lote = categorizador.processar_debitos(lote)
+    duracao_lote = time.perf_counter() - inicio
+
+    print(f"\n{'processar_debitos':<20}{'Tempo (s)':>12}{'Débitos/s':>16}")
+    print(f"{'Linha a linha':<20}{duracao_linhas:>12.2f}{quantidade_debitos / duracao_linhas:>16,.0f}")
+    print(f"{'Lote vetorizado':<20}{duracao_lote:>12.2f}{quantidade_debitos / duracao_lote:>16,.0f}")
+    print(f"\nGanho: {duracao_linhas / duracao_lote:.2f}x")
+    iguais = despesas_legado['Descricao'].tolist() == despesas_lote['Descricao'].tolist()
+    print(f"Categorias idênticas: {'sim' if iguais else 'NÃO'}")
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do ExtratorOFX: transações/segundo antes e depois da extração
+em passada única (tokenizador compilado) sobre um OFX sintético.
+
+Uso:
+    python benchmark_extrator.py [quantidade_transacoes]
+"""
+
+import io
+import os
+import re
+import sys
+import time
+import random
+import tempfile
+import contextlib
+from datetime import datetime
+
+from extrator_ofx import ExtratorOFX
+
+MEMOS_EXEMPLO = [
+    'PIX TRANSF CAISSA PETERMANN DE MENDONCA 12485935610 {data}',
+    'PIX ENVIADO 33304901000110 SUPERMERCADOS MUNDIAL LTDA 123',
+    'SISPAG PIX QR-CODE IFOOD.COM AGENCIA DE RESTAURANTES ONLINE S.A. 14.380.201-21',
+    'TED 12345678901 GISELE CRISTINA DA SILVA',
+    'REDE  VISA CRED {data} 123456789012',
+    'BOLETO  PAGO LIGHT SERVICOS DE ELETRICIDADE S A',
+    'PIX RECEBIDO RICARDO DA COSTA SILVA 688.556.307-25',
+    'PJBANK PAGAMENTOS S A 12345678000199',
+    'SALDO TOTAL DISPONÍVEL DIA',
+]
+
+
+def gerar_ofx_sintetico(caminho, quantidade, semente=42):
+    """Gera um OFX 1.x (SGML, latin1) com a quantidade de transações pedida."""
+    aleatorio = random.Random(semente)
+    
+    with open(caminho, 'w', encoding='latin1', newline='\n') as f:
+        f.write('OFXHEADER:100\nDATA:OFXSGML\nVERSION:102\nENCODING:USASCII\nCHARSET:1252\n\n')
+        f.write('<OFX>\n<BANKMSGSRSV1>\n<STMTTRNRS>\n<STMTRS>\n<CURDEF>BRL\n<BANKTRANLIST>\n')
+        
+        for i in range(quantidade):
+            dia, mes = aleatorio.randint(1, 28), aleatorio.randint(1, 12)
+            memo = aleatorio.choice(MEMOS_EXEMPLO).format(data=f'{dia:02d}/{mes:02d}')
+            valor = aleatorio.randint(1, 500000) / 100
+            if 'RECEBIDO' not in memo and 'REDE' not in memo:
+                valor = -valor
+            
+            f.write(
+                '<STMTTRN>\n'
+                f'<TRNTYPE>{"CREDIT" if valor > 0 else "DEBIT"}\n'
+                f'<DTPOSTED>2025{mes:02d}{dia:02d}100000[-03:EST]\n'
+                f'<TRNAMT>{valor:.2f}\n'
+                f'<FITID>{i}\n'
+                f'<CHECKNUM>{aleatorio.randint(1, 999999)}\n'
+                f'<MEMO>{memo}\n'
+                '</STMTTRN>\n'
+            )
+        
+        f.write('</BANKTRANLIST>\n</STMTRS>\n</STMTTRNRS>\n</BANKMSGSRSV1>\n</OFX>\n')
+
+
+def processar_legado(caminho_arquivo):
+    """
+    Reprodução da extração original (leitura completa, três re.search por
+    bloco, filtro com laço de substrings e CNPJ/CPF extraído duas vezes).
+    """
+    def eh_informativo(memo):
+        memo_upper = memo.upper().strip()
+        for padrao in ['SALDO TOTAL DISPONÍVEL DIA', 'SALDO ANTERIOR', 'SALDO DISPONÍVEL',
+                       'SALDO INICIAL', 'SALDO FINAL']:
+            if padrao.upper() in memo_upper:
+                return True
+        for padrao in [r'^SALDO\s+(TOTAL|DISPONIVEL|ANTERIOR|INICIAL|FINAL)',
+                       r'POSICAO\s+DO\s+DIA', r'EXTRATO\s+DO\s+DIA']:
+            if re.search(padrao, memo_upper):
+                return True
+        return False
+    
+    def cnpj_cpf(texto):
+        cnpj_match = re.search(r'\b\d{14}\b', texto)
+        if cnpj_match:
+            return cnpj_match.group()
+        cpf_match = re.search(r'\b\d{11}\b', texto)
+        if cpf_match:
+            return cpf_match.group()
+        return None
+    
+    def razao_social(memo):
+        prefixos = [
+            'PIX TRANSF ', 'PIX ENVIADO ', 'TED ', 'SISPAG PIX QR-CODE ',
+            'REDE  VISA ', 'REDE  MAST ', 'BOLETO  PAGO ', 'DEV PIX ',
+            'TAR PIX PGTO TRANSF'
+        ]
+        texto = memo
+        for prefixo in prefixos:
+            if texto.startswith(prefixo):
+                texto = texto[len(prefixo):].strip()
+                break
+        doc = cnpj_cpf(texto)
+        if doc:
+            partes = texto.split(doc)
+            if len(partes) > 1:
+                nome = re.sub(r'\s+\d+$', '', partes[1].strip()).strip()
+                if nome:
+                    return nome
+        texto = re.sub(r'\d{2}/\d{2}', '', texto).strip()
+        texto = re.sub(r'\s+\d{8,}$', '', texto).strip()
+        return texto if texto else memo
+    
+    with open(caminho_arquivo, 'r', encoding='latin1') as file:
+        conteudo = file.read()
+    
+    transacoes = []
+    for t in re.findall(r'<STMTTRN>(.*?)</STMTTRN>', conteudo, re.DOTALL):
+        data_match = re.search(r'<DTPOSTED>(.*?)(?=\n|<)', t)
+        valor_match = re.search(r'<TRNAMT>(.*?)(?=\n|<)', t)
+        memo_match = re.search(r'<MEMO>(.*?)(?=\n|</STMTTRN>)', t, re.DOTALL)
+        if data_match and valor_match and memo_match:
+            memo_str = memo_match.group(1).strip()
+            if eh_informativo(memo_str):
+                continue
+            data_obj = datetime.strptime(data_match.group(1).strip()[:8], '%Y%m%d')
+            valor_float = float(valor_match.group(1).strip())
+            transacoes.append({
+                'Data': data_obj.strftime('%d/%m/%Y'),
+                'Lancamentos': memo_str,
+                'Razao Social': razao_social(memo_str),
+                'CNPJ/CPF': cnpj_cpf(memo_str) or '',
+                'Valor': valor_float,
+                'Tipo': 'Credito' if valor_float > 0 else 'Debito'
+            })
+    
+    return transacoes
+
+
+def processar_atual(caminho_arquivo):
+    """Extração atual em passada única via ExtratorOFX.iter_transacoes."""
+    return list(ExtratorOFX().iter_transacoes(caminho_arquivo))
+
+
+def processar_colunar(caminho_arquivo):
+    """Lote colunar: razão social e CNPJ/CPF extraídos por coluna."""
+    return ExtratorOFX().processar_arquivo_colunar(caminho_arquivo)
+
+
+def medir(funcao, caminho, quantidade):
+    """Executa a função silenciando prints e retorna (segundos, transações/s)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        transacoes = funcao(caminho)
+        duracao = time.perf_counter() - inicio
+    
+    return duracao, quantidade / duracao, len(transacoes)
+
+
+if __name__ == "__main__":
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    
+    print("=" * 80)
+    print(f"BENCHMARK: ExtratorOFX com {quantidade:,} transações sintéticas")
+    print("=" * 80 + "\n")
+    
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'sintetico.ofx')
+        gerar_ofx_sintetico(caminho, quantidade)
+        print(f"Arquivo: {os.path.getsize(caminho) / 1024 / 1024:.1f} MB\n")
+        
+        duracao_legado, taxa_legado, validas_legado = medir(processar_legado, caminho, quantidade)
+        duracao_atual, taxa_atual, validas_atual = medir(processar_atual, caminho, quantidade)
+        duracao_colunar, taxa_colunar, validas_colunar = medir(processar_colunar, caminho, quantidade)
+    
+    print(f"{'Versão':<12}{'Tempo (s)':>12}{'Transações/s':>16}{'Válidas':>10}")
+    print(f"{'Antes':<12}{duracao_legado:>12.2f}{taxa_legado:>16,.0f}{validas_legado:>10,}")
+    print(f"{'Depois':<12}{duracao_atual:>12.2f}{taxa_atual:>16,.0f}{validas_atual:>10,}")
+    print(f"{'Colunar':<12}{duracao_colunar:>12.2f}{taxa_colunar:>16,.0f}{validas_colunar:>10,}")
+    print(f"\nGanho: {taxa_atual / taxa_legado:.2f}x")
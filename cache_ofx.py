@@ -0,0 +1,184 @@
+import os
+import zlib
+import pickle
+import hashlib
+import threading
+from extrator_ofx import MembroZip, ConteudoOFX, abrir_fonte_ofx
+
+# Tamanho máximo padrão do cache em disco (256 MB)
+TAMANHO_MAXIMO_CACHE = 256 * 1024 * 1024
+
+# Leitura do arquivo para o hash em blocos de 1 MB
+TAMANHO_BLOCO_HASH = 1024 * 1024
+
+# Formato das entradas (entra na chave: mudar descarta as entradas antigas)
+VERSAO_FORMATO_CACHE = '3'
+
+
+class CacheOFX:
+    """
+    Cache em disco de arquivos OFX já processados.
+    
+    A chave é o SHA-256 do conteúdo do arquivo combinado com a assinatura do
+    parser (versão + regras de lançamentos informativos), então reenviar o
+    mesmo arquivo devolve as transações sem refazer a extração e qualquer
+    mudança nas regras invalida as entradas antigas.
+    
+    Cada entrada é gravada em formato binário compacto (pickle comprimido
+    com zlib). Quando o tamanho total passa do limite, as entradas usadas
+    há mais tempo são removidas (LRU pela data de modificação, atualizada a
+    cada acerto).
+    """
+    
+    def __init__(self, diretorio_cache=os.path.join('dados_persistentes', 'cache_ofx'),
+                 tamanho_maximo=TAMANHO_MAXIMO_CACHE):
+        self.diretorio_cache = diretorio_cache
+        self.tamanho_maximo = tamanho_maximo
+        
+        os.makedirs(diretorio_cache, exist_ok=True)
+    
+    def calcular_chave(self, caminho_arquivo, extrator):
+        """
+        Calcula a chave do cache para um arquivo.
+        
+        Args:
+            caminho_arquivo: Caminho do arquivo OFX, MembroZip ou ConteudoOFX
+            extrator (ExtratorOFX): Extrator cuja assinatura compõe a chave
+            
+        Returns:
+            str: Chave hexadecimal
+        """
+        sha = hashlib.sha256()
+        if isinstance(caminho_arquivo, ConteudoOFX):
+            sha.update(caminho_arquivo.dados)
+        elif isinstance(caminho_arquivo, MembroZip):
+            # Conteúdo descompactado do membro, lido em fluxo
+            with abrir_fonte_ofx(caminho_arquivo) as file:
+                for bloco in iter(lambda: file.read(TAMANHO_BLOCO_HASH), b''):
+                    sha.update(bloco)
+        else:
+            # Arquivos no disco (.ofx, .gz, .zip) pelos bytes brutos
+            with open(caminho_arquivo, 'rb') as file:
+                for bloco in iter(lambda: file.read(TAMANHO_BLOCO_HASH), b''):
+                    sha.update(bloco)
+        
+        sha.update(VERSAO_FORMATO_CACHE.encode('utf-8'))
+        sha.update(extrator.assinatura_parser().encode('utf-8'))
+        return sha.hexdigest()
+    
+    def _caminho_entrada(self, chave):
+        return os.path.join(self.diretorio_cache, f'{chave}.bin')
+    
+    def obter(self, chave):
+        """
+        Busca uma entrada no cache.
+        
+        Args:
+            chave (str): Chave calculada por calcular_chave
+            
+        Returns:
+            dict | None: {'transacoes': [...], 'transacoes_filtradas': [...],
+            'conta': {...}, 'filtros_acionados': {...}, 'avisos': [...]} ou
+            None se não houver entrada válida
+        """
+        caminho = self._caminho_entrada(chave)
+        
+        try:
+            with open(caminho, 'rb') as file:
+                entrada = pickle.loads(zlib.decompress(file.read()))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Erro ao ler cache OFX (entrada descartada): {e}")
+            self._remover(caminho)
+            return None
+        
+        # Marca a entrada como usada recentemente (LRU)
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+        
+        return entrada
+    
+    def salvar(self, chave, transacoes, transacoes_filtradas, conta=None, filtros_acionados=None, avisos=None):
+        """
+        Grava uma entrada no cache e aplica o limite de tamanho.
+        
+        Args:
+            chave (str): Chave calculada por calcular_chave
+            transacoes (list): Transações válidas extraídas
+            transacoes_filtradas (list): Lançamentos informativos removidos
+            conta (dict, optional): Conta do último extrato lido
+                (ExtratorOFX.conta_atual ao fim da leitura)
+            filtros_acionados (dict, optional): Lançamentos removidos por
+                padrão informativo
+            avisos (list, optional): Avisos da leitura (ExtratorOFX.avisos)
+        """
+        caminho = self._caminho_entrada(chave)
+        conteudo = zlib.compress(pickle.dumps({
+            'transacoes': transacoes,
+            'transacoes_filtradas': transacoes_filtradas,
+            'conta': dict(conta or {}),
+            'filtros_acionados': dict(filtros_acionados or {}),
+            'avisos': list(avisos or [])
+        }, protocol=pickle.HIGHEST_PROTOCOL))
+        
+        try:
+            # Escrita atômica: outro processo (ou thread) nunca lê uma entrada pela metade
+            temporario = f'{caminho}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(temporario, 'wb') as file:
+                file.write(conteudo)
+            os.replace(temporario, caminho)
+        except OSError as e:
+            print(f"Erro ao gravar cache OFX: {e}")
+            return
+        
+        self._aplicar_limite()
+    
+    def _aplicar_limite(self):
+        """Remove as entradas menos usadas até caber no tamanho máximo."""
+        entradas = []
+        total = 0
+        
+        for nome in os.listdir(self.diretorio_cache):
+            if not nome.endswith('.bin'):
+                continue
+            caminho = os.path.join(self.diretorio_cache, nome)
+            try:
+                info = os.stat(caminho)
+            except OSError:
+                continue
+            entradas.append((info.st_mtime, info.st_size, caminho))
+            total += info.st_size
+        
+        for _, tamanho, caminho in sorted(entradas):
+            if total <= self.tamanho_maximo:
+                break
+            self._remover(caminho)
+            total -= tamanho
+    
+    def _remover(self, caminho):
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
+    
+    def obter_estatisticas(self):
+        """Retorna quantidade de entradas e tamanho total do cache."""
+        tamanhos = [
+            os.path.getsize(os.path.join(self.diretorio_cache, nome))
+            for nome in os.listdir(self.diretorio_cache)
+            if nome.endswith('.bin')
+        ]
+        return {
+            'entradas': len(tamanhos),
+            'tamanho_total': sum(tamanhos),
+            'tamanho_maximo': self.tamanho_maximo
+        }
+    
+    def limpar(self):
+        """Remove todas as entradas do cache."""
+        for nome in os.listdir(self.diretorio_cache):
+            if nome.endswith('.bin') or nome.endswith('.tmp'):
+                self._remover(os.path.join(self.diretorio_cache, nome))
@@ -0,0 +1,280 @@
+import re
+import math
+import unicodedata
+from collections import Counter
+from itertools import chain
+
+# Tamanho dos n-gramas do índice
+TAMANHO_NGRAMA = 3
+
+# Similaridade mínima (coeficiente de Dice entre os trigramas) para aceitar um pagador
+LIMIAR_SIMILARIDADE = 0.8
+
+# Nomes de valores diferentes (pacientes) com similaridade a menos que isto
+# da melhor tornam a busca ambígua: nenhum é devolvido
+MARGEM_AMBIGUIDADE = 0.05
+
+# Trigramas raros da consulta que um candidato precisa ter (filtro de
+# prefixo generalizado: prefixo maior, mas bem menos candidatos)
+TRIGRAMAS_NO_PREFIXO = 3
+
+# Listas do índice invertido maiores que isto (trigramas muito comuns,
+# como ' MA' ou 'SIL') não geram candidatos: limita o custo de cada busca
+# a alguns milhares de ids, ao preço de perder nomes formados só por
+# trigramas comuns (ver benchmark_aproximado.py)
+MAXIMO_POSTINGS_CANDIDATOS = 500
+
+RE_NAO_ALFANUMERICO = re.compile(r'[^0-9A-Z]+')
+
+
+def normalizar_nome(texto):
+    """
+    Nome em maiúsculas, sem acentos e só com letras, dígitos e espaços simples.
+
+    Args:
+        texto (str): Nome ou razão social
+
+    Returns:
+        str: Nome normalizado
+    """
+    if not isinstance(texto, str):
+        return ''
+    sem_acentos = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    return RE_NAO_ALFANUMERICO.sub(' ', sem_acentos.upper()).strip()
+
+
+def trigramas(texto):
+    """
+    Conjunto de trigramas do nome normalizado (com um espaço em cada ponta,
+    para que início e fim de palavra também contem).
+
+    Args:
+        texto (str): Nome já normalizado
+
+    Returns:
+        set: Trigramas
+    """
+    if not texto:
+        return set()
+    texto = f' {texto} '
+    return {texto[i:i + TAMANHO_NGRAMA] for i in range(len(texto) - TAMANHO_NGRAMA + 1)}
+
+
+class IndiceTrigramas:
+    """
+    Busca aproximada de nomes de pagadores por índice invertido de trigramas.
+
+    Cada nome conhecido é decomposto em trigramas e o índice guarda, para
+    cada trigrama, os nomes em que ele aparece. A pontuação é o coeficiente
+    de Dice (2·|A∩B| / (|A|+|B|)). Na busca, só os nomes presentes nas
+    listas dos trigramas mais raros do texto são candidatos (filtro de
+    prefixo: quem atinge o limiar tem de aparecer numa delas), e os que não
+    podem atingir o limiar pelo tamanho são descartados antes da interseção;
+    o resultado é o mesmo da comparação com todos os nomes. Tudo em memória
+    e local, sem serviço externo.
+
+    O índice cresce aos poucos: adicionar() acrescenta ou atualiza um nome
+    sem reconstruir os demais, e remover() apenas desativa o nome.
+
+    Buscas concorrentes são seguras enquanto ninguém altera o índice. Um
+    índice já publicado (ex.: em RegrasCompiladas, usado por várias sessões)
+    não deve ser alterado: atualize uma copia() e publique a cópia.
+    """
+
+    def __init__(self, limiar=LIMIAR_SIMILARIDADE, maximo_postings=MAXIMO_POSTINGS_CANDIDATOS):
+        """
+        Args:
+            limiar (float): Similaridade mínima (0 a 1) para aceitar um nome
+            maximo_postings (int | float): Tamanho máximo de uma lista do
+                índice para gerar candidatos (math.inf: busca exata)
+        """
+        self.limiar = limiar
+        self.maximo_postings = maximo_postings
+
+        self._nomes = []        # nome original de cada id
+        self._valores = []      # valor associado (None = removido)
+        self._trigramas = []    # trigramas de cada id
+        self._tamanhos = []     # quantidade de trigramas de cada id
+        self._ids = {}          # nome normalizado -> id
+        self._postings = {}     # trigrama -> [ids]
+        self._ativos = 0
+
+    def __len__(self):
+        return self._ativos
+
+    def adicionar(self, nome, valor):
+        """
+        Acrescenta (ou atualiza) um nome conhecido.
+
+        Args:
+            nome (str): Nome do pagador
+            valor: Valor devolvido quando o nome casar (ex.: paciente);
+                vazio/None equivale a remover o nome
+        """
+        if not valor:
+            self.remover(nome)
+            return
+
+        normalizado = normalizar_nome(nome)
+        if not normalizado:
+            return
+
+        identificador = self._ids.get(normalizado)
+        if identificador is not None:
+            if self._valores[identificador] is None:
+                self._ativos += 1
+            self._nomes[identificador] = nome
+            self._valores[identificador] = valor
+            return
+
+        identificador = len(self._nomes)
+        grupo = trigramas(normalizado)
+        self._nomes.append(nome)
+        self._valores.append(valor)
+        self._trigramas.append(grupo)
+        self._tamanhos.append(len(grupo))
+        self._ids[normalizado] = identificador
+        for trigrama in grupo:
+            self._postings.setdefault(trigrama, []).append(identificador)
+        self._ativos += 1
+
+    def remover(self, nome):
+        """Desativa o nome (as entradas do índice invertido são ignoradas na busca)."""
+        identificador = self._ids.get(normalizar_nome(nome))
+        if identificador is not None and self._valores[identificador] is not None:
+            self._valores[identificador] = None
+            self._ativos -= 1
+
+    def copia(self):
+        """
+        Cópia independente do índice, para alterar sem afetar quem busca no original.
+
+        Os conjuntos de trigramas de cada nome nunca mudam e são compartilhados;
+        as listas do índice invertido são copiadas.
+
+        Returns:
+            IndiceTrigramas: Nova instância com os mesmos nomes
+        """
+        nova = IndiceTrigramas(self.limiar, self.maximo_postings)
+        nova._nomes = list(self._nomes)
+        nova._valores = list(self._valores)
+        nova._trigramas = list(self._trigramas)
+        nova._tamanhos = list(self._tamanhos)
+        nova._ids = dict(self._ids)
+        nova._postings = {trigrama: list(ids) for trigrama, ids in self._postings.items()}
+        nova._ativos = self._ativos
+        return nova
+
+    def sincronizar(self, mapeamento):
+        """
+        Deixa o índice igual ao mapeamento, alterando só o que mudou.
+
+        Args:
+            mapeamento (dict): {nome do pagador: valor}
+
+        Returns:
+            IndiceTrigramas: O próprio índice
+        """
+        atuais = set()
+        for nome, valor in mapeamento.items():
+            self.adicionar(nome, valor)
+            atuais.add(normalizar_nome(nome))
+
+        for normalizado, identificador in self._ids.items():
+            if normalizado not in atuais and self._valores[identificador] is not None:
+                self._valores[identificador] = None
+                self._ativos -= 1
+
+        return self
+
+    def buscar(self, texto, limiar=None):
+        """
+        Nome conhecido mais parecido com o texto.
+
+        Args:
+            texto (str): Razão social do pagador
+            limiar (float, optional): Similaridade mínima (padrão: self.limiar)
+
+        Returns:
+            tuple | None: (valor, nome conhecido, confiança de 0 a 1) ou None
+            se nenhum nome atingir o limiar ou se nomes de valores diferentes
+            empatarem (dentro de MARGEM_AMBIGUIDADE)
+        """
+        limiar = self.limiar if limiar is None else limiar
+        consulta = trigramas(normalizar_nome(texto))
+        if not consulta or not self._ativos:
+            return None
+
+        # Filtro de prefixo: um nome com Dice >= limiar tem pelo menos
+        # minimo_comuns trigramas da consulta, logo ao menos `exigidos` dos
+        # (tamanho - minimo_comuns + exigidos) trigramas mais raros dela
+        tamanho = len(consulta)
+        minimo_comuns = max(1, math.ceil(limiar * tamanho / (2 - limiar) - 1e-9))
+        postings = sorted((self._postings.get(trigrama, ()) for trigrama in consulta), key=len)
+        exigidos = min(TRIGRAMAS_NO_PREFIXO, minimo_comuns)
+        prefixo = tamanho - minimo_comuns + exigidos
+
+        # Trigramas comuns demais saem do prefixo; como podem ser
+        # compartilhados, entram no limite superior e baixam o exigido
+        selecionados = [lista for lista in postings[:prefixo] if len(lista) <= self.maximo_postings]
+        descartados = prefixo - len(selecionados)
+        exigidos = max(1, exigidos - descartados)
+
+        contagem = Counter(chain.from_iterable(selecionados))
+        comuns = [(identificador, quantidade) for identificador, quantidade in contagem.items()
+                  if quantidade >= exigidos]
+
+        # Limite superior de cada candidato: todos os trigramas fora do
+        # prefixo também em comum (e nunca mais que o menor dos dois nomes).
+        # Os candidatos são intersectados do maior limite para o menor, até
+        # que nenhum dos restantes possa chegar perto (MARGEM_AMBIGUIDADE)
+        # do melhor já encontrado
+        restantes = tamanho - prefixo + descartados
+        tamanhos = self._tamanhos
+        limites = []
+        for identificador, quantidade in comuns:
+            outro = tamanhos[identificador]
+            limite = 2 * min(quantidade + restantes, outro, tamanho) / (tamanho + outro)
+            if limite >= limiar:
+                limites.append((limite, identificador))
+        limites.sort(key=lambda item: (-item[0], item[1]))
+
+        pontuados = []
+        maior = limiar
+        for limite, identificador in limites:
+            if limite < maior - MARGEM_AMBIGUIDADE:
+                break
+            if self._valores[identificador] is None:
+                continue
+            pontuacao = 2 * len(consulta & self._trigramas[identificador]) / (tamanho + tamanhos[identificador])
+            if pontuacao >= limiar:
+                pontuados.append((pontuacao, identificador))
+                maior = max(maior, pontuacao)
+
+        if not pontuados:
+            return None
+
+        pontuados.sort(key=lambda item: (-item[0], item[1]))
+        melhor_pontuacao, melhor = pontuados[0]
+        for pontuacao, identificador in pontuados[1:]:
+            if pontuacao < melhor_pontuacao - MARGEM_AMBIGUIDADE:
+                break
+            if self._valores[identificador] != self._valores[melhor]:
+                return None
+        return self._valores[melhor], self._nomes[melhor], melhor_pontuacao
+
+
+# Teste rápido
+if __name__ == "__main__":
+    indice = IndiceTrigramas()
+    indice.sincronizar({
+        'FELIPE CUNHA MATOS': 'LETÍCIA P. S. MATTOS',
+        'PIX QRS NATALIA SIL': 'NATÁLIA SILVEIRA RODRIGUES DE OLIVEIRA',
+        'SOLUÇÃO ELETRONICA MOTO PEÇA': 'APARECIDA',
+        'MARIA SILVA SANTOS': 'MARIA SILVA SANTOS',
+        'MARIA SILVA SANTANA': 'MARIA SILVA SANTANA',
+    })
+
+    for texto in ['FELIPE CUNHA DE MATTOS', 'SOLUCAO ELETRONICA MOTO PECAS LTDA', 'MARIA DA SILVA',
+                  'MARIA SILVA SANTOS', 'MARIA SILVA SANT']:
+        print(f"{texto}: {indice.buscar(texto)}")
@@ -0,0 +1,120 @@
+from collections import deque
+
+# Prioridade de "nenhuma regra casou"
+SEM_PRIORIDADE = float('inf')
+
+
+class CasadorPalavrasChave:
+    """
+    Casamento de várias palavras-chave por substring (Aho-Corasick).
+
+    As regras ({categoria: [palavras-chave]}) são compiladas uma única vez
+    em um autômato; cada texto é percorrido em uma passada, com custo
+    proporcional ao tamanho do texto e não ao número de regras. Quando
+    várias palavras aparecem no texto vence a categoria que vem primeiro
+    nas regras (e, dentro dela, a primeira palavra da lista), exatamente
+    como no laço aninhado sobre as regras.
+    """
+
+    def __init__(self, regras):
+        """
+        Args:
+            regras (dict): {categoria: [palavras-chave]}, na ordem de prioridade
+        """
+        self.categorias = list(regras)
+        # Prioridade de cada palavra = posição na ordem categoria -> palavra;
+        # self.palavras[prioridade] = (categoria, palavra como está nas regras)
+        self.palavras = [(categoria, palavra) for categoria, lista in regras.items() for palavra in lista]
+
+        # transicoes[estado]: {caractere: próximo estado}; saida[estado]:
+        # menor prioridade entre as palavras que terminam no estado
+        transicoes = [{}]
+        saida = [SEM_PRIORIDADE]
+        # Palavra vazia casa com qualquer texto (como '' in texto)
+        self._prioridade_vazia = SEM_PRIORIDADE
+
+        for prioridade, (_, palavra) in enumerate(self.palavras):
+            palavra = palavra.upper()
+            if not palavra:
+                self._prioridade_vazia = min(self._prioridade_vazia, prioridade)
+                continue
+
+            estado = 0
+            for caractere in palavra:
+                proximo = transicoes[estado].get(caractere)
+                if proximo is None:
+                    proximo = len(transicoes)
+                    transicoes[estado][caractere] = proximo
+                    transicoes.append({})
+                    saida.append(SEM_PRIORIDADE)
+                estado = proximo
+            saida[estado] = min(saida[estado], prioridade)
+
+        self._transicoes = self._determinizar(transicoes, saida)
+        self._saida = saida
+
+    @staticmethod
+    def _determinizar(transicoes, saida):
+        """
+        Incorpora os links de falha às transições (percurso em largura).
+
+        Cada estado herda as transições do seu estado de falha, de modo que a
+        busca faz um único acesso a dicionário por caractere; caracteres que
+        não aparecem em nenhuma palavra voltam à raiz.
+        """
+        falha = [0] * len(transicoes)
+        completas = [None] * len(transicoes)
+        completas[0] = dict(transicoes[0])
+
+        fila = deque(transicoes[0].values())
+        while fila:
+            estado = fila.popleft()
+            # O estado herda a prioridade das palavras que são sufixo dele
+            saida[estado] = min(saida[estado], saida[falha[estado]])
+
+            completas[estado] = dict(completas[falha[estado]])
+            for caractere, proximo in transicoes[estado].items():
+                falha[proximo] = completas[falha[estado]].get(caractere, 0)
+                completas[estado][caractere] = proximo
+                fila.append(proximo)
+
+        return completas
+
+    def buscar(self, texto):
+        """
+        Categoria da regra de maior prioridade cuja palavra aparece no texto.
+
+        Args:
+            texto (str): Texto já em maiúsculas
+
+        Returns:
+            str | None: Categoria ou None se nenhuma palavra casar
+        """
+        regra = self.buscar_regra(texto)
+        return regra[0] if regra else None
+
+    def buscar_regra(self, texto):
+        """
+        Regra que decide a categoria do texto (mesma passada de buscar).
+
+        Args:
+            texto (str): Texto já em maiúsculas
+
+        Returns:
+            tuple | None: (categoria, palavra-chave que casou) ou None
+        """
+        melhor = self._prioridade_vazia
+        transicoes = self._transicoes
+        saida = self._saida
+        estado = 0
+
+        for caractere in texto:
+            estado = transicoes[estado].get(caractere, 0)
+            if saida[estado] < melhor:
+                melhor = saida[estado]
+                if melhor == 0:
+                    break
+
+        if melhor == SEM_PRIORIDADE:
+            return None
+        return self.palavras[melhor]
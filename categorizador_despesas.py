@@ -1,7 +1,16 @@
 import pandas as pd
 import os
 from datetime import datetime
-import re
+import json
+import hashlib
+from extrator_ofx import formatar_datas, montar_lote_colunar
+from dinheiro import COLUNA_CENTAVOS, centavos_para_reais, serie_centavos, resumir_centavos
+from contas import COLUNAS_CONTA
+from casamento_padroes import CasadorPalavrasChave
+from regras_categorizacao import ARQUIVO_REGRAS, obter_regras
+from memo_categorizacao import obter_memo
+from estatisticas_regras import EstatisticasRegras
+from indice_documentos import NOME_ARQUIVO_INDICE, ORIGEM_MANUAL, coluna_documentos, obter_indice
 
 class CategorizadorDespesas:
     """
@@ -9,16 +18,47 @@ class CategorizadorDespesas:
     de Razão Social para organizar gastos em categorias específicas.
     """
     
-    def __init__(self, arquivo_despesas='despesas_persistentes.csv'):
+    def __init__(self, arquivo_despesas='despesas_persistentes.csv', arquivo_regras=ARQUIVO_REGRAS, memo=None,
+                 estatisticas=None, indice=None):
+        """
+        Args:
+            arquivo_despesas (str): CSV de despesas do categorizador
+            arquivo_regras (str): JSON com as regras de categorização
+            memo (MemoCategorizacao, optional): Memo por razão social; por
+                padrão, o memo de despesas compartilhado pelo processo
+            estatisticas (EstatisticasRegras, optional): Contadores de uso das
+                regras alimentados por processar_debitos; por padrão, só em memória
+            indice (IndiceDocumentos, optional): Índice CNPJ/CPF -> categoria;
+                por padrão, o indice_documentos.json ao lado do arquivo de regras
+        """
         self.arquivo_despesas = arquivo_despesas
-        self.regras_categorizacao = {
-            'Retirada': ['CAISSA', 'FILIPE DE SOUZA RIBEIRO'],
-            'Limpeza': ['GISELE CRISTINA DA SILVA', 'MARIA MAGDALIA PEREIRA'],
-            'Luz': ['LIGHT'],
-            'Aluguel': ['PJBANK'],
-            'Fisioterapeutas': ['BEATRIZ PRETA RICART', 'RAFAELA MAGALHAES DE FRANCA'],
-            'Tributos': ['TRIB COD BARRAS', 'GPS'],
-        }
+        
+        # Regras de dados_persistentes/regras_categorizacao.json, já compiladas
+        # (o cache do processo só recompila quando o arquivo muda)
+        regras = obter_regras(arquivo_regras)
+        self.regras_categorizacao = regras.despesas
+        self.casador = regras.casador_despesas
+        self.versao_regras = regras.versao
+        self._regras_validas = set(self.casador.palavras)
+        
+        # Documentos já confirmados: consultados antes das regras
+        if indice is None:
+            indice = obter_indice(os.path.join(os.path.dirname(os.path.abspath(arquivo_regras)), NOME_ARQUIVO_INDICE))
+        self.indice = indice
+        
+        # Categoria já calculada de cada razão social (esvaziado quando as regras mudam)
+        self.memo = memo if memo is not None else obter_memo('despesas', arquivo_regras=arquivo_regras)
+        
+        # Uso de cada regra/palavra-chave e razões sociais que caem em Diversos
+        self.estatisticas = estatisticas if estatisticas is not None else EstatisticasRegras()
+    
+    def recompilar_regras(self):
+        """Compila self.regras_categorizacao (chamar após alterar as regras em memória)."""
+        self.casador = CasadorPalavrasChave(self.regras_categorizacao)
+        self._regras_validas = set(self.casador.palavras)
+        self.versao_regras = hashlib.sha256(
+            json.dumps(self.regras_categorizacao, ensure_ascii=False).encode('utf-8')
+        ).hexdigest()
         
     def categorizar_despesa(self, razao_social):
         """
@@ -30,48 +70,183 @@ class CategorizadorDespesas:
         Returns:
             str: Categoria da despesa
         """
+        return self._categorizar_com_regra(razao_social)[0]
+    
+    def _categorizar_com_regra(self, razao_social):
+        """
+        Categoriza a razão social informando também a regra que casou.
+        
+        Returns:
+            tuple: (categoria, (categoria, palavra-chave) ou None se caiu em Diversos)
+        """
         if not razao_social:
-            return 'Diversos'
+            return 'Diversos', None
+        
+        # O memo guarda [categoria, palavra-chave] (palavra None = sem regra)
+        memorizado = self.memo.obter(razao_social, self.versao_regras)
+        if memorizado is not None:
+            categoria, palavra = memorizado
+            return categoria, (None if palavra is None else (categoria, palavra))
         
         razao_upper = razao_social.upper().strip()
         
-        # Aplicar regras de categorização
-        for categoria, palavras_chave in self.regras_categorizacao.items():
-            for palavra in palavras_chave:
-                if palavra.upper() in razao_upper:
-                    return categoria
+        # Aplicar regras de categorização (uma passada no texto; vale a
+        # primeira categoria das regras cuja palavra-chave aparece)
+        regra = self.casador.buscar_regra(razao_upper)
         
         # Se não encontrou nenhuma regra, categoriza como Diversos
-        return 'Diversos'
+        categoria = regra[0] if regra else 'Diversos'
+        
+        self.memo.guardar(razao_social, self.versao_regras, [categoria, regra[1] if regra else None])
+        return categoria, regra
     
     def processar_debitos(self, transacoes):
         """
         Processa apenas os débitos das transações e os categoriza.
         
+        Listas e geradores são convertidos uma vez em lote colunar e seguem
+        o mesmo caminho vetorizado de um DataFrame.
+        
         Args:
-            transacoes (list): Lista de transações extraídas do OFX
+            transacoes (iterable | pd.DataFrame): Transações extraídas do OFX
+                (lista, gerador de ExtratorOFX.iter_transacoes ou lote
+                colunar de montar_lote_colunar)
             
         Returns:
             pd.DataFrame: DataFrame com despesas categorizadas
         """
-        despesas = []
+        despesas = self._processar_debitos_lote(montar_lote_colunar(transacoes))
         
-        for transacao in transacoes:
-            # Processar apenas débitos (valores negativos)
-            if transacao['Valor'] < 0:
-                categoria = self.categorizar_despesa(transacao['Razao Social'])
-                
-                despesa = {
-                    'Data': transacao['Data'],
-                    'Descricao': categoria,
-                    'Valor': abs(transacao['Valor']),  # Valor absoluto para despesas
-                    'Razao_Social_Original': transacao['Razao Social'],
-                    'Data_Processamento': datetime.now().strftime('%d/%m/%Y %H:%M:%S')
-                }
-                
-                despesas.append(despesa)
+        # Memo e estatísticas em disco (quando configurados) ficam para a próxima sessão
+        self.memo.salvar()
+        self.estatisticas.salvar()
+        return despesas
+    
+    def categorizar_coluna(self, razoes_sociais, documentos=None):
+        """
+        Categoriza uma coluna de razões sociais.
         
-        return pd.DataFrame(despesas)
+        Linhas com CNPJ/CPF já confirmado no índice de documentos recebem a
+        categoria dele; nas demais, cada razão social distinta passa uma
+        única vez pelo autômato de regras e o resultado volta para as linhas
+        pelos códigos de pd.factorize.
+        
+        Args:
+            razoes_sociais (pd.Series): Razões sociais (texto)
+            documentos (pd.Series, optional): CNPJ/CPF de cada linha
+            
+        Returns:
+            pd.Series: Categoria de cada linha, com o mesmo índice
+        """
+        return self._categorizar_linhas(razoes_sociais, documentos)
+    
+    def _categorizar_linhas(self, razoes_sociais, documentos=None, centavos=None, estatisticas=None):
+        """
+        Categoria de cada linha: primeiro pelo índice de documentos, depois
+        pelas regras.
+        
+        Args:
+            razoes_sociais (pd.Series): Razões sociais (texto)
+            documentos (pd.Series, optional): CNPJ/CPF de cada linha
+            centavos (pd.Series, optional): Valor de cada linha em centavos
+            estatisticas (EstatisticasRegras, optional): Recebe o uso das
+                regras (uma soma por razão social distinta e por regra)
+            
+        Returns:
+            pd.Series: Categoria de cada linha, com o mesmo índice
+        """
+        if documentos is None:
+            pelo_documento = pd.Series(False, index=razoes_sociais.index)
+            categorias = pd.Series([None] * len(razoes_sociais), index=razoes_sociais.index, dtype=object)
+        else:
+            categorias, palavras = self.indice.categorias_despesas(documentos, self._regras_validas)
+            pelo_documento = categorias.notna()
+        
+        pelas_regras = ~pelo_documento
+        razoes = razoes_sociais[pelas_regras]
+        codigos, unicas, resultados = self._categorizar_unicas(razoes)
+        categorias[pelas_regras] = self._expandir_categorias(codigos, resultados, razoes.index)
+        
+        if estatisticas is not None:
+            por_razao = centavos[pelas_regras].groupby(codigos).agg(['count', 'sum'])
+            for codigo, quantidade, soma in por_razao.itertuples():
+                estatisticas.registrar(resultados[codigo][1], unicas[codigo], int(quantidade), int(soma))
+            
+            if pelo_documento.any():
+                # Acertos do índice contam para a palavra-chave que confirmou o
+                # documento (as confirmações manuais não têm palavra-chave)
+                pela_regra = pelo_documento & (palavras != ORIGEM_MANUAL)
+                por_regra = centavos[pela_regra].groupby(
+                    [categorias[pela_regra], palavras[pela_regra]]
+                ).agg(['count', 'sum'])
+                for regra, quantidade, soma in por_regra.itertuples():
+                    estatisticas.registrar(regra, '', int(quantidade), int(soma))
+        
+        return categorias
+    
+    def _categorizar_unicas(self, razoes_sociais):
+        """
+        Returns:
+            tuple: (códigos de pd.factorize, razões sociais distintas,
+            (categoria, regra) de cada razão distinta)
+        """
+        codigos, unicas = pd.factorize(razoes_sociais)
+        return codigos, unicas, [self._categorizar_com_regra(razao) for razao in unicas]
+    
+    def _expandir_categorias(self, codigos, resultados, indice):
+        """Categoria de cada linha a partir dos resultados por razão distinta."""
+        categorias = pd.Series([categoria for categoria, _ in resultados], dtype=object)
+        return pd.Series(categorias.take(codigos).to_numpy(), index=indice)
+    
+    def _centavos_debitos(self, debitos):
+        """Valor absoluto dos débitos em centavos (usa Valor_Centavos quando presente)."""
+        if COLUNA_CENTAVOS in debitos.columns:
+            return debitos[COLUNA_CENTAVOS].astype('int64').abs()
+        return serie_centavos(debitos['Valor']).abs()
+    
+    def _processar_debitos_lote(self, lote):
+        """
+        Processa os débitos de um lote colunar sem convertê-lo em registros.
+        
+        Args:
+            lote (pd.DataFrame): Lote colunar de transações
+            
+        Returns:
+            pd.DataFrame: DataFrame com despesas categorizadas
+        """
+        if lote.empty:
+            return pd.DataFrame()
+        
+        debitos = lote[lote['Valor'] < 0]
+        
+        if debitos.empty:
+            return pd.DataFrame()
+        
+        razao_social = debitos['Razao Social'].astype(str)
+        centavos = self._centavos_debitos(debitos)
+        
+        documentos = coluna_documentos(debitos['CNPJ/CPF']) if 'CNPJ/CPF' in debitos.columns else None
+        
+        # Uso das regras somado na mesma passada, sem recategorizar
+        categorias = self._categorizar_linhas(razao_social, documentos, centavos, self.estatisticas)
+        
+        despesas = pd.DataFrame({
+            'Data': formatar_datas(debitos['Data']),
+            'Descricao': categorias,
+            'Valor': centavos_para_reais(centavos),  # Valor absoluto para despesas
+            COLUNA_CENTAVOS: centavos,
+            'Razao_Social_Original': razao_social,
+            # Um único carimbo para o lote inteiro
+            'Data_Processamento': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+            'FITID': debitos['FITID'].fillna('').astype(str) if 'FITID' in debitos.columns else '',
+            'CNPJ_CPF': documentos if documentos is not None else ''
+        })
+        
+        # Conta de origem: define a partição em que a despesa é gravada
+        for coluna in COLUNAS_CONTA:
+            despesas[coluna] = debitos[coluna].astype(str) if coluna in debitos.columns else ''
+        
+        return despesas.reset_index(drop=True)
     
     def carregar_despesas_existentes(self):
         """
@@ -155,19 +330,16 @@ class CategorizadorDespesas:
         if despesas_df.empty:
             return {}
         
-        resumo = despesas_df.groupby('Descricao').agg({
-            'Valor': ['sum', 'count'],
-            'Data': ['min', 'max']
-        }).round(2)
+        resumo = resumir_centavos(despesas_df, 'Descricao')
         
         # Simplificar estrutura do DataFrame
         resumo_dict = {}
         for categoria in resumo.index:
             resumo_dict[categoria] = {
-                'total': resumo.loc[categoria, ('Valor', 'sum')],
-                'quantidade': resumo.loc[categoria, ('Valor', 'count')],
-                'primeira_data': resumo.loc[categoria, ('Data', 'min')],
-                'ultima_data': resumo.loc[categoria, ('Data', 'max')]
+                'total': resumo.loc[categoria, 'total'],
+                'quantidade': resumo.loc[categoria, 'quantidade'],
+                'primeira_data': resumo.loc[categoria, 'primeira_data'],
+                'ultima_data': resumo.loc[categoria, 'ultima_data']
             }
         
         return resumo_dict
@@ -176,40 +348,56 @@ class CategorizadorDespesas:
         """
         Mostra estatísticas de como as regras foram aplicadas.
         
+        Usa o mesmo caminho em lote de processar_debitos (índice de
+        documentos e, para as demais linhas, cada razão social distinta
+        categorizada uma vez, com o memo), sem alimentar os contadores
+        persistentes de self.estatisticas.
+        
         Args:
-            transacoes (list): Lista de transações
+            transacoes (iterable | pd.DataFrame): Transações (lista, gerador
+                ou lote colunar)
             
         Returns:
-            dict: Estatísticas das regras aplicadas
+            dict: Estatísticas das regras aplicadas ('regras_aplicadas':
+            {categoria: {palavra-chave: quantidade}})
         """
-        debitos = [t for t in transacoes if t['Valor'] < 0]
-        
         stats = {
-            'total_debitos': len(debitos),
+            'total_debitos': 0,
             'por_categoria': {},
             'regras_aplicadas': {}
         }
         
-        for transacao in debitos:
-            categoria = self.categorizar_despesa(transacao['Razao Social'])
-            
-            # Contar por categoria
-            if categoria not in stats['por_categoria']:
-                stats['por_categoria'][categoria] = {
-                    'quantidade': 0,
-                    'valor_total': 0,
-                    'exemplos': []
-                }
-            
-            stats['por_categoria'][categoria]['quantidade'] += 1
-            stats['por_categoria'][categoria]['valor_total'] += abs(transacao['Valor'])
-            
-            # Adicionar exemplo (máximo 3 por categoria)
-            if len(stats['por_categoria'][categoria]['exemplos']) < 3:
-                stats['por_categoria'][categoria]['exemplos'].append({
-                    'razao_social': transacao['Razao Social'],
-                    'valor': abs(transacao['Valor'])
-                })
+        lote = montar_lote_colunar(transacoes)
+        if lote.empty:
+            return stats
+        
+        debitos = lote[lote['Valor'] < 0]
+        if debitos.empty:
+            return stats
+        
+        razao_social = debitos['Razao Social'].astype(str)
+        centavos = self._centavos_debitos(debitos)
+        documentos = coluna_documentos(debitos['CNPJ/CPF']) if 'CNPJ/CPF' in debitos.columns else None
+        
+        # Contadores só desta chamada (não vão para o arquivo de estatísticas)
+        uso = EstatisticasRegras()
+        categorias = self._categorizar_linhas(razao_social, documentos, centavos, uso)
+        stats['total_debitos'] = len(debitos)
+        
+        for categoria, grupo in centavos.groupby(categorias, sort=False):
+            stats['por_categoria'][categoria] = {
+                'quantidade': len(grupo),
+                # Total acumulado em centavos, convertido uma única vez
+                'valor_total': centavos_para_reais(int(grupo.sum())),
+                # Exemplos (máximo 3 por categoria), na ordem das transações
+                'exemplos': [
+                    {'razao_social': razao_social[indice], 'valor': centavos_para_reais(int(valor))}
+                    for indice, valor in grupo.head(3).items()
+                ]
+            }
+        
+        for categoria, palavras in uso.carregar()['regras'].items():
+            stats['regras_aplicadas'][categoria] = {palavra: contador[0] for palavra, contador in palavras.items()}
         
         return stats
 
@@ -1,6 +1,47 @@
+import os
 import re
 import pandas as pd
 from datetime import datetime
+from extrator_ofx import formatar_datas
+from dinheiro import COLUNA_CENTAVOS, para_centavos, centavos_para_reais, serie_centavos, resumir_centavos
+from contas import COLUNAS_CONTA
+from regras_categorizacao import ARQUIVO_REGRAS, obter_regras
+from memo_categorizacao import obter_memo
+from indice_documentos import NOME_ARQUIVO_INDICE, coluna_documentos, normalizar_documento, obter_indice
+
+# Contador de self.estatisticas de cada tipo de preenchimento
+CONTADOR_POR_TIPO = {
+    'cartao_credito': 'cartao_credito',
+    'fonte_pagamento': 'preenchimento_manual',
+    'automatico_mapeado': 'preenchimento_automatico',
+    'sugestao_aproximada': 'preenchimento_manual',
+    'manual': 'preenchimento_manual',
+    'automatico': 'preenchimento_automatico'
+}
+
+# Fonte de pagamento das receitas de cartão (tipo 'cartao_credito', que
+# pode ser dividida entre pacientes)
+FONTE_CARTAO_CREDITO = 'Cartão de Crédito'
+
+# Motivo das receitas com paciente sugerido pela busca aproximada
+PREFIXO_SUGESTAO = 'Sugestão por nome parecido'
+
+
+def paciente_sugerido(receita):
+    """
+    Paciente sugerido pela busca aproximada para uma receita pendente.
+    
+    Args:
+        receita (dict | pd.Series): Registro com Tipo_Preenchimento e
+            Motivo_Categorizacao
+        
+    Returns:
+        str: Paciente sugerido ou '' se a receita não tiver sugestão
+    """
+    motivo = receita.get('Motivo_Categorizacao')
+    if receita.get('Tipo_Preenchimento') != 'sugestao_aproximada' or not isinstance(motivo, str):
+        return ''
+    return motivo.rpartition(' → ')[2].strip()
 
 class CategorizadorReceitasSimples:
     """
@@ -9,57 +50,46 @@ class CategorizadorReceitasSimples:
     - Fonte de Pagamento: Como foi pago (Cartão de Crédito, Particular, etc.)
     """
     
-    def __init__(self):
+    def __init__(self, arquivo_regras=ARQUIVO_REGRAS, memo=None, indice=None):
+        """
+        Args:
+            arquivo_regras (str): JSON com as regras de categorização
+            memo (MemoCategorizacao, optional): Memo por razão social; por
+                padrão, o memo de receitas compartilhado pelo processo
+            indice (IndiceDocumentos, optional): Índice CNPJ/CPF -> paciente;
+                por padrão, o indice_documentos.json ao lado do arquivo de regras
+        """
         self.receitas = []
+        self._df_receitas = None
         
-        # Regras específicas para Fonte de Pagamento
-        self.regras_fonte_pagamento = {
-            'REDE': 'Cartão de Crédito'
-        }
+        # Regras e mapeamentos de dados_persistentes/regras_categorizacao.json
+        # (EDITÁVEL: a alteração vale na próxima categorização, sem reiniciar)
+        regras = obter_regras(arquivo_regras)
+        
+        # Regras específicas para Fonte de Pagamento (trecho -> fonte)
+        self.regras_fonte_pagamento = regras.fonte_pagamento
+        self._casador_fonte_pagamento = regras.casador_fonte_pagamento
         
         # MAPEAMENTO AUTOMÁTICO: Razão Social -> Paciente Real
-        # EDITÁVEL: Adicione ou edite os mapeamentos conforme necessário
-        # Formato: 'RAZÃO SOCIAL PAGADORA': 'NOME DO PACIENTE REAL'
-        self.mapeamento_razao_paciente = {
-            'CARLOS HENRIQUE FRANGO': 'ANNA LUÍZA MONDIN MONTANHA',
-            'FELIPE CUNHA MATOS': 'LETÍCIA P. S. MATTOS',
-            'KARLOS ALEXANDRE OLIVEIRA': 'TÂNIA MARA BARRETO ALVES',
-            'KAREN SILVA DE MELO': 'DONA AUGUSTA',
-            'MATHEUS SILVA BERNARDES': 'ESTER ROCHA SANTOS DE OLIVEIRA',
-            'ALESSANDRA CRISTINE VAZ SANTOS': 'SÔNIA CRISTINA VAZ SANTOS',
-            'SOLUÇÃO ELETRONICA MOTO PEÇA': 'APARECIDA',
-            'LMCC DA COSTA LUANA': 'LUANA MACHADO DE CAMPOS',
-            'GPBR PARTICIPACOES LTDA': 'GYMPASS',
-            'PIX QRS NATALIA SIL': 'NATÁLIA SILVEIRA RODRIGUES DE OLIVEIRA',
-            'ELSON DA SILVA LIMA': 'LÚCIA KURDIAN',
-            'RAFAEL GOHN ALVES': 'PATRÍCIA REYNOZO',
-            'RICARDO DA COSTA SILVA': 'GLAUCE LEANDRO E LUCINEIA LEANDRO',
-            'LORRAN MORAES SARENTO': 'LAÍS CECÍLIO DA COSTA',
-            'ADRIANA CRISTINE VAZ SANTOS': 'SÔNIA CRISTINA VAZ SANTOS',
-            'GILBERTO ALVES SILVA': 'LARISSSA DA VEIGA AMARAL',
-        }
+        self.mapeamento_razao_paciente = regras.mapeamento_razao_paciente
 
         # Mapeamento flexível para busca parcial (chave de busca -> chave completa do mapeamento)
-        # EDITÁVEL: Adicione variações de nomes que podem aparecer no extrato
-        self.mapeamento_flexivel = {
-            'FELIPE CUNHA': 'FELIPE CUNHA MATOS',
-            'KARLOS ALEXANDRE': 'KARLOS ALEXANDRE OLIVEIRA',
-            'CARLOS HENRIQUE': 'CARLOS HENRIQUE FRANGO',
-            'SOLUCAO ELETRONICA': 'SOLUÇÃO ELETRONICA MOTO PEÇA',
-            'KAREN SILVA': 'KAREN SILVA DE MELO',
-            'MATHEUS SILVA': 'MATHEUS SILVA BERNARDES',
-            'LMCC DA COSTA': 'LMCC DA COSTA LUANA',
-            'GPBR PARTICIPACOES': 'GPBR PARTICIPACOES LTDA',
-            'ALESSANDRA CRISTINE': 'ALESSANDRA CRISTINE VAZ SANTOS',
-            'NATALIA SIL': 'PIX QRS NATALIA SIL',
-            'ELSON DA SILVA': 'ELSON DA SILVA LIMA',
-            'RAFAEL GOHN': 'RAFAEL GOHN ALVES',
-            'RICARDO DA COSTA': 'RICARDO DA COSTA SILVA',
-            'LORRAN MORAES': 'LORRAN MORAES SARENTO',
-            'ALESSANDRA CRISTINE': 'ALESSANDRA CRISTINE VAZ SANTOS',
-            'ADRIANA CRISTINE': 'ADRIANA CRISTINE VAZ SANTOS',
-            'GILBERTO ALVES': 'GILBERTO ALVES SILVA',
-        }
+        self.mapeamento_flexivel = regras.mapeamento_flexivel
+        self._casador_flexivel = regras.casador_flexivel
+
+        # Busca aproximada (trigramas) nos pagadores do mapeamento, para
+        # grafias que nenhum trecho do mapeamento flexível cobre
+        self._indice_pagadores = regras.indice_pagadores
+        self.versao_regras = regras.versao
+        
+        # Razão social limpa e categorização de cada razão social original
+        # (esvaziado quando as regras mudam)
+        self.memo = memo if memo is not None else obter_memo('receitas', arquivo_regras=arquivo_regras)
+        
+        # Pagadores já confirmados (por CNPJ/CPF): consultados antes das regras
+        if indice is None:
+            indice = obter_indice(os.path.join(os.path.dirname(os.path.abspath(arquivo_regras)), NOME_ARQUIVO_INDICE))
+        self.indice = indice
         
         # Estatísticas do processamento
         self.estatisticas = {
@@ -119,46 +149,74 @@ class CategorizadorReceitasSimples:
         Returns:
             dict: Resultado da categorização
         """
-        # Regra 1: REDE -> Cartão de Crédito
-        if 'REDE' in razao_social_limpa.upper():
-            self.estatisticas['cartao_credito'] += 1
+        razao_upper = razao_social_limpa.upper()
+        
+        # Regra 1: Trecho de fonte_pagamento (ex.: REDE -> Cartão de Crédito),
+        # paciente para preenchimento manual
+        trecho = self._casador_fonte_pagamento.buscar(razao_upper)
+        if trecho is not None:
+            fonte = self.regras_fonte_pagamento[trecho]
+            if fonte == FONTE_CARTAO_CREDITO:
+                self.estatisticas['cartao_credito'] += 1
+                return {
+                    'paciente': '',
+                    'fonte_pagamento': fonte,
+                    'tipo_preenchimento': 'cartao_credito',
+                    'requer_preenchimento_manual': True,
+                    'motivo': 'Cartão de crédito - paciente para preenchimento manual'
+                }
+            
+            self.estatisticas['preenchimento_manual'] += 1
             return {
                 'paciente': '',
-                'fonte_pagamento': 'Cartão de Crédito',
-                'tipo_preenchimento': 'cartao_credito',
+                'fonte_pagamento': fonte,
+                'tipo_preenchimento': 'fonte_pagamento',
                 'requer_preenchimento_manual': True,
-                'motivo': 'Cartão de crédito - paciente para preenchimento manual'
+                'motivo': f'{fonte} ({trecho}) - paciente para preenchimento manual'
             }
         
         # Regra 2: Lista específica -> Mapeamento automático (busca flexível)
-        razao_upper = razao_social_limpa.upper()
-        
-        # Buscar por mapeamento flexível
-        for busca, razao_completa in self.mapeamento_flexivel.items():
-            if busca in razao_upper:
-                # Obter o paciente real do mapeamento
-                paciente_real = self.mapeamento_razao_paciente.get(razao_completa, '')
-                
-                # Se paciente está mapeado (não vazio), preencher automaticamente
-                if paciente_real:
-                    self.estatisticas['preenchimento_automatico'] += 1
-                    return {
-                        'paciente': paciente_real,
-                        'fonte_pagamento': 'Particular',
-                        'tipo_preenchimento': 'automatico_mapeado',
-                        'requer_preenchimento_manual': False,
-                        'motivo': f'Mapeamento automático: {razao_completa} → {paciente_real}'
-                    }
-                # Se paciente não está mapeado (vazio), requer preenchimento manual
-                else:
-                    self.estatisticas['preenchimento_manual'] += 1
-                    return {
-                        'paciente': '',
-                        'fonte_pagamento': '',
-                        'tipo_preenchimento': 'manual',
-                        'requer_preenchimento_manual': True,
-                        'motivo': f'Lista específica sem mapeamento - {razao_completa}'
-                    }
+        # Buscar por mapeamento flexível (primeiro trecho, na ordem do mapeamento)
+        busca = self._casador_flexivel.buscar(razao_upper)
+        if busca is not None:
+            razao_completa = self.mapeamento_flexivel[busca]
+            # Obter o paciente real do mapeamento
+            paciente_real = self.mapeamento_razao_paciente.get(razao_completa, '')
+            
+            # Se paciente está mapeado (não vazio), preencher automaticamente
+            if paciente_real:
+                self.estatisticas['preenchimento_automatico'] += 1
+                return {
+                    'paciente': paciente_real,
+                    'fonte_pagamento': 'Particular',
+                    'tipo_preenchimento': 'automatico_mapeado',
+                    'requer_preenchimento_manual': False,
+                    'motivo': f'Mapeamento automático: {razao_completa} → {paciente_real}'
+                }
+            # Se paciente não está mapeado (vazio), requer preenchimento manual
+            else:
+                self.estatisticas['preenchimento_manual'] += 1
+                return {
+                    'paciente': '',
+                    'fonte_pagamento': '',
+                    'tipo_preenchimento': 'manual',
+                    'requer_preenchimento_manual': True,
+                    'motivo': f'Lista específica sem mapeamento - {razao_completa}'
+                }
+        
+        # Regra 2b: Pagador parecido com um do mapeamento -> paciente dele
+        # como sugestão, confirmada no preenchimento manual
+        aproximado = self._indice_pagadores.buscar(razao_upper)
+        if aproximado is not None:
+            paciente_real, razao_completa, confianca = aproximado
+            self.estatisticas['preenchimento_manual'] += 1
+            return {
+                'paciente': '',
+                'fonte_pagamento': '',
+                'tipo_preenchimento': 'sugestao_aproximada',
+                'requer_preenchimento_manual': True,
+                'motivo': f'{PREFIXO_SUGESTAO} ({confianca:.0%}): {razao_completa} → {paciente_real}'
+            }
         
         # Regra 3: Demais -> Preenchimento automático
         self.estatisticas['preenchimento_automatico'] += 1
@@ -175,15 +233,17 @@ class CategorizadorReceitasSimples:
         Processa e categoriza todas as receitas (créditos) das transações.
         
         Args:
-            transacoes (list): Lista de transações do extrator OFX
+            transacoes (iterable | pd.DataFrame): Transações do extrator OFX
+                (lista, gerador de ExtratorOFX.iter_transacoes ou lote
+                colunar de montar_lote_colunar)
             
         Returns:
             pd.DataFrame: DataFrame com receitas categorizadas
         """
         receitas_categorizadas = []
         
-        # Filtrar apenas créditos (valores positivos)
-        creditos = [t for t in transacoes if t['Valor'] > 0]
+        # Filtrar apenas créditos (valores positivos) sem materializar a lista
+        creditos = self._iterar_creditos(transacoes)
         
         # Resetar estatísticas
         self.estatisticas = {
@@ -193,43 +253,146 @@ class CategorizadorReceitasSimples:
             'preenchimento_automatico': 0
         }
         
-        for transacao in creditos:
-            # Extrair dados básicos
-            data = transacao['Data']
-            razao_social_original = transacao.get('Razao Social', '')
-            valor = transacao['Valor']
-            
-            # Limpar razão social
-            razao_social_limpa = self._limpar_razao_social(razao_social_original)
-            
-            # Aplicar regras de categorização
-            resultado_categorizacao = self._aplicar_regras_categorizacao(razao_social_limpa)
+        self.indice.atualizar()
+        
+        for data, razao_social_original, centavos, fitid, conta, documento in creditos:
+            # Pagador já confirmado pelo documento; senão, regras (com memo)
+            resultado_categorizacao = self._categorizar_documento(documento)
+            if resultado_categorizacao is not None:
+                razao_social_limpa = self._limpar_razao_social(razao_social_original)
+            else:
+                razao_social_limpa, resultado_categorizacao = self._categorizar_razao_social(razao_social_original)
             
             # Criar registro da receita
             receita = {
                 'Data': data,
                 'Razao_Social_Original': razao_social_original,
                 'Razao_Social_Limpa': razao_social_limpa,
-                'Valor': valor,
+                'Valor': centavos_para_reais(centavos),
+                COLUNA_CENTAVOS: centavos,
                 'Paciente': resultado_categorizacao['paciente'],
                 'Fonte_Pagamento': resultado_categorizacao['fonte_pagamento'],
                 'Tipo_Preenchimento': resultado_categorizacao['tipo_preenchimento'],
                 'Requer_Preenchimento_Manual': resultado_categorizacao['requer_preenchimento_manual'],
                 'Motivo_Categorizacao': resultado_categorizacao['motivo'],
-                'Data_Processamento': datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+                'Data_Processamento': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+                'FITID': fitid,
+                'CNPJ_CPF': documento,
+                # Conta de origem: define a partição em que a receita é gravada
+                **dict(zip(COLUNAS_CONTA, conta))
             }
             
             receitas_categorizadas.append(receita)
             self.estatisticas['total_creditos'] += 1
         
+        # Memo em disco (quando configurado) fica disponível para a próxima sessão
+        self.memo.salvar()
+        
         # Converter para DataFrame
         if receitas_categorizadas:
             df_receitas = pd.DataFrame(receitas_categorizadas)
             self.receitas = receitas_categorizadas
+            self._df_receitas = df_receitas
             return df_receitas
         else:
             return pd.DataFrame()
     
+    def _categorizar_documento(self, documento):
+        """
+        Categorização pelo índice de documentos.
+        
+        Args:
+            documento (str): CNPJ/CPF do pagador
+            
+        Returns:
+            dict | None: Resultado no formato de _aplicar_regras_categorizacao
+            ou None se o documento não tiver paciente confirmado
+        """
+        confirmado = self.indice.paciente_receita(normalizar_documento(documento), self.mapeamento_razao_paciente)
+        if confirmado is None:
+            return None
+        
+        paciente, fonte_pagamento, _ = confirmado
+        self.estatisticas['preenchimento_automatico'] += 1
+        return {
+            'paciente': paciente,
+            'fonte_pagamento': fonte_pagamento or 'Particular',
+            'tipo_preenchimento': 'automatico_documento',
+            'requer_preenchimento_manual': False,
+            'motivo': f'CNPJ/CPF já confirmado → {paciente}'
+        }
+    
+    def _categorizar_razao_social(self, razao_social_original):
+        """
+        Limpa e categoriza a razão social, consultando antes o memo.
+        
+        Returns:
+            tuple: (razão social limpa, resultado de _aplicar_regras_categorizacao)
+        """
+        if not isinstance(razao_social_original, str):
+            razao_social_limpa = self._limpar_razao_social(razao_social_original)
+            return razao_social_limpa, self._aplicar_regras_categorizacao(razao_social_limpa)
+        
+        memorizado = self.memo.obter(razao_social_original, self.versao_regras)
+        if memorizado is not None:
+            razao_social_limpa, resultado = memorizado
+            # As estatísticas contam também os créditos vindos do memo
+            self.estatisticas[CONTADOR_POR_TIPO[resultado['tipo_preenchimento']]] += 1
+            return razao_social_limpa, resultado
+        
+        razao_social_limpa = self._limpar_razao_social(razao_social_original)
+        resultado = self._aplicar_regras_categorizacao(razao_social_limpa)
+        self.memo.guardar(razao_social_original, self.versao_regras, [razao_social_limpa, resultado])
+        return razao_social_limpa, resultado
+    
+    def _iterar_creditos(self, transacoes):
+        """
+        Gera (data, razão social, valor em centavos, FITID, conta, CNPJ/CPF)
+        de cada crédito; conta é a tupla (Banco, Agencia, Conta).
+        
+        Um lote colunar é percorrido direto pelas colunas, sem criar um
+        dict por transação.
+        """
+        if isinstance(transacoes, pd.DataFrame):
+            creditos = transacoes[transacoes['Valor'] > 0]
+            fitids = creditos['FITID'].astype(str) if 'FITID' in creditos.columns else [''] * len(creditos)
+            if COLUNA_CENTAVOS in creditos.columns:
+                centavos = creditos[COLUNA_CENTAVOS].astype('int64')
+            else:
+                centavos = serie_centavos(creditos['Valor'])
+            contas = zip(*[
+                creditos[coluna].astype(str) if coluna in creditos.columns else [''] * len(creditos)
+                for coluna in COLUNAS_CONTA
+            ])
+            documentos = coluna_documentos(creditos['CNPJ/CPF']) if 'CNPJ/CPF' in creditos.columns else [''] * len(creditos)
+            return zip(
+                formatar_datas(creditos['Data']),
+                creditos['Razao Social'].astype(str),
+                centavos.tolist(),
+                fitids,
+                contas,
+                documentos
+            )
+        
+        return (
+            (t['Data'], t.get('Razao Social', ''), self._centavos_transacao(t), t.get('FITID', ''),
+             tuple(t.get(coluna, '') for coluna in COLUNAS_CONTA), normalizar_documento(t.get('CNPJ/CPF')))
+            for t in transacoes if t['Valor'] > 0
+        )
+    
+    def _centavos_transacao(self, transacao):
+        """Valor exato da transação em centavos (usa Valor_Centavos quando presente)."""
+        centavos = transacao.get(COLUNA_CENTAVOS)
+        if centavos is None:
+            centavos = para_centavos(transacao['Valor'])
+        return int(centavos)
+    
+    def _obter_df_receitas(self):
+        """DataFrame das receitas processadas, montado uma única vez."""
+        if self._df_receitas is None or len(self._df_receitas) != len(self.receitas):
+            self._df_receitas = pd.DataFrame(self.receitas)
+        return self._df_receitas
+    
     def obter_estatisticas(self):
         """
         Retorna estatísticas do processamento.
@@ -249,23 +412,20 @@ class CategorizadorReceitasSimples:
         if not self.receitas:
             return {}
         
-        df = pd.DataFrame(self.receitas)
+        df = self._obter_df_receitas()
         
         resumo = {}
         
         # Agrupar por tipo de preenchimento
-        tipos = df.groupby('Tipo_Preenchimento').agg({
-            'Valor': ['sum', 'count', 'mean'],
-            'Data': ['min', 'max']
-        }).round(2)
+        tipos = resumir_centavos(df, 'Tipo_Preenchimento')
         
         for tipo in tipos.index:
             resumo[tipo] = {
-                'total': tipos.loc[tipo, ('Valor', 'sum')],
-                'quantidade': tipos.loc[tipo, ('Valor', 'count')],
-                'media': tipos.loc[tipo, ('Valor', 'mean')],
-                'primeira_data': tipos.loc[tipo, ('Data', 'min')],
-                'ultima_data': tipos.loc[tipo, ('Data', 'max')]
+                'total': tipos.loc[tipo, 'total'],
+                'quantidade': tipos.loc[tipo, 'quantidade'],
+                'media': tipos.loc[tipo, 'media'],
+                'primeira_data': tipos.loc[tipo, 'primeira_data'],
+                'ultima_data': tipos.loc[tipo, 'ultima_data']
             }
         
         return resumo
@@ -280,7 +440,7 @@ class CategorizadorReceitasSimples:
         if not self.receitas:
             return {}
         
-        df = pd.DataFrame(self.receitas)
+        df = self._obter_df_receitas()
         
         # Filtrar apenas receitas com paciente preenchido
         df_com_paciente = df[df['Paciente'] != '']
@@ -291,10 +451,7 @@ class CategorizadorReceitasSimples:
         resumo = {}
         
         # Agrupar por paciente
-        pacientes = df_com_paciente.groupby('Paciente').agg({
-            'Valor': ['sum', 'count', 'mean'],
-            'Data': ['min', 'max']
-        }).round(2)
+        pacientes = resumir_centavos(df_com_paciente, 'Paciente')
         
         for paciente in pacientes.index:
             # Obter todas as datas desse paciente
@@ -321,11 +478,11 @@ class CategorizadorReceitasSimples:
                             pass  # Ignorar datas que não podem ser convertidas
             
             resumo[paciente] = {
-                'total': pacientes.loc[paciente, ('Valor', 'sum')],
-                'quantidade': pacientes.loc[paciente, ('Valor', 'count')],
-                'media': pacientes.loc[paciente, ('Valor', 'mean')],
-                'primeira_data': pacientes.loc[paciente, ('Data', 'min')],
-                'ultima_data': pacientes.loc[paciente, ('Data', 'max')],
+                'total': pacientes.loc[paciente, 'total'],
+                'quantidade': pacientes.loc[paciente, 'quantidade'],
+                'media': pacientes.loc[paciente, 'media'],
+                'primeira_data': pacientes.loc[paciente, 'primeira_data'],
+                'ultima_data': pacientes.loc[paciente, 'ultima_data'],
                 'todas_datas': ', '.join(datas_formatadas) if datas_formatadas else 'Nenhuma data disponível'
             }
 
@@ -343,7 +500,7 @@ class CategorizadorReceitasSimples:
         if not self.receitas:
             return {}
         
-        df = pd.DataFrame(self.receitas)
+        df = self._obter_df_receitas()
         
         # Filtrar apenas receitas com fonte preenchida
         df_com_fonte = df[df['Fonte_Pagamento'] != '']
@@ -354,18 +511,15 @@ class CategorizadorReceitasSimples:
         resumo = {}
         
         # Agrupar por fonte de pagamento
-        fontes = df_com_fonte.groupby('Fonte_Pagamento').agg({
-            'Valor': ['sum', 'count', 'mean'],
-            'Data': ['min', 'max']
-        }).round(2)
+        fontes = resumir_centavos(df_com_fonte, 'Fonte_Pagamento')
         
         for fonte in fontes.index:
             resumo[fonte] = {
-                'total': fontes.loc[fonte, ('Valor', 'sum')],
-                'quantidade': fontes.loc[fonte, ('Valor', 'count')],
-                'media': fontes.loc[fonte, ('Valor', 'mean')],
-                'primeira_data': fontes.loc[fonte, ('Data', 'min')],
-                'ultima_data': fontes.loc[fonte, ('Data', 'max')]
+                'total': fontes.loc[fonte, 'total'],
+                'quantidade': fontes.loc[fonte, 'quantidade'],
+                'media': fontes.loc[fonte, 'media'],
+                'primeira_data': fontes.loc[fonte, 'primeira_data'],
+                'ultima_data': fontes.loc[fonte, 'ultima_data']
             }
         
         return resumo
@@ -380,7 +534,7 @@ class CategorizadorReceitasSimples:
         if not self.receitas:
             return pd.DataFrame()
         
-        df = pd.DataFrame(self.receitas)
+        df = self._obter_df_receitas()
         return df[df['Requer_Preenchimento_Manual'] == True].copy()
     
     def salvar_csv(self, nome_arquivo='receitas_categorizadas.csv'):
@@ -394,7 +548,7 @@ class CategorizadorReceitasSimples:
             bool: True se salvou com sucesso
         """
         if self.receitas:
-            df = pd.DataFrame(self.receitas)
+            df = self._obter_df_receitas()
             df.to_csv(nome_arquivo, index=False, encoding='utf-8')
             return True
         return False
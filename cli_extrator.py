@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Importação de extratos pela linha de comando (sem Streamlit).
+
+Executa o mesmo fluxo das páginas do app: extração dos OFX →
+categorização de despesas e receitas → gravação nas tabelas persistentes
+→ (opcional) fechamento dos meses. Mostra o tempo de cada etapa e termina
+com código de saída diferente de zero se algo falhar, para uso em cron.
+
+Uso:
+    python cli_extrator.py extratos/*.ofx
+    python cli_extrator.py inbox/ --fechar              # fecha os meses importados
+    python cli_extrator.py lote.zip --fechar 03/2025 --sobrescrever-fechamento
+    python cli_extrator.py --fechar 02/2025             # só o fechamento
+    python cli_extrator.py --recategorizar --fechar 02/2025  # aplica regras novas ao histórico
+    python cli_extrator.py extrato_diario.ofx --completo     # ignora a marca incremental da conta
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+from contextlib import contextmanager
+
+import pandas as pd
+
+from extrator_ofx import ExtratorOFX, montar_lote_colunar, nome_fonte, suporta_leitura_incremental
+from ingestao_lote import ProcessadorLoteOFX
+from estado_incremental import EstadoIncremental
+from cache_ofx import CacheOFX
+from categorizador_despesas import CategorizadorDespesas
+from categorizador_receitas_simples import CategorizadorReceitasSimples
+from gerenciador_persistencia_unificado import GerenciadorPersistenciaUnificado
+from gerenciador_resultado import GerenciadorResultado
+from recategorizacao import RecategorizadorHistorico
+from regras_categorizacao import NOME_ARQUIVO_REGRAS
+from memo_categorizacao import ARQUIVOS_MEMO, obter_memo
+from estatisticas_regras import NOME_ARQUIVO_ESTATISTICAS, EstatisticasRegras
+
+# Códigos de saída
+SAIDA_OK = 0
+SAIDA_FALHA = 1
+
+RE_MES_ANO = re.compile(r'^(0[1-9]|1[0-2])/\d{4}$')
+
+
+class FalhaEtapa(Exception):
+    """Erro que interrompe a importação (vira código de saída SAIDA_FALHA)."""
+
+
+class PipelineImportacao:
+    """
+    Fluxo completo de importação de um lote de extratos.
+
+    Cada etapa é cronometrada em self.tempos (segundos por etapa, na ordem
+    de execução).
+
+    Com `incremental`, arquivos .ofx no disco são lidos a partir da marca
+    da conta no EstadoIncremental (só as transações novas do extrato
+    cumulativo); .gz, .zip e diretórios com esses formatos seguem pelo
+    ProcessadorLoteOFX.
+    """
+
+    def __init__(self, diretorio_dados='dados_persistentes', max_workers=None, usar_cache=True, incremental=True):
+        self.diretorio_dados = diretorio_dados
+        self.max_workers = max_workers
+        self.usar_cache = usar_cache
+        self.incremental = incremental
+
+        self.gerenciador = GerenciadorPersistenciaUnificado(diretorio_dados)
+        self.arquivo_regras = os.path.join(diretorio_dados, NOME_ARQUIVO_REGRAS)
+        # Memos em disco: execuções seguidas (cron) reaproveitam as categorizações
+        self.memos = {nome: obter_memo(nome, os.path.join(diretorio_dados, arquivo),
+                                       arquivo_regras=self.arquivo_regras)
+                      for nome, arquivo in ARQUIVOS_MEMO.items()}
+        # Uso das regras de despesas, acumulado entre importações
+        self.estatisticas_regras = EstatisticasRegras(os.path.join(diretorio_dados, NOME_ARQUIVO_ESTATISTICAS))
+        self.estado_incremental = EstadoIncremental(os.path.join(diretorio_dados, 'estado_incremental.json'))
+        self.tempos = {}
+
+    @contextmanager
+    def etapa(self, nome):
+        """Soma a duração do bloco ao tempo da etapa."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tempos[nome] = self.tempos.get(nome, 0.0) + time.perf_counter() - inicio
+
+    def importar(self, entradas, mes_ano=None):
+        """
+        Extrai, categoriza e grava as transações de um lote de arquivos.
+
+        Args:
+            entradas (list): Arquivos .ofx/.gz/.zip ou diretórios
+            mes_ano (str, optional): Mês de referência (MM/AAAA) para todos os
+                registros; se omitido, cada registro usa o mês da própria data
+
+        Returns:
+            dict: Resumo com novas_despesas, novas_receitas, meses, arquivos
+            e avisos da leitura ({'arquivo', 'aviso'})
+
+        Raises:
+            FalhaEtapa: Se algum arquivo falhar ou a gravação der erro
+        """
+        processador = ProcessadorLoteOFX(max_workers=self.max_workers)
+        arquivos = processador.listar_arquivos(entradas)
+        if not arquivos:
+            raise FalhaEtapa('Nenhum arquivo OFX encontrado')
+
+        incrementais = [arquivo for arquivo in arquivos if self.incremental and suporta_leitura_incremental(arquivo)]
+        demais = [arquivo for arquivo in arquivos if arquivo not in incrementais]
+
+        resumo = {'novas_despesas': 0, 'novas_receitas': 0, 'meses': set(), 'avisos': []}
+
+        if demais:
+            with self.etapa('extracao'):
+                if self.usar_cache:
+                    processador.cache = CacheOFX(os.path.join(self.diretorio_dados, 'cache_ofx'))
+                lote = processador.processar(demais)
+
+            if not lote['sucesso']:
+                erros = lote['erros'] or [{'arquivo': '-', 'erro': lote.get('erro', 'falha na extração')}]
+                raise FalhaEtapa('; '.join(f"{erro['arquivo']}: {erro['erro']}" for erro in erros))
+            resumo['avisos'].extend(lote['avisos'])
+
+            with self.etapa('lote_colunar'):
+                transacoes = montar_lote_colunar(lote['transacoes'])
+
+            # Cada arquivo é gravado com a própria origem (como no monitor da inbox)
+            if not transacoes.empty:
+                for origem, grupo in transacoes.groupby('Arquivo_Origem', sort=False, observed=True):
+                    self._gravar_extrato(origem, grupo, mes_ano, resumo)
+
+        # Extratos cumulativos: um arquivo por vez, e a marca da conta só é
+        # gravada depois das transações, para o próximo arquivo da mesma
+        # conta continuar de onde este parou
+        for caminho in incrementais:
+            origem = nome_fonte(caminho)
+            extrator = ExtratorOFX()
+            with self.etapa('extracao'):
+                try:
+                    novas = extrator.processar_arquivo_incremental(caminho, self.estado_incremental)
+                except Exception as e:
+                    raise FalhaEtapa(f'{origem}: {e}')
+                resumo['avisos'].extend({'arquivo': origem, 'aviso': aviso} for aviso in extrator.avisos)
+                for transacao in novas:
+                    transacao['Arquivo_Origem'] = origem
+
+            if novas:
+                with self.etapa('lote_colunar'):
+                    grupo = montar_lote_colunar(novas)
+                self._gravar_extrato(origem, grupo, mes_ano, resumo)
+
+            if extrator.marca_incremental is not None:
+                self.estado_incremental.registrar(*extrator.marca_incremental)
+
+        return {
+            'novas_despesas': resumo['novas_despesas'],
+            'novas_receitas': resumo['novas_receitas'],
+            'meses': sorted(resumo['meses'], key=lambda mes: (mes[3:], mes[:2])),
+            'arquivos': len(arquivos),
+            'avisos': resumo['avisos']
+        }
+
+    def _gravar_extrato(self, origem, grupo, mes_ano, resumo):
+        """
+        Categoriza as transações de um extrato e acrescenta nas tabelas.
+
+        Args:
+            origem (str): Nome do arquivo de origem
+            grupo (pd.DataFrame): Lote colunar do extrato
+            mes_ano (str | None): Mês de referência (ver importar)
+            resumo (dict): Totais da importação, atualizados aqui
+
+        Raises:
+            FalhaEtapa: Se a gravação der erro
+        """
+        with self.etapa('categorizacao_despesas'):
+            despesas = CategorizadorDespesas(
+                arquivo_regras=self.arquivo_regras, memo=self.memos['despesas'],
+                estatisticas=self.estatisticas_regras
+            ).processar_debitos(grupo)
+        with self.etapa('categorizacao_receitas'):
+            receitas = CategorizadorReceitasSimples(
+                self.arquivo_regras, memo=self.memos['receitas']
+            ).processar_creditos(grupo)
+
+        for tabela in (despesas, receitas):
+            if not tabela.empty:
+                tabela['Mes_Ano'] = mes_ano or tabela['Data'].str[3:]
+
+        with self.etapa('persistencia'):
+            if not despesas.empty:
+                resultado = self.gerenciador.salvar_despesas(despesas, origem, modo='adicionar')
+                if not resultado['sucesso']:
+                    raise FalhaEtapa(f"Erro ao salvar despesas de {origem}: {resultado['erro']}")
+                resumo['novas_despesas'] += resultado['novas_despesas']
+                # Só os meses que ganharam registros (repetidos não contam)
+                resumo['meses'].update(resultado['meses'])
+
+            if not receitas.empty:
+                resultado = self.gerenciador.salvar_receitas(receitas, origem, modo='adicionar')
+                if not resultado['sucesso']:
+                    raise FalhaEtapa(f"Erro ao salvar receitas de {origem}: {resultado['erro']}")
+                resumo['novas_receitas'] += resultado['novas_receitas']
+                resumo['meses'].update(resultado['meses'])
+
+    def fechar_meses(self, meses, sobrescrever=False):
+        """
+        Fecha os meses informados a partir das tabelas persistentes.
+
+        Args:
+            meses (list): Meses no formato MM/AAAA
+            sobrescrever (bool): Substitui fechamentos já existentes
+
+        Returns:
+            list: Resultado de cada fechamento
+
+        Raises:
+            FalhaEtapa: Se um mês já estiver fechado (sem sobrescrever) ou
+                o cálculo/gravação falhar
+        """
+        with self.etapa('fechamento'):
+            gerenciador_resultado = GerenciadorResultado(self.diretorio_dados)
+            despesas = self._com_data(self.gerenciador.carregar_despesas())
+            receitas = self._com_data(self.gerenciador.carregar_receitas())
+
+            fechamentos = []
+            for mes_ano in meses:
+                existente = gerenciador_resultado.obter_resultado_mes(mes_ano)
+                if existente and not sobrescrever:
+                    raise FalhaEtapa(f'Já existe fechamento para {mes_ano} (use --sobrescrever-fechamento)')
+
+                resultado = gerenciador_resultado.calcular_resultado_mes(
+                    mes_ano, self._do_mes(receitas, mes_ano), self._do_mes(despesas, mes_ano)
+                )
+                if 'erro' in resultado:
+                    raise FalhaEtapa(f"Erro ao calcular {mes_ano}: {resultado['erro']}")
+
+                if existente:
+                    salvo = gerenciador_resultado.sobrescrever_fechamento(resultado, 'Fechamento via linha de comando')
+                else:
+                    salvo = gerenciador_resultado.salvar_fechamento(resultado, 'Fechamento via linha de comando')
+                if not salvo['sucesso']:
+                    raise FalhaEtapa(f"Erro ao salvar fechamento de {mes_ano}: {salvo['erro']}")
+
+                fechamentos.append(resultado)
+
+        return fechamentos
+
+    def recategorizar_historico(self):
+        """
+        Reaplica as regras atuais às tabelas já gravadas.
+
+        Returns:
+            dict: Diff de RecategorizadorHistorico.recategorizar
+
+        Raises:
+            FalhaEtapa: Se a recategorização falhar
+        """
+        with self.etapa('recategorizacao'):
+            resultado = RecategorizadorHistorico(self.diretorio_dados).recategorizar()
+
+        if not resultado['sucesso']:
+            raise FalhaEtapa(f"Erro ao recategorizar o histórico: {resultado['erro']}")
+        return resultado
+
+    def _com_data(self, tabela):
+        if not tabela.empty:
+            tabela['Data_Obj'] = pd.to_datetime(tabela['Data'], format='%d/%m/%Y')
+        return tabela
+
+    def _do_mes(self, tabela, mes_ano):
+        """Registros cuja data cai no mês (mesmo critério da página de resultados)."""
+        if tabela.empty:
+            return pd.DataFrame()
+
+        mes, ano = int(mes_ano[:2]), int(mes_ano[3:])
+        return tabela[(tabela['Data_Obj'].dt.month == mes) & (tabela['Data_Obj'].dt.year == ano)]
+
+
+def mes_ano_valido(valor):
+    if not RE_MES_ANO.match(valor):
+        raise argparse.ArgumentTypeError(f"mês inválido: {valor!r} (use MM/AAAA)")
+    return valor
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        prog='extrator-bancario',
+        description='Importa extratos OFX (categoriza e grava) e, opcionalmente, fecha os meses.'
+    )
+    parser.add_argument('entradas', nargs='*',
+                        help='Arquivos .ofx, .gz ou .zip, ou diretórios com extratos')
+    parser.add_argument('--dados', default='dados_persistentes',
+                        help='Diretório das tabelas persistentes (padrão: dados_persistentes)')
+    parser.add_argument('--mes-ano', type=mes_ano_valido,
+                        help='Grava todos os registros neste mês (MM/AAAA); padrão: mês da data')
+    parser.add_argument('--fechar', nargs='*', type=mes_ano_valido, metavar='MM/AAAA',
+                        help='Fecha os meses informados; sem valores, fecha os meses importados')
+    parser.add_argument('--sobrescrever-fechamento', action='store_true',
+                        help='Substitui fechamentos já existentes')
+    parser.add_argument('--trabalhadores', type=int, default=None,
+                        help='Processos para a extração (padrão: núcleos da máquina)')
+    parser.add_argument('--sem-cache', action='store_true',
+                        help='Não usa o cache de arquivos já processados')
+    parser.add_argument('--completo', action='store_true',
+                        help='Lê os .ofx inteiros, sem continuar da última leitura de cada conta')
+    parser.add_argument('--recategorizar', action='store_true',
+                        help='Reaplica as regras atuais a todo o histórico gravado (antes do fechamento)')
+    return parser
+
+
+def imprimir_tempos(tempos):
+    print("\n=== TEMPOS POR ETAPA ===")
+    for nome, segundos in tempos.items():
+        print(f"{nome:<24}{segundos:>10.3f}s")
+    print(f"{'total':<24}{sum(tempos.values()):>10.3f}s")
+
+
+def main(argv=None):
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+
+    if not args.entradas and not args.fechar and not args.recategorizar:
+        parser.error('informe arquivos para importar, meses em --fechar e/ou --recategorizar')
+    if args.fechar == [] and not args.entradas:
+        parser.error('--fechar sem meses exige arquivos para importar')
+
+    pipeline = PipelineImportacao(args.dados, max_workers=args.trabalhadores, usar_cache=not args.sem_cache,
+                                  incremental=not args.completo)
+    codigo = SAIDA_OK
+
+    try:
+        meses_importados = []
+        if args.entradas:
+            resumo = pipeline.importar(args.entradas, mes_ano=args.mes_ano)
+            meses_importados = resumo['meses']
+            print(f"\n✅ {resumo['arquivos']} arquivos: {resumo['novas_despesas']} despesas e "
+                  f"{resumo['novas_receitas']} receitas novas ({', '.join(meses_importados) or 'nenhum mês'})")
+            for aviso in resumo['avisos']:
+                print(f"⚠️ {aviso['arquivo']}: {aviso['aviso']}", file=sys.stderr)
+            for nome, memo in pipeline.memos.items():
+                uso = memo.estatisticas()
+                print(f"🧠 Memo de {nome}: {uso['acertos']} acertos, {uso['falhas']} falhas "
+                      f"({uso['taxa_acerto']:.0%}), {uso['entradas']} razões sociais")
+
+        if args.recategorizar:
+            diff = pipeline.recategorizar_historico()
+            for tabela in ('despesas', 'receitas'):
+                print(f"🔁 {tabela.capitalize()}: {diff[tabela]['linhas_alteradas']} linhas recategorizadas")
+                for transicao, quantidade in diff[tabela]['transicoes'].items():
+                    print(f"   {transicao or '(vazio)'}: {quantidade}")
+            if diff['meses_desatualizados']:
+                print(f"🔄 Fechamentos desatualizados: {', '.join(diff['meses_desatualizados'])}")
+
+        if args.fechar is not None:
+            meses = args.fechar or meses_importados
+            for resultado in pipeline.fechar_meses(meses, sobrescrever=args.sobrescrever_fechamento):
+                print(f"📈 {resultado['mes_ano']}: receita R$ {resultado['receita_bruta']:,.2f}, "
+                      f"resultado líquido R$ {resultado['resultado_liquido']:,.2f}")
+
+    except FalhaEtapa as e:
+        print(f"❌ {e}", file=sys.stderr)
+        codigo = SAIDA_FALHA
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}", file=sys.stderr)
+        codigo = SAIDA_FALHA
+
+    imprimir_tempos(pipeline.tempos)
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import re
+
+import pandas as pd
+
+# Colunas com a conta de origem (BANKACCTFROM do OFX: BANKID, BRANCHID, ACCTID)
+COLUNAS_CONTA = ['Banco', 'Agencia', 'Conta']
+
+# Subdiretório de dados_persistentes com uma pasta por conta
+DIRETORIO_CONTAS = 'contas'
+
+# Registros sem conta identificada (extratos antigos, lançamentos manuais)
+# ficam nas tabelas da raiz de dados_persistentes
+PARTICAO_RAIZ = ''
+
+RE_CARACTERES_INVALIDOS = re.compile(r'[^0-9A-Za-z]+')
+
+
+def identificador_particao(banco, agencia, conta):
+    """
+    Nome da pasta da conta em dados_persistentes/contas ('BANCO-AGENCIA-CONTA').
+
+    Args:
+        banco (str): BANKID
+        agencia (str): BRANCHID
+        conta (str): ACCTID
+
+    Returns:
+        str: Identificador da partição ou PARTICAO_RAIZ se a conta não for
+        conhecida
+    """
+    partes = [RE_CARACTERES_INVALIDOS.sub('', str(parte or '')) for parte in (banco, agencia, conta)]
+    if not partes[2]:
+        return PARTICAO_RAIZ
+    return '-'.join(parte or '0' for parte in partes)
+
+
+def particoes_da_tabela(df):
+    """
+    Identificador de partição de cada linha de uma tabela.
+
+    Args:
+        df (pd.DataFrame): Tabela com (ou sem) as colunas de COLUNAS_CONTA
+
+    Returns:
+        pd.Series: Identificador de cada linha (PARTICAO_RAIZ quando a
+        conta não é conhecida)
+    """
+    if not all(coluna in df.columns for coluna in COLUNAS_CONTA):
+        return pd.Series(PARTICAO_RAIZ, index=df.index, dtype=object)
+
+    colunas = [df[coluna].fillna('').astype(str) for coluna in COLUNAS_CONTA]
+    return pd.Series(
+        [identificador_particao(*conta) for conta in zip(*colunas)],
+        index=df.index, dtype=object
+    )
+
+
+def garantir_colunas_conta(df):
+    """Cria as colunas de conta ausentes e troca valores vazios por ''."""
+    for coluna in COLUNAS_CONTA:
+        if coluna in df.columns:
+            df[coluna] = df[coluna].fillna('').astype(str)
+        else:
+            df[coluna] = ''
+    return df
@@ -0,0 +1,137 @@
+from numbers import Integral
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+import pandas as pd
+
+# Coluna com o valor em centavos inteiros (int64): é a fonte exata para somas
+# e buscas. A coluna 'Valor' (reais) é mantida apenas para exibição e é sempre
+# derivada dela, de modo que 5896.71 nunca vira 5896.709999999999.
+COLUNA_CENTAVOS = 'Valor_Centavos'
+
+_UM_CENTAVO = Decimal('1')
+
+
+def para_centavos(valor):
+    """
+    Converte um valor em reais para centavos inteiros, sem passar por float.
+
+    Aceita o texto do TRNAMT do OFX ('-123.45', '123,45', '+10'), int,
+    float ou Decimal. Frações de centavo são arredondadas (meio para cima).
+
+    Args:
+        valor (str | int | float | Decimal): Valor em reais
+
+    Returns:
+        int: Valor em centavos
+
+    Raises:
+        ValueError: Se o texto não for um número válido
+    """
+    if isinstance(valor, str):
+        texto = valor.strip().replace(',', '.')
+        try:
+            valor = Decimal(texto)
+        except InvalidOperation:
+            raise ValueError(f"Valor monetário inválido: {texto!r}")
+    elif isinstance(valor, Integral):
+        valor = Decimal(int(valor))
+    elif not isinstance(valor, Decimal):
+        # repr() devolve o menor texto que reproduz o float (ex.: 0.1 -> '0.1');
+        # float() antes cobre escalares NumPy (np.float64)
+        valor = Decimal(repr(float(valor)))
+
+    if not valor.is_finite():
+        raise ValueError(f"Valor monetário inválido: {valor}")
+
+    return int((valor * 100).quantize(_UM_CENTAVO, rounding=ROUND_HALF_UP))
+
+
+def centavos_para_reais(centavos):
+    """Converte centavos (int ou Series) para reais com duas casas exatas."""
+    return centavos / 100
+
+
+def serie_centavos(valores):
+    """
+    Converte uma coluna de valores em reais para centavos (int64).
+
+    Valores ausentes viram 0. Como os valores de origem têm no máximo duas
+    casas decimais, arredondar valor * 100 recupera o centavo exato.
+
+    Args:
+        valores (pd.Series): Valores em reais
+
+    Returns:
+        pd.Series: Valores em centavos (int64)
+    """
+    numericos = pd.to_numeric(valores, errors='coerce').fillna(0).astype('float64')
+    return (numericos * 100).round().astype('int64')
+
+
+def garantir_coluna_centavos(df, coluna_valor='Valor'):
+    """
+    Garante a coluna Valor_Centavos (int64) em um DataFrame.
+
+    Linhas sem centavos (tabelas salvas antes desta coluna existir) são
+    preenchidas a partir da coluna em reais. Em seguida a coluna em reais é
+    recalculada a partir dos centavos, eliminando resíduos de float.
+    O DataFrame é alterado no lugar e também devolvido.
+
+    Args:
+        df (pd.DataFrame): Tabela com a coluna em reais
+        coluna_valor (str): Nome da coluna em reais
+
+    Returns:
+        pd.DataFrame: A mesma tabela
+    """
+    if coluna_valor not in df.columns:
+        return df
+
+    if COLUNA_CENTAVOS in df.columns:
+        centavos = pd.to_numeric(df[COLUNA_CENTAVOS], errors='coerce')
+        ausentes = centavos.isna()
+        if ausentes.any():
+            centavos = centavos.where(~ausentes, serie_centavos(df[coluna_valor]))
+        centavos = centavos.astype('int64')
+    else:
+        centavos = serie_centavos(df[coluna_valor])
+
+    df[COLUNA_CENTAVOS] = centavos
+    df[coluna_valor] = centavos_para_reais(centavos)
+    return df
+
+
+
+def resumir_centavos(df, coluna_grupo, coluna_data='Data'):
+    """
+    Agrupa uma tabela somando os valores em centavos (soma exata).
+
+    Substitui o padrão groupby('...').agg({'Valor': [...]}).round(2): os
+    totais são inteiros e só viram reais no fim; a média é arredondada para
+    o centavo mais próximo.
+
+    Args:
+        df (pd.DataFrame): Tabela com Valor_Centavos (ou Valor em reais)
+        coluna_grupo (str): Coluna de agrupamento
+        coluna_data (str | None): Coluna para primeira/última data
+
+    Returns:
+        pd.DataFrame: Indexado pelo grupo, com as colunas total, quantidade,
+        media (em reais) e, se houver coluna de data, primeira_data e
+        ultima_data
+    """
+    if COLUNA_CENTAVOS not in df.columns:
+        df = garantir_coluna_centavos(df.copy())
+
+    agregacoes = {
+        'soma': (COLUNA_CENTAVOS, 'sum'),
+        'quantidade': (COLUNA_CENTAVOS, 'count')
+    }
+    if coluna_data is not None:
+        agregacoes['primeira_data'] = (coluna_data, 'min')
+        agregacoes['ultima_data'] = (coluna_data, 'max')
+
+    resumo = df.groupby(coluna_grupo).agg(**agregacoes)
+    resumo['total'] = centavos_para_reais(resumo['soma'])
+    resumo['media'] = centavos_para_reais((resumo['soma'] / resumo['quantidade']).round())
+    return resumo.drop(columns='soma')
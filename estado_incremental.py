@@ -0,0 +1,114 @@
+import os
+import json
+import threading
+from datetime import datetime
+
+
+class EstadoIncremental:
+    """
+    Guarda, por conta (BANKID:ACCTID), até onde o último extrato foi lido.
+
+    O extrato diário do banco é cumulativo: cada arquivo repete todas as
+    transações anteriores do mês e acrescenta as novas no fim. Para cada
+    conta é guardada uma "marca" com:
+
+    - a linhagem do arquivo: hash do primeiro bloco <STMTTRN> e hash/posição
+      do último bloco consumido (posições relativas ao primeiro <STMTTRN>,
+      então mudanças de tamanho no cabeçalho não atrapalham);
+    - o último FITID/DTPOSTED ingerido e os FITIDs do último dia, usados
+      como filtro quando o arquivo não é continuação do anterior.
+
+    Ver ExtratorOFX.processar_arquivo_incremental. Pode ser compartilhado
+    entre threads (ex.: trabalhadores do MonitorInbox).
+    """
+
+    def __init__(self, arquivo_estado=os.path.join('dados_persistentes', 'estado_incremental.json')):
+        self.arquivo_estado = arquivo_estado
+        self._contas = None
+        self._trava = threading.RLock()
+
+        diretorio = os.path.dirname(arquivo_estado)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+    def _carregar(self):
+        """Carrega (uma vez por instância) as marcas de todas as contas."""
+        with self._trava:
+            if self._contas is None:
+                try:
+                    with open(self.arquivo_estado, 'r', encoding='utf-8') as f:
+                        self._contas = json.load(f).get('contas', {})
+                except FileNotFoundError:
+                    self._contas = {}
+                except Exception as e:
+                    print(f"Erro ao carregar estado incremental (reiniciando): {e}")
+                    self._contas = {}
+
+            return self._contas
+
+    def obter(self, conta):
+        """
+        Retorna a marca de uma conta.
+
+        Args:
+            conta (str): Identificador da conta (ver ExtratorOFX.identificar_conta)
+
+        Returns:
+            dict | None: Marca da última leitura ou None se a conta é nova
+        """
+        return self._carregar().get(conta)
+
+    def registrar(self, conta, marca):
+        """
+        Grava a marca de uma conta (escrita atômica do arquivo de estado).
+
+        Deve ser chamado somente depois que as transações novas foram
+        persistidas, para que uma falha no meio não faça pular transações.
+
+        A marca nunca volta atrás: se outro extrato da conta, lido ao mesmo
+        tempo a partir da mesma marca, já registrou uma leitura mais
+        adiante (último dia ingerido e FITIDs desse dia), a marca mais
+        antiga é descartada.
+
+        Args:
+            conta (str): Identificador da conta
+            marca (dict): Marca devolvida pelo extrator
+
+        Returns:
+            bool: True se a marca foi gravada
+        """
+        with self._trava:
+            contas = self._carregar()
+            atual = contas.get(conta)
+            if atual is not None and self._progresso(marca) < self._progresso(atual):
+                return False
+
+            contas[conta] = dict(marca, atualizado_em=datetime.now().isoformat())
+            self._gravar()
+            return True
+
+    @staticmethod
+    def _progresso(marca):
+        """Ordem das marcas de uma conta: último dia e FITIDs lidos nele."""
+        return (marca.get('ultimo_dtposted', ''), len(marca.get('fitids_ultimo_dia', [])))
+
+    def limpar(self, conta=None):
+        """
+        Esquece a marca de uma conta (ou de todas), forçando leitura completa.
+
+        Args:
+            conta (str, optional): Conta a limpar; None limpa todas
+        """
+        with self._trava:
+            contas = self._carregar()
+            if conta is None:
+                contas.clear()
+            else:
+                contas.pop(conta, None)
+            self._gravar()
+
+    def _gravar(self):
+        temporario = f'{self.arquivo_estado}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump({'contas': self._contas}, f, indent=2, ensure_ascii=False)
+        os.replace(temporario, self.arquivo_estado)
@@ -0,0 +1,240 @@
+import os
+import json
+import threading
+from datetime import datetime
+
+from dinheiro import centavos_para_reais
+
+NOME_ARQUIVO_ESTATISTICAS = 'estatisticas_regras.json'
+
+# Formato do arquivo em disco
+VERSAO_FORMATO = '1'
+
+# Razões sociais sem regra guardadas no arquivo (ficam as de maior valor)
+LIMITE_SEM_REGRA = 2_000
+
+
+class EstatisticasRegras:
+    """
+    Contadores de uso das regras de despesas, acumulados entre importações.
+
+    Para cada regra (categoria e palavra-chave que casou) são somados a
+    quantidade de débitos e o valor em centavos; débitos sem regra (que
+    caem em Diversos) são somados por razão social. Os totais de cada
+    importação ficam pendentes em memória e salvar() os soma ao arquivo,
+    relido na hora, de modo que vários processos (CLI, monitor da inbox)
+    acumulam no mesmo arquivo.
+
+    Formato do arquivo:
+        {'regras': {categoria: {palavra: [quantidade, centavos]}},
+         'sem_regra': {razao_social: [quantidade, centavos]}, ...}
+    """
+
+    def __init__(self, arquivo=None):
+        """
+        Args:
+            arquivo (str, optional): JSON onde os totais são acumulados; sem
+                arquivo, os totais ficam só em memória
+        """
+        self.arquivo = arquivo
+        self._pendente = self._vazio()
+        self._trava = threading.Lock()
+
+    @staticmethod
+    def _vazio():
+        return {'total_debitos': 0, 'total_centavos': 0, 'regras': {}, 'sem_regra': {}}
+
+    def registrar(self, regra, razao_social, quantidade, centavos):
+        """
+        Soma débitos de uma razão social aos contadores.
+
+        Args:
+            regra (tuple | None): (categoria, palavra-chave) que casou, ou None
+            razao_social (str): Razão social original
+            quantidade (int): Número de débitos
+            centavos (int): Valor total dos débitos em centavos
+        """
+        with self._trava:
+            pendente = self._pendente
+            pendente['total_debitos'] += quantidade
+            pendente['total_centavos'] += centavos
+
+            if regra is None:
+                contador = pendente['sem_regra'].setdefault(razao_social, [0, 0])
+            else:
+                categoria, palavra = regra
+                contador = pendente['regras'].setdefault(categoria, {}).setdefault(palavra, [0, 0])
+            contador[0] += quantidade
+            contador[1] += centavos
+
+    def carregar(self):
+        """
+        Returns:
+            dict: Totais do arquivo somados aos ainda não salvos
+        """
+        with self._trava:
+            return self._somar(self._ler_arquivo(), self._pendente)
+
+    def salvar(self):
+        """
+        Soma os totais pendentes ao arquivo (se houver arquivo e débitos).
+
+        Returns:
+            bool: True se o arquivo foi gravado
+        """
+        if not self.arquivo:
+            return False
+
+        with self._trava:
+            if not self._pendente['total_debitos']:
+                return False
+
+            dados = self._somar(self._ler_arquivo(), self._pendente)
+
+            # Mantém só as razões sociais sem regra de maior valor
+            if len(dados['sem_regra']) > LIMITE_SEM_REGRA:
+                maiores = sorted(dados['sem_regra'].items(), key=lambda item: -item[1][1])
+                dados['sem_regra'] = dict(maiores[:LIMITE_SEM_REGRA])
+
+            dados['formato'] = VERSAO_FORMATO
+            dados['atualizado_em'] = datetime.now().isoformat()
+
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.arquivo)), exist_ok=True)
+                temporario = f'{self.arquivo}.tmp'
+                with open(temporario, 'w', encoding='utf-8') as f:
+                    json.dump(dados, f, ensure_ascii=False)
+                os.replace(temporario, self.arquivo)
+            except Exception as e:
+                print(f"Erro ao salvar estatísticas das regras ({self.arquivo}): {e}")
+                return False
+
+            self._pendente = self._vazio()
+            return True
+
+    def limpar(self):
+        """Zera os contadores (em memória e no arquivo)."""
+        with self._trava:
+            self._pendente = self._vazio()
+            if self.arquivo and os.path.exists(self.arquivo):
+                os.remove(self.arquivo)
+
+    def relatorio(self, regras=None, limite=10):
+        """
+        Relatório de uso das regras.
+
+        Args:
+            regras (dict, optional): Regras atuais ({categoria: [palavras]});
+                quando informadas, as regras e palavras sem nenhum uso aparecem
+                em 'categorias_sem_uso' e 'palavras_sem_uso'
+            limite (int): Quantidade de razões sociais sem regra no ranking
+
+        Returns:
+            dict: total_debitos, valor_total, cobertura (fração dos débitos
+            categorizados por regra), por_categoria ({categoria: quantidade,
+            valor e palavras}), categorias_sem_uso, palavras_sem_uso e
+            sem_regra (razões sociais de Diversos por valor decrescente)
+        """
+        dados = self.carregar()
+
+        por_categoria = {}
+        debitos_com_regra = 0
+        for categoria, palavras in dados['regras'].items():
+            quantidade = sum(contador[0] for contador in palavras.values())
+            debitos_com_regra += quantidade
+            por_categoria[categoria] = {
+                'quantidade': quantidade,
+                'valor': centavos_para_reais(sum(contador[1] for contador in palavras.values())),
+                'palavras': {
+                    palavra: {'quantidade': contador[0], 'valor': centavos_para_reais(contador[1])}
+                    for palavra, contador in sorted(palavras.items(), key=lambda item: -item[1][0])
+                }
+            }
+
+        categorias_sem_uso = []
+        palavras_sem_uso = {}
+        for categoria, palavras in (regras or {}).items():
+            usadas = dados['regras'].get(categoria, {})
+            if not usadas:
+                categorias_sem_uso.append(categoria)
+            sem_uso = [palavra for palavra in palavras if palavra not in usadas]
+            if sem_uso:
+                palavras_sem_uso[categoria] = sem_uso
+
+        sem_regra = sorted(dados['sem_regra'].items(), key=lambda item: -item[1][1])[:limite]
+
+        return {
+            'total_debitos': dados['total_debitos'],
+            'valor_total': centavos_para_reais(dados['total_centavos']),
+            'cobertura': debitos_com_regra / dados['total_debitos'] if dados['total_debitos'] else 0.0,
+            'por_categoria': dict(sorted(por_categoria.items(), key=lambda item: -item[1]['quantidade'])),
+            'categorias_sem_uso': categorias_sem_uso,
+            'palavras_sem_uso': palavras_sem_uso,
+            'sem_regra': [
+                {'razao_social': razao, 'quantidade': contador[0], 'valor': centavos_para_reais(contador[1])}
+                for razao, contador in sem_regra
+            ],
+            'atualizado_em': dados.get('atualizado_em')
+        }
+
+    def _ler_arquivo(self):
+        if not self.arquivo or not os.path.exists(self.arquivo):
+            return self._vazio()
+
+        try:
+            with open(self.arquivo, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+        except Exception as e:
+            print(f"Erro ao carregar estatísticas das regras ({self.arquivo}): {e}")
+            return self._vazio()
+
+        if dados.get('formato') != VERSAO_FORMATO:
+            return self._vazio()
+        return dados
+
+    @staticmethod
+    def _somar(base, pendente):
+        """Novo dict com os contadores de base e pendente somados."""
+        dados = {
+            'total_debitos': base.get('total_debitos', 0) + pendente['total_debitos'],
+            'total_centavos': base.get('total_centavos', 0) + pendente['total_centavos'],
+            'regras': {categoria: {palavra: list(contador) for palavra, contador in palavras.items()}
+                       for categoria, palavras in base.get('regras', {}).items()},
+            'sem_regra': {razao: list(contador) for razao, contador in base.get('sem_regra', {}).items()}
+        }
+        if 'atualizado_em' in base:
+            dados['atualizado_em'] = base['atualizado_em']
+
+        for categoria, palavras in pendente['regras'].items():
+            destino = dados['regras'].setdefault(categoria, {})
+            for palavra, (quantidade, centavos) in palavras.items():
+                contador = destino.setdefault(palavra, [0, 0])
+                contador[0] += quantidade
+                contador[1] += centavos
+
+        for razao, (quantidade, centavos) in pendente['sem_regra'].items():
+            contador = dados['sem_regra'].setdefault(razao, [0, 0])
+            contador[0] += quantidade
+            contador[1] += centavos
+
+        return dados
+
+
+# Teste rápido (relatório do arquivo de dados_persistentes)
+if __name__ == "__main__":
+    from regras_categorizacao import obter_regras
+
+    estatisticas = EstatisticasRegras(os.path.join('dados_persistentes', NOME_ARQUIVO_ESTATISTICAS))
+    relatorio = estatisticas.relatorio(obter_regras().despesas)
+
+    print(f"Débitos contados: {relatorio['total_debitos']} "
+          f"(R$ {relatorio['valor_total']:,.2f}), cobertura {relatorio['cobertura']:.0%}")
+    for categoria, dados in relatorio['por_categoria'].items():
+        print(f"- {categoria}: {dados['quantidade']} débitos, R$ {dados['valor']:,.2f}")
+        for palavra, uso in dados['palavras'].items():
+            print(f"    {palavra}: {uso['quantidade']}")
+    print(f"\nRegras sem uso: {relatorio['categorias_sem_uso']}")
+    print(f"Palavras sem uso: {relatorio['palavras_sem_uso']}")
+    print("\nDiversos de maior valor:")
+    for item in relatorio['sem_regra']:
+        print(f"- {item['razao_social']}: {item['quantidade']} débitos, R$ {item['valor']:,.2f}")
@@ -1,20 +1,129 @@
+import io
+import os
 import re
-from datetime import datetime
+import gzip
+import mmap
+import codecs
+import hashlib
+import zipfile
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date
+from typing import NamedTuple
 import pandas as pd
+from dinheiro import COLUNA_CENTAVOS, para_centavos, centavos_para_reais
+from filtro_informativos import FiltroInformativos
+from contas import COLUNAS_CONTA
+
+# Versão do parser: alterar sempre que a saída de _processar_bloco mudar
+# (invalida o cache de arquivos processados)
+VERSAO_PARSER = '9'
+
+# Tamanho padrão de leitura do modo streaming (1 MB)
+TAMANHO_BLOCO_LEITURA = 1024 * 1024
+
+# Distância máxima de um <STMTTRN> até o seu </STMTTRN>: além disso o
+# bloco é tido como não fechado e a leitura pula para o próximo <STMTTRN>
+# (um bloco sem fechamento não acumula o resto do arquivo em memória)
+TAMANHO_MAXIMO_TRANSACAO = 4 * TAMANHO_BLOCO_LEITURA
+
+# Marcador para blocos descartados por serem lançamentos informativos
+FILTRADA = object()
+
+# Tokenizador de campos: captura todas as tags <TAG>valor de um <STMTTRN>
+# em uma única passada (o valor termina na quebra de linha ou na próxima tag)
+RE_CAMPO_OFX = re.compile(r'<([A-Z0-9.]+)>([^<\n]*)')
+
+# Mesmo tokenizador sobre os bytes brutos do bloco: só o MEMO precisa ser
+# decodificado, e apenas quando a transação é montada
+RE_CAMPO_OFX_BYTES = re.compile(rb'<([A-Z0-9.]+)>([^<\r\n]*)')
+
+# Identificação da conta de cada <STMTRS>/<CCSTMTRS> (agregado sempre fechado)
+RE_CONTA_OFX = re.compile(rb'<(?:BANK|CC)ACCTFROM>(.*?)</(?:BANK|CC)ACCTFROM>', re.DOTALL)
+ABERTURAS_CONTA = (b'<BANKACCTFROM>', b'<CCACCTFROM>')
+# Trecho comum às tags de conta: procurado antes da regex, que quase nunca é necessária
+MARCA_CONTA = b'ACCTFROM>'
+
+# Declaração de codificação no cabeçalho OFX 1.x (SGML) e no prólogo XML (OFX 2.x)
+RE_CHARSET_OFX = re.compile(rb'^CHARSET:\s*([^\r\n]*)', re.MULTILINE)
+RE_ENCODING_OFX = re.compile(rb'^ENCODING:\s*([^\r\n]*)', re.MULTILINE)
+RE_ENCODING_XML = re.compile(rb'<\?xml[^>]*encoding=["\']([A-Za-z0-9._-]+)["\']')
+
+# Bytes iniciais lidos para detectar a codificação
+TAMANHO_CABECALHO = 4096
+
+# Prefixos removidos do MEMO para chegar à razão social
+PREFIXOS_RAZAO_SOCIAL = [
+    'PIX TRANSF ', 'PIX ENVIADO ', 'TED ', 'SISPAG PIX QR-CODE ',
+    'REDE  VISA ', 'REDE  MAST ', 'BOLETO  PAGO ', 'DEV PIX ',
+    'TAR PIX PGTO TRANSF'
+]
+
+RE_PREFIXO_MEMO = re.compile('^(' + '|'.join(re.escape(p) for p in PREFIXOS_RAZAO_SOCIAL) + ')')
+
+# Colunas do lote colunar armazenadas como categóricas (valores muito repetidos)
+COLUNAS_CATEGORICAS = [
+    'Lancamentos', 'Razao Social', 'CNPJ/CPF', 'Tipo', 'Tipo_OFX', 'Num_Documento',
+    'Prefixo_Memo', 'Arquivo_Origem', 'Banco', 'Agencia', 'Conta'
+]
+
+# Assinaturas de arquivos compactados
+ASSINATURA_GZIP = b'\x1f\x8b'
+ASSINATURA_ZIP = b'PK\x03\x04'
+
+
+class MembroZip(NamedTuple):
+    """Extrato .ofx dentro de um .zip (caminho do .zip no disco ou bytes em memória)."""
+    arquivo_zip: object
+    membro: str
+
+
+class ConteudoOFX(NamedTuple):
+    """Extrato em memória, ex.: upload do Streamlit (.ofx, .gz ou .zip)."""
+    nome: str
+    dados: bytes
+
+
+RE_CNPJ = re.compile(r'\b\d{14}\b')
+RE_CPF = re.compile(r'\b\d{11}\b')
+# Documentos formatados, ex.: 33.304.901/0001-10 e 738.331.697-53. Só
+# formatos com 14 e 11 dígitos, os mesmos aceitos por
+# indice_documentos.normalizar_documento (o CNPJ truncado de alguns PIX
+# QR-CODE, 14.380.201-21, não identifica o pagador e fica de fora)
+RE_CNPJ_FORMATADO = re.compile(r'\b\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}\b')
+RE_CPF_FORMATADO = re.compile(r'\b\d{3}\.\d{3}\.\d{3}-\d{2}\b')
+RE_NAO_DIGITO = re.compile(r'\D')
+# Nome após o documento, até a próxima ocorrência dele (versão por coluna)
+RE_NOME_APOS_CNPJ = re.compile(r'(?P<doc>\b\d{14}\b)(?P<nome>.*?)(?:(?P=doc)|$)')
+RE_NOME_APOS_CPF = re.compile(r'(?P<doc>\b\d{11}\b)(?P<nome>.*?)(?:(?P=doc)|$)')
+RE_CODIGO_FINAL = re.compile(r'\s+\d+$')
+RE_DATA_CURTA = re.compile(r'\d{2}/\d{2}')
+RE_CODIGO_LONGO_FINAL = re.compile(r'\s+\d{8,}$')
 
 class ExtratorOFX:
-    def __init__(self):
+    def __init__(self, filtro_informativos=None):
         self.transacoes = []
         self.transacoes_filtradas = []  # Lançamentos informativos removidos
         
         # Padrões de lançamentos informativos que devem ser filtrados
-        self.lancamentos_informativos = [
-            'SALDO TOTAL DISPONÍVEL DIA',
-            'SALDO ANTERIOR',
-            'SALDO DISPONÍVEL',
-            'SALDO INICIAL',
-            'SALDO FINAL'
-        ]
+        # (seção 'filtros_informativos' do configuracoes.json)
+        if filtro_informativos is None:
+            filtro_informativos = FiltroInformativos.do_arquivo()
+        self.filtro_informativos = filtro_informativos
+        
+        # False: razão social e CNPJ/CPF ficam para completar_campos_memo
+        self.extrair_campos_memo = True
+        
+        # Conta do extrato em leitura (BANKACCTFROM), copiada em cada transação
+        self.conta_atual = dict.fromkeys(COLUNAS_CONTA, '')
+        
+        # Problemas encontrados na leitura (blocos pulados, transações
+        # inválidas): quem chama decide como mostrar, ver obter_estatisticas_filtros
+        self.avisos = []
+        
+        # Última leitura incremental: (conta, marca) a registrar no EstadoIncremental
+        self.marca_incremental = None
+        self.estatisticas_incremental = {}
 
     def eh_lancamento_informativo(self, memo):
         """
@@ -26,137 +135,748 @@ class ExtratorOFX:
         Returns:
             bool: True se for informativo, False caso contrário
         """
-        memo_upper = memo.upper().strip()
+        return self.filtro_informativos.eh_informativo(memo)
+
+    def processar_arquivo(self, caminho_arquivo, cache=None, chave_cache=None, usar_mmap=False):
+        """
+        Processa o arquivo OFX completo e acumula as transações válidas.
         
-        # Verifica se contém algum padrão informativo
-        for padrao in self.lancamentos_informativos:
-            if padrao.upper() in memo_upper:
-                return True
+        Wrapper sobre iter_transacoes para quem precisa da lista completa.
         
-        # Verifica padrões adicionais
-        padroes_informativos = [
-            r'^SALDO\s+(TOTAL|DISPONIVEL|ANTERIOR|INICIAL|FINAL)',
-            r'POSICAO\s+DO\s+DIA',
-            r'EXTRATO\s+DO\s+DIA'
-        ]
+        Args:
+            caminho_arquivo: Caminho do arquivo OFX (.ofx, .gz ou .zip),
+                MembroZip ou ConteudoOFX
+            cache (CacheOFX, optional): Cache de arquivos já processados
+            chave_cache (str, optional): Chave já calculada pelo cache
+            usar_mmap (bool): Ler o arquivo mapeado em memória (ver
+                processar_arquivo_mmap)
+            
+        Returns:
+            list: Lista de transações válidas
+        """
+        if cache is not None:
+            if chave_cache is None:
+                chave_cache = cache.calcular_chave(caminho_arquivo, self)
+            
+            entrada = cache.obter(chave_cache)
+            if entrada is not None:
+                # Mesmo estado que a leitura do arquivo deixaria
+                self.transacoes.extend(entrada['transacoes'])
+                self.transacoes_filtradas.extend(entrada['transacoes_filtradas'])
+                self.conta_atual = dict(entrada['conta'])
+                self.filtro_informativos.contagem.update(entrada['filtros_acionados'])
+                self.avisos.extend(entrada['avisos'])
+                return self.transacoes
+            
+            inicio_transacoes = len(self.transacoes)
+            inicio_filtradas = len(self.transacoes_filtradas)
+            inicio_avisos = len(self.avisos)
+            contagem_anterior = Counter(self.filtro_informativos.contagem)
         
-        for padrao in padroes_informativos:
-            if re.search(padrao, memo_upper):
-                return True
+        self.transacoes.extend(self.iter_transacoes(caminho_arquivo, usar_mmap=usar_mmap))
         
-        return False
+        if cache is not None:
+            cache.salvar(
+                chave_cache,
+                self.transacoes[inicio_transacoes:],
+                self.transacoes_filtradas[inicio_filtradas:],
+                conta=self.conta_atual,
+                filtros_acionados=self.filtro_informativos.contagem - contagem_anterior,
+                avisos=self.avisos[inicio_avisos:]
+            )
+        
+        return self.transacoes
 
-    def processar_arquivo(self, caminho_arquivo):
+    def processar_arquivo_colunar(self, caminho_arquivo, cache=None):
+        """
+        Processa o arquivo OFX e devolve as transações em lote colunar.
+        
+        Ver montar_lote_colunar. As transações não são acumuladas em
+        self.transacoes (exceto quando vêm do cache). Sem cache, razão social
+        e CNPJ/CPF são extraídos por coluna (completar_campos_memo), uma vez
+        por MEMO distinto, em vez de transação a transação.
+        
+        Args:
+            caminho_arquivo: Caminho do arquivo OFX
+            cache (CacheOFX, optional): Cache de arquivos já processados
+            
+        Returns:
+            pd.DataFrame: Lote colunar de transações
+        """
+        if cache is not None:
+            inicio = len(self.transacoes)
+            self.processar_arquivo(caminho_arquivo, cache=cache)
+            return montar_lote_colunar(self.transacoes[inicio:])
+        
+        self.extrair_campos_memo = False
         try:
-            with open(caminho_arquivo, 'r', encoding='utf-8') as file:
-                conteudo = file.read()
-        except UnicodeDecodeError:
-            with open(caminho_arquivo, 'r', encoding='latin1') as file:
-                conteudo = file.read()
+            lote = montar_lote_colunar(self.iter_transacoes(caminho_arquivo))
+        finally:
+            self.extrair_campos_memo = True
+        
+        return completar_campos_memo(lote)
 
-        # Extrair transações
-        transacoes_raw = re.findall(r'<STMTTRN>(.*?)</STMTTRN>', conteudo, re.DOTALL)
+    def assinatura_parser(self):
+        """
+        Identifica a versão do parser e das regras de filtragem.
         
-        transacoes_processadas = 0
-        transacoes_filtradas = 0
+        Usada na chave do CacheOFX: mudar VERSAO_PARSER ou os padrões de
+        lançamentos informativos invalida as entradas em cache.
+        
+        Returns:
+            str: Hash SHA-256 hexadecimal
+        """
+        partes = [VERSAO_PARSER, self.filtro_informativos.assinatura()]
+        
+        return hashlib.sha256('\x1f'.join(partes).encode('utf-8')).hexdigest()
+
+    def iter_transacoes(self, caminho_arquivo, tipo=None, tamanho_bloco=TAMANHO_BLOCO_LEITURA, usar_mmap=False):
+        """
+        Gera as transações válidas do arquivo sob demanda.
+        
+        Permite encadear extração → categorização → persistência sem montar a
+        lista completa de transações, por exemplo:
+        
+            categorizador.processar_debitos(extrator.iter_transacoes(caminho, tipo='Debito'))
+        
+        Diferente de processar_arquivo, as transações geradas não são
+        acumuladas em self.transacoes.
         
-        for t in transacoes_raw:
-            # Regex corrigido para capturar valores até quebra de linha ou próxima tag
-            data_match = re.search(r'<DTPOSTED>(.*?)(?=\n|<)', t)
-            valor_match = re.search(r'<TRNAMT>(.*?)(?=\n|<)', t)
-            memo_match = re.search(r'<MEMO>(.*?)(?=\n|</STMTTRN>)', t, re.DOTALL)
+        Arquivos .zip geram as transações de cada membro .ofx, em ordem
+        natural dos nomes; .gz é descompactado em fluxo.
+        
+        Args:
+            caminho_arquivo: Caminho do arquivo OFX (.ofx, .gz ou .zip),
+                MembroZip ou ConteudoOFX
+            tipo (str, optional): 'Credito' ou 'Debito' para gerar apenas um tipo
+            tamanho_bloco (int): Quantidade de bytes lidos por vez
+            usar_mmap (bool): Ler o arquivo mapeado em memória em vez de
+                por blocos (tamanho_bloco é ignorado; vale só para .ofx
+                no disco)
+            
+        Yields:
+            dict: Transação válida
+        """
+        for fonte in listar_fontes_ofx(caminho_arquivo):
+            if usar_mmap and _eh_caminho(fonte) and not _eh_gzip(fonte):
+                transacoes = self.processar_arquivo_mmap(fonte)
+            else:
+                transacoes = self.processar_arquivo_streaming(fonte, tamanho_bloco)
+            
+            for transacao in transacoes:
+                if tipo is None or transacao['Tipo'] == tipo:
+                    yield transacao
 
-            if data_match and valor_match and memo_match:
+    def processar_arquivo_streaming(self, caminho_arquivo, tamanho_bloco=TAMANHO_BLOCO_LEITURA):
+        """
+        Lê o arquivo OFX em blocos e gera uma transação por <STMTTRN>.
+        
+        O arquivo nunca é carregado inteiro: apenas o bloco de leitura atual e
+        a transação incompleta no fim dele ficam em memória, independente do
+        tamanho do extrato. Vale também para .gz e membros de .zip, que são
+        descompactados em fluxo (sem arquivo temporário). Em arquivos com
+        vários extratos (<STMTRS>), a conta acompanha o BANKACCTFROM de cada um.
+        
+        Args:
+            caminho_arquivo: Caminho do arquivo OFX, MembroZip ou ConteudoOFX
+                (ver abrir_fonte_ofx)
+            tamanho_bloco (int): Quantidade de bytes lidos por vez
+            
+        Yields:
+            dict: Transação válida (lançamentos informativos são filtrados,
+            ver self.transacoes_filtradas; problemas de leitura ficam em
+            self.avisos)
+        """
+        with abrir_fonte_ofx(caminho_arquivo) as file:
+            # O cabeçalho lido para detectar a codificação segue para o scanner
+            # (sem seek: fluxos descompactados não voltam atrás de graça)
+            cabecalho = file.read(TAMANHO_CABECALHO)
+            codificacao = codificacao_alternativa(detectar_codificacao(cabecalho))
+            self.conta_atual = self._dados_conta(cabecalho)
+            for bloco in self._iterar_blocos_stmttrn(file, tamanho_bloco, cabecalho):
+                transacao = self._processar_bloco(bloco, codificacao)
+                
+                if transacao is None or transacao is FILTRADA:
+                    continue
+                
+                yield transacao
+
+    def processar_arquivo_mmap(self, caminho_arquivo):
+        """
+        Gera as transações lendo o arquivo mapeado em memória (mmap).
+        
+        Os limites de <STMTTRN> são achados com find direto no mapa e cada
+        bloco é entregue ao tokenizador como uma fatia de memoryview, sem
+        cópia: só os campos extraídos pela regex viram bytes, e só o MEMO
+        vira texto. Não há buffer de leitura nem lista de blocos; as páginas
+        do arquivo ficam a cargo do sistema operacional.
+        
+        Args:
+            caminho_arquivo: Caminho do arquivo OFX
+            
+        Yields:
+            dict: Transação válida (como em processar_arquivo_streaming)
+        """
+        with open(caminho_arquivo, 'rb') as file:
+            # Arquivos vazios não podem ser mapeados
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+            
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                codificacao = codificacao_alternativa(detectar_codificacao(mapa[:TAMANHO_CABECALHO]))
+                self.conta_atual = self._dados_conta(mapa[:TAMANHO_CABECALHO])
+                visao = memoryview(mapa)
                 try:
-                    # Processar memo
-                    memo_str = memo_match.group(1).strip()
-                    
-                    # Verificar se é lançamento informativo
-                    if self.eh_lancamento_informativo(memo_str):
-                        transacoes_filtradas += 1
-                        self.transacoes_filtradas.append({
-                            'memo': memo_str,
-                            'valor': float(valor_match.group(1).strip()),
-                            'motivo': 'Lançamento informativo'
-                        })
-                        continue  # Pula esta transação
-                    
-                    # Processar data
-                    data_str = data_match.group(1).strip()
-                    data_obj = datetime.strptime(data_str[:8], '%Y%m%d')
-                    data_formatada = data_obj.strftime('%d/%m/%Y')
-                    
-                    # Processar valor
-                    valor_str = valor_match.group(1).strip()
-                    valor_float = float(valor_str)
-                    
-                    # Extrair CNPJ/CPF do memo
-                    cnpj_cpf = self.extrair_cnpj_cpf(memo_str)
-                    
-                    # Extrair razão social
-                    razao_social = self.extrair_razao_social(memo_str)
-                    
-                    self.transacoes.append({
-                        'Data': data_formatada,
-                        'Lancamentos': memo_str,
-                        'Razao Social': razao_social,
-                        'CNPJ/CPF': cnpj_cpf or '',
-                        'Valor': valor_float,
-                        'Tipo': 'Credito' if valor_float > 0 else 'Debito'
-                    })
-                    
-                    transacoes_processadas += 1
+                    for inicio, fim in self._localizar_blocos_stmttrn(mapa):
+                        # A fatia é temporária: liberada antes de fechar o mapa
+                        transacao = self._processar_bloco(visao[inicio:fim], codificacao)
+                        
+                        if transacao is None or transacao is FILTRADA:
+                            continue
+                        
+                        yield transacao
+                finally:
+                    visao.release()
+
+    def _localizar_blocos_stmttrn(self, buffer):
+        """
+        Gera as posições do conteúdo de cada bloco <STMTTRN> de um buffer inteiro.
+        
+        Atualiza self.conta_atual a cada BANKACCTFROM/CCACCTFROM encontrado
+        entre os blocos, como _iterar_blocos_posicionados.
+        
+        Args:
+            buffer: bytes ou mmap com o arquivo completo
+            
+        Yields:
+            tuple: (início, fim) do conteúdo entre as tags
+        """
+        abertura = b'<STMTTRN>'
+        fechamento = b'</STMTTRN>'
+        posicao = 0
+        
+        while True:
+            pos_abertura = buffer.find(abertura, posicao)
+            if pos_abertura == -1:
+                return
+            
+            if buffer.find(MARCA_CONTA, posicao, pos_abertura) != -1:
+                conta, _ = self._conta_no_intervalo(buffer, posicao, pos_abertura)
+                if conta is not None:
+                    self.conta_atual = conta
+            
+            inicio = pos_abertura + len(abertura)
+            limite = pos_abertura + TAMANHO_MAXIMO_TRANSACAO
+            pos_fechamento = buffer.find(fechamento, inicio, limite)
+            if pos_fechamento == -1:
+                if len(buffer) < limite:
+                    # Último bloco incompleto: ignorado, como no modo streaming
+                    return
+                
+                self._avisar_bloco_sem_fechamento(pos_abertura)
+                posicao = inicio
+                continue
+            
+            yield inicio, pos_fechamento
+            posicao = pos_fechamento + len(fechamento)
+
+    def processar_arquivo_incremental(self, caminho_arquivo, estado, tamanho_bloco=TAMANHO_BLOCO_LEITURA):
+        """
+        Processa apenas as transações novas de um extrato cumulativo.
+        
+        A conta é identificada pelo cabeçalho (BANKID/ACCTID) e a marca da
+        leitura anterior é buscada em `estado`. Se o arquivo for continuação
+        do anterior (mesmo primeiro bloco e mesmo bloco na posição do último
+        consumido, conferidos com seek + hash), a leitura pula direto para o
+        fim do último bloco: o custo é proporcional só às transações novas.
+        Caso contrário o arquivo é lido inteiro, descartando as transações
+        até o último DTPOSTED/FITID já ingerido.
+        
+        A nova marca fica em self.marca_incremental como (conta, marca) e
+        deve ser gravada com estado.registrar(*extrator.marca_incremental)
+        depois que as transações forem persistidas.
+        
+        Args:
+            caminho_arquivo: Caminho do arquivo OFX
+            estado (EstadoIncremental): Marcas por conta
+            tamanho_bloco (int): Quantidade de bytes lidos por vez
+            
+        Returns:
+            list: Transações novas (também acumuladas em self.transacoes)
+        """
+        novas = []
+        transacoes_filtradas = 0
+        ignoradas = 0
+        
+        with open(caminho_arquivo, 'rb') as file:
+            cabecalho, base = self._ler_cabecalho(file, tamanho_bloco)
+            conta = self._conta_do_cabecalho(cabecalho)
+            self.conta_atual = self._dados_conta(cabecalho)
+            codificacao = codificacao_alternativa(detectar_codificacao(cabecalho[:TAMANHO_CABECALHO]))
+            marca_anterior = estado.obter(conta)
+            
+            if base is None:
+                # Arquivo sem transações: nada a ler nem a registrar
+                self.marca_incremental = (conta, marca_anterior) if marca_anterior else None
+                self.estatisticas_incremental = {
+                    'conta': conta, 'modo': 'vazio', 'bytes_pulados': 0,
+                    'transacoes_novas': 0, 'transacoes_filtradas': 0, 'ignoradas_pela_marca': 0
+                }
+                return novas
+            
+            continuacao = marca_anterior is not None and self._verificar_linhagem(file, base, marca_anterior)
+            
+            if continuacao:
+                marca = dict(marca_anterior)
+                inicio_leitura = base + marca['fim_ultimo_bloco']
+                filtro = None
+            else:
+                marca = {}
+                inicio_leitura = base
+                filtro = marca_anterior
+            
+            # Marca d'água: último dia ingerido e FITIDs desse dia
+            ultimo_dia = (filtro or marca).get('ultimo_dtposted', '')
+            fitids_dia = set((filtro or marca).get('fitids_ultimo_dia', []))
+            ultimo_fitid = (filtro or marca).get('ultimo_fitid', '')
+            primeiro = ultimo = None
+            
+            file.seek(inicio_leitura)
+            for inicio, fim, bloco in self._iterar_blocos_posicionados(file, tamanho_bloco):
+                if primeiro is None:
+                    primeiro = (inicio, fim, bloco)
+                ultimo = (inicio, fim, bloco)
+                
+                transacao = self._processar_bloco(bloco, codificacao)
+                
+                if transacao is None:
+                    continue
+                
+                if transacao is FILTRADA:
+                    transacoes_filtradas += 1
+                    continue
+                
+                data = transacao['Data']
+                dia = data[6:10] + data[3:5] + data[0:2]
+                fitid = transacao['FITID']
+                
+                if filtro is not None and (dia < ultimo_dia or (dia == ultimo_dia and fitid and fitid in fitids_dia)):
+                    ignoradas += 1
+                    continue
+                
+                if dia > ultimo_dia:
+                    ultimo_dia = dia
+                    fitids_dia = set()
+                if dia == ultimo_dia and fitid:
+                    fitids_dia.add(fitid)
+                ultimo_fitid = fitid or ultimo_fitid
+                
+                novas.append(transacao)
+        
+        if not continuacao and primeiro is not None:
+            marca['fim_primeiro_bloco'] = primeiro[1] - base
+            marca['hash_primeiro_bloco'] = self._hash_bloco(primeiro[2])
+        
+        if ultimo is not None:
+            marca['inicio_ultimo_bloco'] = ultimo[0] - base
+            marca['fim_ultimo_bloco'] = ultimo[1] - base
+            marca['hash_ultimo_bloco'] = self._hash_bloco(ultimo[2])
+        
+        marca['ultimo_dtposted'] = ultimo_dia
+        marca['fitids_ultimo_dia'] = sorted(fitids_dia)
+        marca['ultimo_fitid'] = ultimo_fitid
+        marca['arquivo'] = str(caminho_arquivo)
+        
+        self.marca_incremental = (conta, marca)
+        self.estatisticas_incremental = {
+            'conta': conta,
+            'modo': 'continuacao' if continuacao else 'completo',
+            'bytes_pulados': inicio_leitura - base,
+            'transacoes_novas': len(novas),
+            'transacoes_filtradas': transacoes_filtradas,
+            'ignoradas_pela_marca': ignoradas
+        }
+        self.transacoes.extend(novas)
+        
+        return novas
+
+    def identificar_conta(self, caminho_arquivo):
+        """
+        Identifica a conta do extrato pelo cabeçalho (BANKID:ACCTID).
+        
+        Args:
+            caminho_arquivo: Caminho do arquivo OFX
+            
+        Returns:
+            str: Identificador da conta
+        """
+        with open(caminho_arquivo, 'rb') as file:
+            cabecalho, _ = self._ler_cabecalho(file, TAMANHO_BLOCO_LEITURA)
+        return self._conta_do_cabecalho(cabecalho)
+
+    def _ler_cabecalho(self, file, tamanho_bloco):
+        """
+        Lê o arquivo desde o início até o primeiro <STMTTRN>.
+        
+        Returns:
+            tuple: (bytes do cabeçalho, posição do primeiro <STMTTRN> ou None)
+        """
+        abertura = b'<STMTTRN>'
+        cabecalho = b''
+        
+        while True:
+            pedaco = file.read(tamanho_bloco)
+            busca_de = max(0, len(cabecalho) - len(abertura) + 1)
+            cabecalho += pedaco
+            
+            posicao = cabecalho.find(abertura, busca_de)
+            if posicao != -1:
+                return cabecalho[:posicao], posicao
+            
+            if not pedaco:
+                return cabecalho, None
+
+    def _conta_do_cabecalho(self, cabecalho):
+        """Monta o identificador BANKID:ACCTID a partir do cabeçalho bruto."""
+        dados = self._dados_conta(cabecalho)
+        banco = dados['Banco']
+        conta = dados['Conta']
+        
+        return f'{banco}:{conta}' if banco or conta else 'desconhecida'
+
+    def _dados_conta(self, cabecalho):
+        """
+        Lê banco, agência e conta (BANKID, BRANCHID, ACCTID) do cabeçalho.
+        
+        Só o trecho antes do primeiro <STMTTRN> é considerado. Extratos de
+        cartão (CCACCTFROM) trazem apenas o ACCTID.
+        
+        Args:
+            cabecalho (bytes): Início do arquivo
+            
+        Returns:
+            dict: {'Banco', 'Agencia', 'Conta'} ('' quando ausentes)
+        """
+        fim = cabecalho.find(b'<STMTTRN>')
+        if fim != -1:
+            cabecalho = cabecalho[:fim]
+        
+        return self._campos_conta(cabecalho)
+
+    def _campos_conta(self, trecho):
+        """Primeiros BANKID, BRANCHID e ACCTID do trecho bruto."""
+        campos = {}
+        for tag, valor in RE_CAMPO_OFX_BYTES.findall(trecho):
+            campos.setdefault(tag, valor.strip().decode('latin1'))
+        
+        return {
+            'Banco': campos.get(b'BANKID', ''),
+            'Agencia': campos.get(b'BRANCHID', ''),
+            'Conta': campos.get(b'ACCTID', '')
+        }
+
+    def _conta_no_intervalo(self, buffer, inicio, fim):
+        """
+        Procura a identificação de conta no trecho entre dois blocos <STMTTRN>.
+        
+        Args:
+            buffer: bytes ou mmap
+            inicio (int): Início do trecho
+            fim (int): Fim do trecho
+            
+        Returns:
+            tuple: (dados da última conta completa no trecho ou None,
+            posição de um BANKACCTFROM/CCACCTFROM ainda sem fechamento ou None)
+        """
+        dados = None
+        fim_conta = inicio
+        for encontrada in RE_CONTA_OFX.finditer(buffer, inicio, fim):
+            dados = encontrada.group(1)
+            fim_conta = encontrada.end()
+        
+        pendentes = [posicao for posicao in (buffer.find(tag, fim_conta, fim) for tag in ABERTURAS_CONTA)
+                     if posicao != -1]
+        
+        return (self._campos_conta(dados) if dados is not None else None), min(pendentes, default=None)
+
+    def _avisar_bloco_sem_fechamento(self, posicao):
+        self.avisos.append(f"<STMTTRN> na posição {posicao} sem </STMTTRN> em {TAMANHO_MAXIMO_TRANSACAO} bytes; "
+                           f"pulando para o próximo <STMTTRN>")
+
+    def _verificar_linhagem(self, file, base, marca):
+        """
+        Confere se o arquivo continua o extrato da marca anterior.
+        
+        Compara o hash do primeiro bloco e do bloco na posição do último
+        bloco consumido, lendo só esses trechos (seek).
+        """
+        try:
+            trechos = [
+                (0, marca['fim_primeiro_bloco'], marca['hash_primeiro_bloco']),
+                (marca['inicio_ultimo_bloco'], marca['fim_ultimo_bloco'], marca['hash_ultimo_bloco'])
+            ]
+        except KeyError:
+            return False
+        
+        abertura = len(b'<STMTTRN>')
+        fechamento = len(b'</STMTTRN>')
+        
+        for inicio, fim, esperado in trechos:
+            file.seek(base + inicio)
+            dados = file.read(fim - inicio)
+            if len(dados) != fim - inicio or self._hash_bloco(dados[abertura:-fechamento]) != esperado:
+                return False
+        
+        return True
+
+    def _hash_bloco(self, bloco):
+        return hashlib.sha256(bloco).hexdigest()
+
+    def _iterar_blocos_stmttrn(self, file, tamanho_bloco, inicial=b''):
+        """
+        Gera o conteúdo bruto (bytes) de cada bloco <STMTTRN>...</STMTTRN>.
+        
+        Args:
+            file: Arquivo aberto em modo binário
+            tamanho_bloco (int): Quantidade de bytes lidos por vez
+            inicial (bytes): Bytes já lidos do arquivo antes da posição atual
+            
+        Yields:
+            bytes: Conteúdo entre as tags de abertura e fechamento
+        """
+        for _, _, bloco in self._iterar_blocos_posicionados(file, tamanho_bloco, inicial):
+            yield bloco
+
+    def _iterar_blocos_posicionados(self, file, tamanho_bloco, inicial=b''):
+        """
+        Gera cada bloco <STMTTRN> com sua posição no arquivo.
+        
+        A leitura começa na posição atual do arquivo (precedida de
+        `inicial`, se houver). Em fluxos sem tell() as posições contam a
+        partir do início da leitura.
+        
+        Cada BANKACCTFROM/CCACCTFROM entre os blocos atualiza
+        self.conta_atual antes do bloco seguinte ser gerado. Um <STMTTRN>
+        sem </STMTTRN> em até TAMANHO_MAXIMO_TRANSACAO bytes é pulado (com
+        aviso), em vez de acumular o resto do arquivo.
+        
+        Args:
+            file: Arquivo aberto em modo binário
+            tamanho_bloco (int): Quantidade de bytes lidos por vez
+            inicial (bytes): Bytes já lidos do arquivo antes da posição atual
+            
+        Yields:
+            tuple: (posição do <STMTTRN>, posição logo após o </STMTTRN>,
+            conteúdo entre as tags)
+        """
+        abertura = b'<STMTTRN>'
+        fechamento = b'</STMTTRN>'
+        # Bytes guardados para uma tag (de bloco ou de conta) cortada ao meio
+        cauda = max(len(tag) for tag in (abertura, *ABERTURAS_CONTA)) - 1
+        buffer = inicial
+        # Posição no arquivo do primeiro byte do buffer
+        try:
+            deslocamento = file.tell() - len(inicial)
+        except (OSError, AttributeError):
+            deslocamento = 0
+        
+        while True:
+            pedaco = file.read(tamanho_bloco)
+            buffer += pedaco
+            
+            inicio = 0
+            while True:
+                pos_abertura = buffer.find(abertura, inicio)
+                if pos_abertura == -1:
+                    # Guarda apenas o suficiente para uma tag cortada ao meio
+                    # (ou a identificação de conta ainda sem fechamento)
+                    corte = max(inicio, len(buffer) - cauda)
+                    if buffer.find(MARCA_CONTA, inicio) != -1:
+                        conta, pendente = self._conta_no_intervalo(buffer, inicio, len(buffer))
+                        if conta is not None:
+                            self.conta_atual = conta
+                        if pendente is not None and len(buffer) - pendente <= TAMANHO_CABECALHO:
+                            corte = min(corte, pendente)
+                    inicio = corte
+                    break
+                
+                if buffer.find(MARCA_CONTA, inicio, pos_abertura) != -1:
+                    conta, _ = self._conta_no_intervalo(buffer, inicio, pos_abertura)
+                    if conta is not None:
+                        self.conta_atual = conta
+                
+                limite = pos_abertura + TAMANHO_MAXIMO_TRANSACAO
+                pos_fechamento = buffer.find(fechamento, pos_abertura + len(abertura), limite)
+                if pos_fechamento == -1:
+                    if len(buffer) < limite:
+                        # Transação incompleta: continua no próximo bloco
+                        inicio = pos_abertura
+                        break
                     
-                except (ValueError, IndexError) as e:
-                    print(f"Erro ao processar transacao: {e}")
+                    self._avisar_bloco_sem_fechamento(deslocamento + pos_abertura)
+                    inicio = pos_abertura + len(abertura)
                     continue
+                
+                inicio = pos_fechamento + len(fechamento)
+                yield (
+                    deslocamento + pos_abertura,
+                    deslocamento + inicio,
+                    buffer[pos_abertura + len(abertura):pos_fechamento]
+                )
+            
+            buffer = buffer[inicio:]
+            deslocamento += inicio
+            
+            if not pedaco:
+                break
 
-        print(f"Transações processadas: {transacoes_processadas}")
-        print(f"Lançamentos informativos filtrados: {transacoes_filtradas}")
+    def _decodificar_campo(self, valor, codificacao):
+        """
+        Decodifica um campo bruto do OFX.
         
-        return self.transacoes
+        Campos ASCII (a grande maioria) são convertidos direto. Os demais
+        são lidos como UTF-8 e, se não forem UTF-8 válido, na codificação
+        declarada no cabeçalho: muitos bancos declaram CHARSET:1252 e
+        exportam UTF-8, e um texto em 1252 com acentos quase nunca forma
+        sequências UTF-8 válidas.
+        """
+        if valor.isascii():
+            return valor.decode('ascii')
+        try:
+            return valor.decode('utf-8')
+        except UnicodeDecodeError:
+            return valor.decode(codificacao, errors='replace')
+
+    def _processar_bloco(self, bloco, codificacao='latin1'):
+        """
+        Extrai a transação de um bloco <STMTTRN> em bytes.
+        
+        Todas as tags do bloco são lidas em uma única passada do tokenizador
+        (RE_CAMPO_OFX_BYTES), incluindo FITID, CHECKNUM e TRNTYPE. Os campos
+        ficam em bytes; só o MEMO é decodificado para texto.
+        
+        Args:
+            bloco (bytes | memoryview): Conteúdo do bloco
+            codificacao (str): Codificação alternativa do arquivo
+                (ver codificacao_alternativa)
+            
+        Returns:
+            dict | None: Transação válida, FILTRADA para lançamentos
+            informativos ou None se o bloco estiver incompleto/inválido
+        """
+        campos = {}
+        for tag, valor in RE_CAMPO_OFX_BYTES.findall(bloco):
+            if tag not in campos:
+                campos[tag] = valor
+        
+        data_str = campos.get(b'DTPOSTED')
+        valor_str = campos.get(b'TRNAMT')
+        memo_str = campos.get(b'MEMO')
+
+        if data_str is None or valor_str is None or memo_str is None:
+            return None
+        
+        try:
+            # Processar memo (única decodificação de texto do bloco)
+            memo_str = self._decodificar_campo(memo_str, codificacao).strip()
+            # Valor exato em centavos; o float em reais é derivado dele
+            valor_centavos = para_centavos(valor_str.decode('latin1'))
+            valor_float = centavos_para_reais(valor_centavos)
+            
+            # Verificar se é lançamento informativo
+            padrao_informativo = self.filtro_informativos.verificar(memo_str)
+            if padrao_informativo is not None:
+                self.transacoes_filtradas.append({
+                    'memo': memo_str,
+                    'valor': valor_float,
+                    'motivo': 'Lançamento informativo',
+                    'padrao': padrao_informativo
+                })
+                return FILTRADA
+            
+            # Processar data (AAAAMMDD...), validando via date()
+            data_str = data_str.strip()
+            data_obj = date(int(data_str[0:4]), int(data_str[4:6]), int(data_str[6:8]))
+            data_formatada = f'{data_obj.day:02d}/{data_obj.month:02d}/{data_obj.year:04d}'
+            
+            if self.extrair_campos_memo:
+                # Extrair CNPJ/CPF do memo (uma única vez)
+                cnpj_cpf = self.extrair_cnpj_cpf(memo_str)
+                
+                # Extrair razão social reaproveitando o documento encontrado
+                razao_social = self.extrair_razao_social(memo_str, cnpj_cpf)
+            else:
+                # Preenchidos depois, por coluna (ver completar_campos_memo)
+                cnpj_cpf = razao_social = None
+            
+            return {
+                'Data': data_formatada,
+                'Lancamentos': memo_str,
+                'Razao Social': razao_social,
+                'CNPJ/CPF': cnpj_cpf or '',
+                'Valor': valor_float,
+                'Valor_Centavos': valor_centavos,
+                'Tipo': 'Credito' if valor_centavos > 0 else 'Debito',
+                'FITID': campos.get(b'FITID', b'').strip().decode('latin1'),
+                'Num_Documento': campos.get(b'CHECKNUM', b'').strip().decode('latin1'),
+                'Tipo_OFX': campos.get(b'TRNTYPE', b'').strip().decode('latin1'),
+                **self.conta_atual
+            }
+            
+        except (ValueError, IndexError) as e:
+            self.avisos.append(f"Erro ao processar transacao: {e}")
+            return None
 
     def extrair_cnpj_cpf(self, texto):
         # Busca CNPJ (14 dígitos)
-        cnpj_match = re.search(r'\b\d{14}\b', texto)
+        cnpj_match = RE_CNPJ.search(texto)
         if cnpj_match:
             return cnpj_match.group()
         
         # Busca CPF (11 dígitos)
-        cpf_match = re.search(r'\b\d{11}\b', texto)
+        cpf_match = RE_CPF.search(texto)
         if cpf_match:
             return cpf_match.group()
         
+        # Documentos com pontuação (devolvidos só com os dígitos)
+        for regex in (RE_CNPJ_FORMATADO, RE_CPF_FORMATADO):
+            doc_match = regex.search(texto)
+            if doc_match:
+                return RE_NAO_DIGITO.sub('', doc_match.group())
+        
         return None
 
-    def extrair_razao_social(self, memo):
-        # Remove prefixos comuns
-        prefixos = [
-            'PIX TRANSF ', 'PIX ENVIADO ', 'TED ', 'SISPAG PIX QR-CODE ',
-            'REDE  VISA ', 'REDE  MAST ', 'BOLETO  PAGO ', 'DEV PIX ',
-            'TAR PIX PGTO TRANSF'
-        ]
+    def extrair_razao_social(self, memo, doc=False):
+        """
+        Extrai a razão social do MEMO.
         
+        Args:
+            memo (str): Texto do campo MEMO
+            doc (str | None, optional): Documento já extraído do memo por
+                extrair_cnpj_cpf. Se omitido, é buscado novamente.
+        """
+        # Remove prefixos comuns
         texto = memo
-        for prefixo in prefixos:
+        for prefixo in PREFIXOS_RAZAO_SOCIAL:
             if texto.startswith(prefixo):
                 texto = texto[len(prefixo):].strip()
                 break
         
         # Se tem documento, pega o nome que vem depois
-        doc = self.extrair_cnpj_cpf(texto)
+        if doc is False:
+            doc = self.extrair_cnpj_cpf(texto)
         if doc:
             partes = texto.split(doc)
             if len(partes) > 1:
                 nome = partes[1].strip()
                 # Remove códigos no final
-                nome = re.sub(r'\s+\d+$', '', nome).strip()
+                nome = RE_CODIGO_FINAL.sub('', nome).strip()
                 if nome:
                     return nome
         
         # Limpa datas e códigos
-        texto = re.sub(r'\d{2}/\d{2}', '', texto).strip()
-        texto = re.sub(r'\s+\d{8,}$', '', texto).strip()
+        texto = RE_DATA_CURTA.sub('', texto).strip()
+        texto = RE_CODIGO_LONGO_FINAL.sub('', texto).strip()
         
         return texto if texto else memo
 
@@ -196,9 +916,343 @@ class ExtratorOFX:
         return {
             'transacoes_validas': len(self.transacoes),
             'transacoes_filtradas': len(self.transacoes_filtradas),
-            'detalhes_filtradas': self.transacoes_filtradas
+            'detalhes_filtradas': self.transacoes_filtradas,
+            'filtros_acionados': dict(self.filtro_informativos.contagem),
+            'avisos': list(self.avisos)
         }
 
+def montar_lote_colunar(transacoes):
+    """
+    Monta um lote colunar compacto a partir das transações do extrator.
+    
+    Em vez de uma lista de dicts (um objeto Python por campo de cada
+    transação), o lote guarda cada campo em uma coluna tipada:
+    
+    - Data: datetime64
+    - Valor: float64 (reais) e Valor_Centavos: int64 (valor exato)
+    - Razao Social, CNPJ/CPF, Tipo, Tipo_OFX, Prefixo_Memo e Arquivo_Origem:
+      categóricas (códigos inteiros + dicionário de valores distintos)
+    
+    Um DataFrame recebido é devolvido sem cópia, então os consumidores
+    podem chamar esta função sem se preocupar com o formato de entrada.
+    
+    Args:
+        transacoes (iterable | pd.DataFrame): Transações (lista ou gerador)
+        
+    Returns:
+        pd.DataFrame: Lote colunar
+    """
+    if isinstance(transacoes, pd.DataFrame):
+        return transacoes
+    
+    colunas = None
+    for transacao in transacoes:
+        if colunas is None:
+            colunas = {chave: [] for chave in transacao}
+        for chave, valores in colunas.items():
+            valores.append(transacao.get(chave))
+    
+    if colunas is None:
+        return pd.DataFrame(columns=['Data', 'Lancamentos', 'Razao Social', 'CNPJ/CPF', 'Valor', 'Tipo'])
+    
+    lote = {}
+    for chave, valores in colunas.items():
+        if chave == 'Data':
+            lote[chave] = pd.to_datetime(pd.Series(valores), format='%d/%m/%Y')
+        elif chave == 'Valor':
+            lote[chave] = pd.Series(valores, dtype='float64')
+        elif chave == COLUNA_CENTAVOS:
+            lote[chave] = pd.Series(valores, dtype='int64')
+        elif chave in COLUNAS_CATEGORICAS:
+            lote[chave] = pd.Series(pd.Categorical(valores))
+        else:
+            lote[chave] = pd.Series(valores)
+    
+    if 'Lancamentos' in lote:
+        prefixos = lote['Lancamentos'].str.extract(RE_PREFIXO_MEMO, expand=False)
+        lote['Prefixo_Memo'] = prefixos.fillna('').str.strip().astype('category')
+    
+    return pd.DataFrame(lote)
+
+
+def extrair_cnpj_cpf_coluna(textos):
+    """
+    Versão por coluna de ExtratorOFX.extrair_cnpj_cpf.
+    
+    Mesma prioridade: CNPJ de 14 dígitos, CPF de 11 dígitos e, por fim,
+    documentos formatados (devolvidos só com os dígitos).
+    
+    Args:
+        textos (pd.Series): Textos do MEMO
+        
+    Returns:
+        pd.Series: Documento de cada linha ('' quando não há)
+    """
+    textos = textos.astype(str)
+    documentos = pd.Series('', index=textos.index, dtype=object)
+    
+    # Cada padrão só é aplicado às linhas em que os anteriores não acharam nada
+    pendentes = textos
+    for regex in (RE_CNPJ, RE_CPF, RE_CNPJ_FORMATADO, RE_CPF_FORMATADO):
+        encontrados = pendentes.str.extract(regex.pattern.join('()'), expand=False).dropna()
+        if regex in (RE_CNPJ_FORMATADO, RE_CPF_FORMATADO):
+            encontrados = encontrados.str.replace(RE_NAO_DIGITO, '', regex=True)
+        documentos[encontrados.index] = encontrados
+        pendentes = pendentes.drop(encontrados.index)
+        if pendentes.empty:
+            break
+    
+    return documentos
+
+
+def extrair_razao_social_coluna(memos):
+    """
+    Versão por coluna de ExtratorOFX.extrair_razao_social (mesma saída).
+    
+    Remove o prefixo do MEMO, pega o nome que vem depois do CNPJ/CPF (sem o
+    código final) e, se não houver, limpa datas curtas e códigos longos.
+    Só documentos sem pontuação são usados para separar o nome, como no
+    método original, para que a razão social já gravada não mude.
+    
+    Args:
+        memos (pd.Series): Textos do MEMO
+        
+    Returns:
+        pd.Series: Razão social de cada linha
+    """
+    memos = memos.astype(str)
+    
+    # Prefixo: somente o primeiro da lista que casar; só então o texto é aparado
+    tem_prefixo = memos.str.match(RE_PREFIXO_MEMO)
+    textos = memos.where(~tem_prefixo, memos.str.replace(RE_PREFIXO_MEMO, '', n=1, regex=True).str.strip())
+    
+    # Nome entre o documento e a próxima ocorrência dele (equivale a split(doc)[1]);
+    # o CPF só é procurado onde não há CNPJ
+    nomes = textos.str.extract(RE_NOME_APOS_CNPJ, expand=True)['nome']
+    sem_cnpj = nomes.isna()
+    if sem_cnpj.any():
+        nomes[sem_cnpj] = textos[sem_cnpj].str.extract(RE_NOME_APOS_CPF, expand=True)['nome']
+    com_nome = nomes.notna()
+    nomes[com_nome] = nomes[com_nome].str.strip().str.replace(RE_CODIGO_FINAL, '', regex=True).str.strip()
+    
+    # Sem nome após o documento: limpa datas e códigos
+    sem_nome = nomes.isna() | (nomes == '')
+    limpos = textos[sem_nome].str.replace(RE_DATA_CURTA, '', regex=True).str.strip()
+    limpos = limpos.str.replace(RE_CODIGO_LONGO_FINAL, '', regex=True).str.strip()
+    nomes[sem_nome] = limpos.where(limpos != '', memos[sem_nome])
+    
+    return nomes
+
+
+def completar_campos_memo(lote):
+    """
+    Preenche 'Razao Social' e 'CNPJ/CPF' de um lote colunar a partir de
+    'Lancamentos', processando cada MEMO distinto uma única vez.
+    
+    Args:
+        lote (pd.DataFrame): Lote colunar (ver montar_lote_colunar)
+        
+    Returns:
+        pd.DataFrame: O mesmo lote, com as duas colunas categóricas
+    """
+    if lote.empty or 'Lancamentos' not in lote.columns:
+        return lote
+    
+    codigos, memos = pd.factorize(lote['Lancamentos'].astype(str))
+    memos = pd.Series(memos)
+    
+    razao_social = extrair_razao_social_coluna(memos).to_numpy()
+    cnpj_cpf = extrair_cnpj_cpf_coluna(memos).to_numpy()
+    
+    lote['Razao Social'] = pd.Categorical(razao_social[codigos])
+    lote['CNPJ/CPF'] = pd.Categorical(cnpj_cpf[codigos])
+    return lote
+
+
+def _eh_caminho(fonte):
+    return isinstance(fonte, (str, os.PathLike))
+
+
+def _eh_gzip(caminho):
+    return os.fspath(caminho).lower().endswith('.gz')
+
+
+def _eh_zip(caminho):
+    return os.fspath(caminho).lower().endswith('.zip')
+
+
+def suporta_leitura_incremental(fonte):
+    """
+    Indica se a fonte pode ser lida com processar_arquivo_incremental.
+    
+    Só arquivos .ofx no disco: a continuação depende de seek, que .gz,
+    membros de .zip e conteúdos em memória não oferecem.
+    """
+    return _eh_caminho(fonte) and not _eh_gzip(fonte) and not _eh_zip(fonte)
+
+
+def nome_fonte(fonte):
+    """Nome de exibição/origem de uma fonte de extrato."""
+    if isinstance(fonte, MembroZip):
+        nome_zip = os.path.basename(fonte.arquivo_zip) if _eh_caminho(fonte.arquivo_zip) else 'zip'
+        return f'{nome_zip}/{os.path.basename(fonte.membro)}'
+    if isinstance(fonte, ConteudoOFX):
+        return fonte.nome
+    return os.path.basename(os.fspath(fonte))
+
+
+def listar_fontes_ofx(fonte):
+    """
+    Expande uma fonte nos extratos que ela contém.
+    
+    Um .zip (no disco ou em memória) vira um MembroZip por membro .ofx, em
+    ordem natural dos nomes; as demais fontes são devolvidas como estão.
+    Os membros não são lidos aqui: cada um pode ser aberto de forma
+    independente (inclusive em outro processo).
+    
+    Args:
+        fonte: Caminho, MembroZip ou ConteudoOFX
+        
+    Returns:
+        list: Fontes de um único extrato cada
+    """
+    if _eh_caminho(fonte) and _eh_zip(fonte):
+        arquivo_zip = os.fspath(fonte)
+    elif isinstance(fonte, ConteudoOFX) and fonte.dados[:4] == ASSINATURA_ZIP:
+        arquivo_zip = fonte.dados
+    else:
+        return [fonte]
+    
+    with _abrir_zip(arquivo_zip) as zip_aberto:
+        membros = [
+            info.filename for info in zip_aberto.infolist()
+            if not info.is_dir() and info.filename.lower().endswith(('.ofx', '.ofx.gz'))
+        ]
+    
+    membros.sort(key=lambda nome: [int(p) if p.isdigit() else p for p in re.split(r'(\d+)', nome.lower())])
+    return [MembroZip(arquivo_zip, membro) for membro in membros]
+
+
+def _abrir_zip(arquivo_zip):
+    if isinstance(arquivo_zip, (bytes, bytearray, memoryview)):
+        return zipfile.ZipFile(io.BytesIO(arquivo_zip))
+    return zipfile.ZipFile(arquivo_zip)
+
+
+@contextmanager
+def abrir_fonte_ofx(fonte):
+    """
+    Abre um único extrato como arquivo binário de leitura sequencial.
+    
+    - caminho .ofx: o próprio arquivo
+    - caminho .gz: descompactação em fluxo (gzip)
+    - MembroZip: o membro aberto direto do .zip, também em fluxo
+    - ConteudoOFX: BytesIO sobre os bytes (descompactado em fluxo se for gzip)
+    - objeto com read(): usado como está (não é fechado aqui)
+    
+    Em nenhum caso o conteúdo é gravado em arquivo temporário ou lido
+    inteiro: a memória usada não depende do tamanho do extrato.
+    """
+    if isinstance(fonte, MembroZip):
+        with _abrir_zip(fonte.arquivo_zip) as zip_aberto, zip_aberto.open(fonte.membro) as membro:
+            if fonte.membro.lower().endswith('.gz'):
+                with gzip.GzipFile(fileobj=membro) as file:
+                    yield file
+            else:
+                yield membro
+    elif isinstance(fonte, ConteudoOFX):
+        with io.BytesIO(fonte.dados) as memoria:
+            if fonte.dados[:2] == ASSINATURA_GZIP:
+                with gzip.GzipFile(fileobj=memoria) as file:
+                    yield file
+            else:
+                yield memoria
+    elif hasattr(fonte, 'read'):
+        yield fonte
+    elif _eh_zip(fonte):
+        raise ValueError(f"{nome_fonte(fonte)} contém vários extratos: use listar_fontes_ofx")
+    elif _eh_gzip(fonte):
+        with gzip.open(fonte, 'rb') as file:
+            yield file
+    else:
+        with open(fonte, 'rb') as file:
+            yield file
+
+
+def detectar_codificacao(cabecalho):
+    """
+    Lê a codificação declarada nos primeiros bytes de um arquivo OFX.
+    
+    Considera o BOM UTF-8, o prólogo XML (OFX 2.x) e as linhas
+    ENCODING:/CHARSET: do cabeçalho SGML (OFX 1.x).
+    
+    Args:
+        cabecalho (bytes): Primeiros bytes do arquivo
+        
+    Returns:
+        str | None: Nome do codec Python ou None se nada foi declarado
+    """
+    if cabecalho.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8'
+    
+    match = RE_ENCODING_XML.search(cabecalho)
+    if match:
+        return _normalizar_codec(match.group(1).decode('ascii'))
+    
+    match = RE_ENCODING_OFX.search(cabecalho)
+    if match and match.group(1).strip().upper().replace(b'-', b'') in (b'UTF8', b'UNICODE'):
+        return 'utf-8'
+    
+    match = RE_CHARSET_OFX.search(cabecalho)
+    if match:
+        charset = match.group(1).strip().decode('ascii', errors='replace').upper()
+        if charset in ('1252', 'WINDOWS-1252', 'CP1252'):
+            return 'cp1252'
+        if charset in ('ISO-8859-1', '8859-1', 'LATIN1', 'LATIN-1'):
+            return 'latin1'
+        if charset not in ('', 'NONE'):
+            return _normalizar_codec(charset)
+    
+    return None
+
+
+def _normalizar_codec(nome):
+    """Valida o nome de codec declarado (None se o Python não o conhece)."""
+    try:
+        return codecs.lookup(nome).name
+    except LookupError:
+        return None
+
+
+def codificacao_alternativa(codificacao):
+    """
+    Codificação usada para campos que não são UTF-8 válido.
+    
+    Arquivos declarados como UTF-8 ou sem declaração usam latin1, que
+    decodifica qualquer sequência de bytes.
+    """
+    if codificacao is None or codificacao == 'utf-8':
+        return 'latin1'
+    return codificacao
+
+
+def formatar_datas(datas):
+    """
+    Converte uma coluna de datas (datetime64 ou texto) para texto DD/MM/AAAA.
+    
+    Extratos repetem poucas datas distintas: só elas passam pelo strftime
+    e o texto volta para as linhas pelos códigos de pd.factorize.
+    """
+    if pd.api.types.is_datetime64_any_dtype(datas):
+        codigos, unicas = pd.factorize(datas)
+        if (codigos < 0).any():
+            # Datas ausentes (NaT): strftime linha a linha devolve NaN
+            return datas.dt.strftime('%d/%m/%Y')
+        textos = pd.Series(unicas.strftime('%d/%m/%Y'))
+        return pd.Series(textos.take(codigos).to_numpy(), index=datas.index, dtype=textos.dtype)
+    return datas.astype(str)
+
+
 # Teste rápido
 if __name__ == "__main__":
     extrator = ExtratorOFX()
@@ -213,3 +1267,5 @@ if __name__ == "__main__":
         print(f"\nEstatísticas dos filtros:")
         print(f"- Transações válidas: {stats['transacoes_validas']}")
         print(f"- Transações filtradas: {stats['transacoes_filtradas']}")
+        for aviso in stats['avisos']:
+            print(f"- Aviso: {aviso}")
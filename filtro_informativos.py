@@ -0,0 +1,165 @@
+import os
+import re
+import json
+import hashlib
+from collections import Counter
+
+import pandas as pd
+
+# Seção do configuracoes.json com os padrões de lançamentos informativos
+SECAO_CONFIGURACAO = 'filtros_informativos'
+
+ARQUIVO_CONFIGURACAO = os.path.join('dados_persistentes', 'configuracoes.json')
+
+# Padrões usados quando a configuração não define a seção. 'texto' é uma
+# substring literal; 'regex' é uma expressão regular. Ambos são aplicados
+# sobre o MEMO em maiúsculas e sem espaços nas pontas.
+PADROES_INFORMATIVOS_PADRAO = [
+    {'nome': 'saldo_total_disponivel_dia', 'texto': 'SALDO TOTAL DISPONÍVEL DIA'},
+    {'nome': 'saldo_anterior', 'texto': 'SALDO ANTERIOR'},
+    {'nome': 'saldo_disponivel', 'texto': 'SALDO DISPONÍVEL'},
+    {'nome': 'saldo_inicial', 'texto': 'SALDO INICIAL'},
+    {'nome': 'saldo_final', 'texto': 'SALDO FINAL'},
+    {'nome': 'saldo_sem_acento', 'regex': r'^SALDO\s+(?:TOTAL|DISPONIVEL|ANTERIOR|INICIAL|FINAL)'},
+    {'nome': 'posicao_do_dia', 'regex': r'POSICAO\s+DO\s+DIA'},
+    {'nome': 'extrato_do_dia', 'regex': r'EXTRATO\s+DO\s+DIA'}
+]
+
+
+def carregar_padroes_informativos(arquivo_config=ARQUIVO_CONFIGURACAO):
+    """
+    Lê os padrões de lançamentos informativos do configuracoes.json.
+
+    Formato da seção:
+        "filtros_informativos": {
+            "padroes": [
+                {"nome": "saldo_anterior", "texto": "SALDO ANTERIOR"},
+                {"nome": "posicao_do_dia", "regex": "POSICAO\\\\s+DO\\\\s+DIA"}
+            ]
+        }
+
+    Args:
+        arquivo_config (str): Caminho do configuracoes.json
+
+    Returns:
+        list: Padrões configurados ou PADROES_INFORMATIVOS_PADRAO se o
+        arquivo/seção não existir
+    """
+    try:
+        with open(arquivo_config, 'r', encoding='utf-8') as f:
+            padroes = json.load(f).get(SECAO_CONFIGURACAO, {}).get('padroes')
+    except FileNotFoundError:
+        padroes = None
+    except Exception as e:
+        print(f"Erro ao carregar filtros informativos (usando padrões): {e}")
+        padroes = None
+
+    if not padroes:
+        return [dict(padrao) for padrao in PADROES_INFORMATIVOS_PADRAO]
+
+    return padroes
+
+
+class FiltroInformativos:
+    """
+    Identifica lançamentos informativos (saldos, posição do dia) pelo MEMO.
+
+    Todos os padrões são compilados uma única vez em uma só regex de
+    alternação, com um grupo nomeado por padrão: cada MEMO é avaliado em
+    uma passada e o grupo que casou diz qual filtro disparou. As ocorrências
+    de cada filtro são contadas em self.contagem.
+    """
+
+    def __init__(self, padroes=None):
+        """
+        Args:
+            padroes (list, optional): Lista de {'nome', 'texto' | 'regex'};
+                None usa PADROES_INFORMATIVOS_PADRAO
+        """
+        if padroes is None:
+            padroes = PADROES_INFORMATIVOS_PADRAO
+
+        self.padroes = []
+        alternativas = []
+        for i, padrao in enumerate(padroes):
+            if 'regex' in padrao:
+                expressao = padrao['regex']
+            elif 'texto' in padrao:
+                expressao = re.escape(padrao['texto'].upper().strip())
+            else:
+                raise ValueError(f"Padrão informativo sem 'texto' ou 'regex': {padrao!r}")
+
+            nome = padrao.get('nome') or padrao.get('texto') or expressao
+            self.padroes.append({'nome': nome, 'expressao': expressao})
+            alternativas.append(f'(?P<p{i}>{expressao})')
+
+        # Sem padrões, a regex nunca casa
+        self.regex = re.compile('|'.join(alternativas) if alternativas else r'(?!)')
+        # Mesma alternação sem grupos, para a busca vetorizada (str.contains)
+        self._regex_busca = re.compile(
+            '|'.join(f"(?:{padrao['expressao']})" for padrao in self.padroes) or r'(?!)'
+        )
+        self._nomes_grupos = {f'p{i}': padrao['nome'] for i, padrao in enumerate(self.padroes)}
+
+        self.contagem = Counter()
+
+    @classmethod
+    def do_arquivo(cls, arquivo_config=ARQUIVO_CONFIGURACAO):
+        """Cria o filtro com os padrões do configuracoes.json."""
+        return cls(carregar_padroes_informativos(arquivo_config))
+
+    def verificar(self, memo):
+        """
+        Verifica um MEMO e contabiliza o filtro que disparou.
+
+        Args:
+            memo (str): Texto do campo MEMO
+
+        Returns:
+            str | None: Nome do padrão que casou ou None se não for informativo
+        """
+        resultado = self.regex.search(memo.upper().strip())
+        if resultado is None:
+            return None
+
+        nome = self._nomes_grupos[resultado.lastgroup]
+        self.contagem[nome] += 1
+        return nome
+
+    def eh_informativo(self, memo):
+        return self.verificar(memo) is not None
+
+    def classificar_coluna(self, memos):
+        """
+        Modo vetorizado: classifica uma coluna inteira de MEMOs.
+
+        Args:
+            memos (pd.Series): Textos do MEMO
+
+        Returns:
+            pd.Series: Nome do padrão que casou em cada linha (None para
+            lançamentos que não são informativos), com o mesmo índice
+        """
+        if memos.empty or not self.padroes:
+            return pd.Series([None] * len(memos), index=memos.index, dtype='object')
+
+        normalizados = memos.fillna('').astype(str).str.upper().str.strip()
+        nomes = pd.Series([None] * len(memos), index=memos.index, dtype='object')
+
+        # Passada rápida de busca; os grupos só são extraídos das linhas que casaram
+        informativos = normalizados.str.contains(self._regex_busca)
+        if informativos.any():
+            grupos = normalizados[informativos].str.extract(self.regex)[list(self._nomes_grupos)]
+            # Na alternação só o grupo do padrão que casou fica preenchido
+            nomes[informativos] = grupos.notna().idxmax(axis=1).map(self._nomes_grupos).astype(object)
+            self.contagem.update(nomes[informativos].tolist())
+
+        return nomes
+
+    def assinatura(self):
+        """Hash dos padrões (entra na chave do CacheOFX)."""
+        partes = [f"{padrao['nome']}={padrao['expressao']}" for padrao in self.padroes]
+        return hashlib.sha256('\x1f'.join(partes).encode('utf-8')).hexdigest()
+
+    def zerar_contagem(self):
+        self.contagem.clear()
@@ -2,26 +2,91 @@ import pandas as pd
 import os
 from datetime import datetime
 import json
+from concurrent.futures import ThreadPoolExecutor
+from dinheiro import COLUNA_CENTAVOS, para_centavos, centavos_para_reais, garantir_coluna_centavos, resumir_centavos
+from filtro_informativos import SECAO_CONFIGURACAO, PADROES_INFORMATIVOS_PADRAO
+from contas import COLUNAS_CONTA, DIRETORIO_CONTAS, PARTICAO_RAIZ, particoes_da_tabela, garantir_colunas_conta
+from regras_categorizacao import NOME_ARQUIVO_REGRAS, obter_regras
+from indice_documentos import NOME_ARQUIVO_INDICE, ORIGEM_MANUAL, obter_indice
+
+# Separador entre o FITID original e o número da parte em receitas divididas
+SEPARADOR_FITID_DIVISAO = '#'
+
+# Primeira linha do índice de FITIDs: tamanho e mtime (ns) do CSV da tabela
+# com que o índice está sincronizado (largura fixa, regravada no lugar)
+CABECALHO_INDICE_FITID = '#{:020d} {:020d}\n'
+
+# Despesas com a categoria corrigida à mão (ORIGEM_MANUAL): a
+# recategorização do histórico não as toca
+COLUNA_ORIGEM_CATEGORIA = 'Origem_Categoria'
+
+# Esquema das tabelas vazias
+COLUNAS_DESPESAS = [
+    'Data', 'Descricao', 'Valor', 'Valor_Centavos', 'Razao_Social_Original',
+    'Data_Processamento', 'Arquivo_Origem', 'Mes_Ano', 'FITID', 'CNPJ_CPF',
+    COLUNA_ORIGEM_CATEGORIA
+] + COLUNAS_CONTA
+
+COLUNAS_RECEITAS = [
+    'Data', 'Razao_Social_Original', 'Razao_Social_Limpa', 'Valor', 'Valor_Centavos',
+    'Paciente', 'Fonte_Pagamento', 'Tipo_Preenchimento',
+    'Requer_Preenchimento_Manual', 'Motivo_Categorizacao',
+    'Data_Processamento', 'Arquivo_Origem', 'Mes_Ano', 'FITID', 'CNPJ_CPF'
+] + COLUNAS_CONTA
+
+# Leituras simultâneas das partições (uma por conta) ao agregar as tabelas
+MAX_LEITURAS_PARALELAS = 8
+
+# Colunas lidas como texto (identificadores com zeros à esquerda)
+TIPOS_TEXTO = {coluna: str for coluna in ['FITID', 'CNPJ_CPF'] + COLUNAS_CONTA}
 
 class GerenciadorPersistenciaUnificado:
     """
     Gerencia a persistência de dados de despesas, receitas e configurações
     do sistema de extração bancária de forma unificada.
+    
+    As tabelas são particionadas por conta bancária: cada conta tem suas
+    tabelas em dados_persistentes/contas/<BANCO-AGENCIA-CONTA>/ e os
+    registros sem conta identificada ficam na raiz. O gerenciador da raiz
+    distribui os registros entre as partições ao salvar e agrega todas
+    elas (em paralelo) ao carregar; histórico e configurações são únicos.
     """
     
-    def __init__(self, diretorio_dados='dados_persistentes'):
+    def __init__(self, diretorio_dados='dados_persistentes', particao=PARTICAO_RAIZ):
+        """
+        Args:
+            diretorio_dados (str): Diretório dos dados persistentes
+            particao (str, optional): Identificador da conta (ver
+                contas.identificador_particao); vazio para a raiz
+        """
         self.diretorio_dados = diretorio_dados
+        self.particao = particao
+        
+        # Tabelas da conta ou da raiz
+        if particao:
+            self.diretorio_tabelas = os.path.join(diretorio_dados, DIRETORIO_CONTAS, particao)
+        else:
+            self.diretorio_tabelas = diretorio_dados
+        self._particoes = {}
         
         # Arquivos de dados
-        self.arquivo_despesas = os.path.join(diretorio_dados, 'despesas.csv')
-        self.arquivo_receitas = os.path.join(diretorio_dados, 'receitas_simples.csv')
+        self.arquivo_despesas = os.path.join(self.diretorio_tabelas, 'despesas.csv')
+        self.arquivo_receitas = os.path.join(self.diretorio_tabelas, 'receitas_simples.csv')
         
         # Arquivos de controle
         self.arquivo_historico = os.path.join(diretorio_dados, 'historico_processamentos.json')
         self.arquivo_config = os.path.join(diretorio_dados, 'configuracoes.json')
         
+        # Índices de FITIDs já salvos (cabeçalho com a assinatura da tabela e
+        # um FITID por linha, apenas acréscimos)
+        self.arquivos_indice_fitid = {
+            'despesas': os.path.join(self.diretorio_tabelas, 'fitids_despesas.idx'),
+            'receitas': os.path.join(self.diretorio_tabelas, 'fitids_receitas.idx')
+        }
+        self._indices_fitid = {}
+        
         # Criar diretório se não existir
-        os.makedirs(diretorio_dados, exist_ok=True)
+        os.makedirs(self.diretorio_tabelas, exist_ok=True)
         
         # Inicializar arquivos se não existirem
         self._inicializar_arquivos()
@@ -31,20 +96,12 @@ class GerenciadorPersistenciaUnificado:
         
         # Inicializar arquivo de despesas
         if not os.path.exists(self.arquivo_despesas):
-            df_despesas_vazio = pd.DataFrame(columns=[
-                'Data', 'Descricao', 'Valor', 'Razao_Social_Original', 
-                'Data_Processamento', 'Arquivo_Origem', 'Mes_Ano'
-            ])
+            df_despesas_vazio = pd.DataFrame(columns=COLUNAS_DESPESAS)
             df_despesas_vazio.to_csv(self.arquivo_despesas, index=False, encoding='utf-8')
         
         # Inicializar arquivo de receitas
         if not os.path.exists(self.arquivo_receitas):
-            df_receitas_vazio = pd.DataFrame(columns=[
-                'Data', 'Razao_Social_Original', 'Razao_Social_Limpa', 'Valor',
-                'Paciente', 'Fonte_Pagamento', 'Tipo_Preenchimento',
-                'Requer_Preenchimento_Manual', 'Motivo_Categorizacao',
-                'Data_Processamento', 'Arquivo_Origem', 'Mes_Ano'
-            ])
+            df_receitas_vazio = pd.DataFrame(columns=COLUNAS_RECEITAS)
             df_receitas_vazio.to_csv(self.arquivo_receitas, index=False, encoding='utf-8')
         
         # Inicializar histórico de processamentos
@@ -75,6 +132,9 @@ class GerenciadorPersistenciaUnificado:
                 'configuracoes_receitas': {
                     'preenchimento_manual': True,
                     'identificacao_automatica': True
+                },
+                SECAO_CONFIGURACAO: {
+                    'padroes': PADROES_INFORMATIVOS_PADRAO
                 }
             }
             with open(self.arquivo_config, 'w', encoding='utf-8') as f:
@@ -95,9 +155,19 @@ class GerenciadorPersistenciaUnificado:
         Returns:
             dict: Resultado da operação
         """
+        # Na raiz, cada registro vai para a partição da sua conta
+        if not self.particao:
+            grupos = self._separar_por_particao(novas_despesas)
+            if list(grupos) != [PARTICAO_RAIZ] or (modo == 'sobrescrever' and self.listar_particoes()):
+                return self._salvar_por_particao('despesas', grupos, arquivo_origem, modo, mes_ano)
+        
+        return self._salvar_despesas_particao(novas_despesas, arquivo_origem, modo, mes_ano)
+    
+    def _salvar_despesas_particao(self, novas_despesas, arquivo_origem, modo, mes_ano, registrar=True):
+        """Grava as despesas nas tabelas desta partição (registrar=False não anota no histórico)."""
         try:
             # Adicionar informações de origem
-            novas_despesas = novas_despesas.copy()
+            novas_despesas = garantir_coluna_centavos(novas_despesas.copy())
             novas_despesas['Arquivo_Origem'] = arquivo_origem
 
             # Adicionar mês/ano se fornecido
@@ -107,49 +177,38 @@ class GerenciadorPersistenciaUnificado:
             if modo == 'sobrescrever':
                 # Sobrescrever arquivo
                 novas_despesas.to_csv(self.arquivo_despesas, index=False, encoding='utf-8')
+                self._reiniciar_indice_fitid('despesas', novas_despesas)
                 total_final = len(novas_despesas)
                 novas_adicionadas = len(novas_despesas)
             else:
-                # Adicionar às existentes
-                despesas_existentes = self.carregar_despesas()
+                # Índice de FITIDs sincronizado com a tabela antes do acréscimo
+                self._carregar_indice_fitid('despesas')
                 
                 # Verificar duplicatas (opcional)
                 config = self.carregar_configuracoes()
                 if not config.get('configuracoes_categorizacao', {}).get('permitir_duplicatas', False):
-                    # Remover possíveis duplicatas baseadas em Data, Valor e Razão Social
-                    chaves_duplicata = ['Data', 'Valor', 'Razao_Social_Original']
-                    
-                    if not despesas_existentes.empty:
-                        # Marcar duplicatas
-                        merged = pd.merge(
-                            novas_despesas, 
-                            despesas_existentes[chaves_duplicata], 
-                            on=chaves_duplicata, 
-                            how='left', 
-                            indicator=True
-                        )
-                        novas_despesas = merged[merged['_merge'] == 'left_only'].drop('_merge', axis=1)
-                
-                # Combinar dados
-                if despesas_existentes.empty:
-                    todas_despesas = novas_despesas
-                else:
-                    todas_despesas = pd.concat([despesas_existentes, novas_despesas], ignore_index=True)
+                    # FITID pelo índice; Data, Valor e Razão Social apenas sem FITID
+                    novas_despesas = self._remover_duplicatas(novas_despesas, 'despesas', self.arquivo_despesas)
                 
-                # Salvar
-                todas_despesas.to_csv(self.arquivo_despesas, index=False, encoding='utf-8')
-                total_final = len(todas_despesas)
+                # Acrescentar ao arquivo e ao índice
+                total_final = self._acrescentar_registros(novas_despesas, self.arquivo_despesas)
+                self._registrar_fitids('despesas', novas_despesas)
                 novas_adicionadas = len(novas_despesas)
             
+            # Documentos das despesas gravadas passam a valer antes das regras
+            self._confirmar_documentos('despesas', novas_despesas)
+            
             # Registrar no histórico
-            self._registrar_processamento_despesas(arquivo_origem, novas_adicionadas, total_final)
+            if registrar:
+                self._registrar_processamento_despesas(arquivo_origem, novas_adicionadas, total_final)
             
             return {
                 'sucesso': True,
                 'novas_despesas': novas_adicionadas,
                 'total_despesas': total_final,
                 'modo': modo,
-                'arquivo_origem': arquivo_origem
+                'arquivo_origem': arquivo_origem,
+                'meses': self._meses_registros(novas_despesas)
             }
             
         except Exception as e:
@@ -162,19 +221,12 @@ class GerenciadorPersistenciaUnificado:
     
     def carregar_despesas(self):
         """
-        Carrega todas as despesas salvas.
+        Carrega todas as despesas salvas (de todas as contas, na raiz).
         
         Returns:
             pd.DataFrame: DataFrame com todas as despesas
         """
-        try:
-            if os.path.exists(self.arquivo_despesas):
-                return pd.read_csv(self.arquivo_despesas, encoding='utf-8')
-            else:
-                return pd.DataFrame()
-        except Exception as e:
-            print(f"Erro ao carregar despesas: {e}")
-            return pd.DataFrame()
+        return self._carregar_agregado('despesas')
     
     def obter_resumo_despesas(self):
         """
@@ -200,7 +252,7 @@ class GerenciadorPersistenciaUnificado:
         # Resumo geral
         resumo = {
             'total_despesas': len(despesas),
-            'valor_total': despesas['Valor'].sum(),
+            'valor_total': centavos_para_reais(int(despesas[COLUNA_CENTAVOS].sum())),
             'periodo': {
                 'inicio': despesas['Data_dt'].min().strftime('%d/%m/%Y'),
                 'fim': despesas['Data_dt'].max().strftime('%d/%m/%Y')
@@ -208,30 +260,27 @@ class GerenciadorPersistenciaUnificado:
         }
         
         # Por categoria
-        por_categoria = despesas.groupby('Descricao').agg({
-            'Valor': ['sum', 'count', 'mean'],
-            'Data_dt': ['min', 'max']
-        }).round(2)
+        por_categoria = resumir_centavos(despesas, 'Descricao', 'Data_dt')
         
         resumo['por_categoria'] = {}
         for categoria in por_categoria.index:
             resumo['por_categoria'][categoria] = {
-                'total': por_categoria.loc[categoria, ('Valor', 'sum')],
-                'quantidade': por_categoria.loc[categoria, ('Valor', 'count')],
-                'media': por_categoria.loc[categoria, ('Valor', 'mean')],
-                'primeira_data': por_categoria.loc[categoria, ('Data_dt', 'min')].strftime('%d/%m/%Y'),
-                'ultima_data': por_categoria.loc[categoria, ('Data_dt', 'max')].strftime('%d/%m/%Y')
+                'total': por_categoria.loc[categoria, 'total'],
+                'quantidade': por_categoria.loc[categoria, 'quantidade'],
+                'media': por_categoria.loc[categoria, 'media'],
+                'primeira_data': por_categoria.loc[categoria, 'primeira_data'].strftime('%d/%m/%Y'),
+                'ultima_data': por_categoria.loc[categoria, 'ultima_data'].strftime('%d/%m/%Y')
             }
         
         # Por mês
         despesas['Mes_Ano'] = despesas['Data_dt'].dt.strftime('%m/%Y')
-        por_mes = despesas.groupby('Mes_Ano')['Valor'].agg(['sum', 'count']).round(2)
+        por_mes = resumir_centavos(despesas, 'Mes_Ano', None)
         
         resumo['por_mes'] = {}
         for mes in por_mes.index:
             resumo['por_mes'][mes] = {
-                'total': por_mes.loc[mes, 'sum'],
-                'quantidade': por_mes.loc[mes, 'count']
+                'total': por_mes.loc[mes, 'total'],
+                'quantidade': por_mes.loc[mes, 'quantidade']
             }
         
         return resumo
@@ -251,9 +300,19 @@ class GerenciadorPersistenciaUnificado:
         Returns:
             dict: Resultado da operação
         """
+        # Na raiz, cada registro vai para a partição da sua conta
+        if not self.particao:
+            grupos = self._separar_por_particao(novas_receitas)
+            if list(grupos) != [PARTICAO_RAIZ] or (modo == 'sobrescrever' and self.listar_particoes()):
+                return self._salvar_por_particao('receitas', grupos, arquivo_origem, modo, mes_ano)
+        
+        return self._salvar_receitas_particao(novas_receitas, arquivo_origem, modo, mes_ano)
+    
+    def _salvar_receitas_particao(self, novas_receitas, arquivo_origem, modo, mes_ano, registrar=True):
+        """Grava as receitas nas tabelas desta partição (registrar=False não anota no histórico)."""
         try:
             # Adicionar informações de origem
-            novas_receitas = novas_receitas.copy()
+            novas_receitas = garantir_coluna_centavos(novas_receitas.copy())
             novas_receitas['Arquivo_Origem'] = arquivo_origem
 
             # Adicionar mês/ano se fornecido
@@ -263,40 +322,29 @@ class GerenciadorPersistenciaUnificado:
             if modo == 'sobrescrever':
                 # Sobrescrever arquivo
                 novas_receitas.to_csv(self.arquivo_receitas, index=False, encoding='utf-8')
+                self._reiniciar_indice_fitid('receitas', novas_receitas)
                 total_final = len(novas_receitas)
                 novas_adicionadas = len(novas_receitas)
             else:
-                # Adicionar às existentes
-                receitas_existentes = self.carregar_receitas()
+                # Índice de FITIDs sincronizado com a tabela antes do acréscimo
+                self._carregar_indice_fitid('receitas')
                 
                 # Verificar duplicatas
                 config = self.carregar_configuracoes()
                 if not config.get('configuracoes_categorizacao', {}).get('permitir_duplicatas', False):
-                    chaves_duplicata = ['Data', 'Valor', 'Razao_Social_Original']
-                    
-                    if not receitas_existentes.empty:
-                        merged = pd.merge(
-                            novas_receitas, 
-                            receitas_existentes[chaves_duplicata], 
-                            on=chaves_duplicata, 
-                            how='left', 
-                            indicator=True
-                        )
-                        novas_receitas = merged[merged['_merge'] == 'left_only'].drop('_merge', axis=1)
+                    novas_receitas = self._remover_duplicatas(novas_receitas, 'receitas', self.arquivo_receitas)
                 
-                # Combinar dados
-                if receitas_existentes.empty:
-                    todas_receitas = novas_receitas
-                else:
-                    todas_receitas = pd.concat([receitas_existentes, novas_receitas], ignore_index=True)
-                
-                # Salvar
-                todas_receitas.to_csv(self.arquivo_receitas, index=False, encoding='utf-8')
-                total_final = len(todas_receitas)
+                # Acrescentar ao arquivo e ao índice
+                total_final = self._acrescentar_registros(novas_receitas, self.arquivo_receitas)
+                self._registrar_fitids('receitas', novas_receitas)
                 novas_adicionadas = len(novas_receitas)
             
+            # Pacientes confirmados passam a valer pelo documento do pagador
+            self._confirmar_documentos('receitas', novas_receitas)
+            
             # Registrar no histórico
-            self._registrar_processamento_receitas(arquivo_origem, novas_adicionadas, total_final)
+            if registrar:
+                self._registrar_processamento_receitas(arquivo_origem, novas_adicionadas, total_final)
             
             return {
                 'sucesso': True,
@@ -304,7 +352,8 @@ class GerenciadorPersistenciaUnificado:
                 'total_receitas': total_final,
                 'modo': modo,
                 'arquivo_origem': arquivo_origem,
-                'requer_preenchimento_manual': len(novas_receitas[novas_receitas['Requer_Preenchimento_Manual'] == True])
+                'requer_preenchimento_manual': len(novas_receitas[novas_receitas['Requer_Preenchimento_Manual'] == True]),
+                'meses': self._meses_registros(novas_receitas)
             }
             
         except Exception as e:
@@ -317,19 +366,12 @@ class GerenciadorPersistenciaUnificado:
     
     def carregar_receitas(self):
         """
-        Carrega todas as receitas salvas.
+        Carrega todas as receitas salvas (de todas as contas, na raiz).
         
         Returns:
             pd.DataFrame: DataFrame com todas as receitas
         """
-        try:
-            if os.path.exists(self.arquivo_receitas):
-                return pd.read_csv(self.arquivo_receitas, encoding='utf-8')
-            else:
-                return pd.DataFrame()
-        except Exception as e:
-            print(f"Erro ao carregar receitas: {e}")
-            return pd.DataFrame()
+        return self._carregar_agregado('receitas')
     
     def obter_resumo_receitas(self):
         """
@@ -361,7 +403,7 @@ class GerenciadorPersistenciaUnificado:
         # Resumo geral
         resumo = {
             'total_receitas': len(receitas),
-            'valor_total': receitas['Valor'].sum(),
+            'valor_total': centavos_para_reais(int(receitas[COLUNA_CENTAVOS].sum())),
             'periodo': {
                 'inicio': receitas['Data_dt'].min().strftime('%d/%m/%Y'),
                 'fim': receitas['Data_dt'].max().strftime('%d/%m/%Y')
@@ -371,19 +413,16 @@ class GerenciadorPersistenciaUnificado:
         # Por fonte de pagamento
         receitas_com_fonte = receitas[receitas['Fonte_Pagamento'] != '']
         if not receitas_com_fonte.empty:
-            por_fonte = receitas_com_fonte.groupby('Fonte_Pagamento').agg({
-                'Valor': ['sum', 'count', 'mean'],
-                'Data_dt': ['min', 'max']
-            }).round(2)
+            por_fonte = resumir_centavos(receitas_com_fonte, 'Fonte_Pagamento', 'Data_dt')
             
             resumo['por_fonte_pagamento'] = {}
             for fonte in por_fonte.index:
                 resumo['por_fonte_pagamento'][fonte] = {
-                    'total': por_fonte.loc[fonte, ('Valor', 'sum')],
-                    'quantidade': por_fonte.loc[fonte, ('Valor', 'count')],
-                    'media': por_fonte.loc[fonte, ('Valor', 'mean')],
-                    'primeira_data': por_fonte.loc[fonte, ('Data_dt', 'min')].strftime('%d/%m/%Y'),
-                    'ultima_data': por_fonte.loc[fonte, ('Data_dt', 'max')].strftime('%d/%m/%Y')
+                    'total': por_fonte.loc[fonte, 'total'],
+                    'quantidade': por_fonte.loc[fonte, 'quantidade'],
+                    'media': por_fonte.loc[fonte, 'media'],
+                    'primeira_data': por_fonte.loc[fonte, 'primeira_data'].strftime('%d/%m/%Y'),
+                    'ultima_data': por_fonte.loc[fonte, 'ultima_data'].strftime('%d/%m/%Y')
                 }
         else:
             resumo['por_fonte_pagamento'] = {}
@@ -391,32 +430,29 @@ class GerenciadorPersistenciaUnificado:
         # Por paciente
         receitas_com_paciente = receitas[receitas['Paciente'] != '']
         if not receitas_com_paciente.empty:
-            por_paciente = receitas_com_paciente.groupby('Paciente').agg({
-                'Valor': ['sum', 'count', 'mean'],
-                'Data_dt': ['min', 'max']
-            }).round(2)
+            por_paciente = resumir_centavos(receitas_com_paciente, 'Paciente', 'Data_dt')
             
             resumo['por_paciente'] = {}
             for paciente in por_paciente.index:
                 resumo['por_paciente'][paciente] = {
-                    'total': por_paciente.loc[paciente, ('Valor', 'sum')],
-                    'quantidade': por_paciente.loc[paciente, ('Valor', 'count')],
-                    'media': por_paciente.loc[paciente, ('Valor', 'mean')],
-                    'primeira_data': por_paciente.loc[paciente, ('Data_dt', 'min')].strftime('%d/%m/%Y'),
-                    'ultima_data': por_paciente.loc[paciente, ('Data_dt', 'max')].strftime('%d/%m/%Y')
+                    'total': por_paciente.loc[paciente, 'total'],
+                    'quantidade': por_paciente.loc[paciente, 'quantidade'],
+                    'media': por_paciente.loc[paciente, 'media'],
+                    'primeira_data': por_paciente.loc[paciente, 'primeira_data'].strftime('%d/%m/%Y'),
+                    'ultima_data': por_paciente.loc[paciente, 'ultima_data'].strftime('%d/%m/%Y')
                 }
         else:
             resumo['por_paciente'] = {}
         
         # Por mês
         receitas['Mes_Ano'] = receitas['Data_dt'].dt.strftime('%m/%Y')
-        por_mes = receitas.groupby('Mes_Ano')['Valor'].agg(['sum', 'count']).round(2)
+        por_mes = resumir_centavos(receitas, 'Mes_Ano', None)
         
         resumo['por_mes'] = {}
         for mes in por_mes.index:
             resumo['por_mes'][mes] = {
-                'total': por_mes.loc[mes, 'sum'],
-                'quantidade': por_mes.loc[mes, 'count']
+                'total': por_mes.loc[mes, 'total'],
+                'quantidade': por_mes.loc[mes, 'quantidade']
             }
         
         # Estatísticas de preenchimento
@@ -457,25 +493,15 @@ class GerenciadorPersistenciaUnificado:
             dict: Resultado da operação
         """
         try:
-            receitas = self.carregar_receitas()
-            
-            if receitas.empty:
-                return {'sucesso': False, 'erro': 'Nenhuma receita encontrada'}
-            
-            # Encontrar receita correspondente
-            mask = (
-                (receitas['Data'] == data) &
-                (receitas['Razao_Social_Original'] == razao_social) &
-                (receitas['Valor'] == valor)
-            )
-            
-            receitas_encontradas = receitas[mask]
+            # Encontrar receita correspondente (valor comparado em centavos)
+            # na partição da conta onde ela está gravada
+            encontrada = self._localizar_receita(data, razao_social, para_centavos(valor))
             
-            if receitas_encontradas.empty:
+            if encontrada is None:
                 return {'sucesso': False, 'erro': 'Receita não encontrada'}
             
             # Atualizar primeira ocorrência
-            index = receitas_encontradas.index[0]
+            gerenciador, receitas, index = encontrada
             
             if paciente is not None:
                 receitas.loc[index, 'Paciente'] = paciente
@@ -487,7 +513,14 @@ class GerenciadorPersistenciaUnificado:
                 receitas.loc[index, 'Fonte_Pagamento'] = fonte_pagamento
             
             # Salvar
-            receitas.to_csv(self.arquivo_receitas, index=False, encoding='utf-8')
+            gerenciador._reescrever_tabela('receitas', receitas)
+            
+            # Paciente informado à mão vale para os próximos créditos do mesmo documento
+            if paciente is not None and paciente.strip() and 'CNPJ_CPF' in receitas.columns:
+                indice = obter_indice(os.path.join(self.diretorio_dados, NOME_ARQUIVO_INDICE))
+                fonte = receitas.loc[index, 'Fonte_Pagamento']
+                if indice.confirmar_paciente(receitas.loc[index, 'CNPJ_CPF'], paciente, fonte if isinstance(fonte, str) else ''):
+                    indice.salvar()
             
             return {
                 'sucesso': True,
@@ -503,6 +536,59 @@ class GerenciadorPersistenciaUnificado:
         except Exception as e:
             return {'sucesso': False, 'erro': str(e)}
     
+    def atualizar_despesa_por_dados(self, data, razao_social, valor, categoria):
+        """
+        Corrige a categoria de uma despesa, localizada por data, razão social e valor.
+        
+        A categoria informada à mão é confirmada no índice de documentos e
+        vale para as próximas despesas do mesmo CNPJ/CPF, antes das regras.
+        A despesa fica marcada como manual (COLUNA_ORIGEM_CATEGORIA) e a
+        recategorização do histórico não a altera.
+        
+        Args:
+            data (str): Data da despesa
+            razao_social (str): Razão social original
+            valor (float): Valor da despesa
+            categoria (str): Nova categoria
+            
+        Returns:
+            dict: Resultado da operação
+        """
+        try:
+            if not categoria or not categoria.strip():
+                return {'sucesso': False, 'erro': 'Categoria vazia'}
+            
+            encontrada = self._localizar_registro('despesas', data, razao_social, para_centavos(valor))
+            
+            if encontrada is None:
+                return {'sucesso': False, 'erro': 'Despesa não encontrada'}
+            
+            gerenciador, despesas, index = encontrada
+            despesas.loc[index, 'Descricao'] = categoria
+            if COLUNA_ORIGEM_CATEGORIA not in despesas.columns:
+                despesas[COLUNA_ORIGEM_CATEGORIA] = ''
+            despesas[COLUNA_ORIGEM_CATEGORIA] = despesas[COLUNA_ORIGEM_CATEGORIA].astype(object)
+            despesas.loc[index, COLUNA_ORIGEM_CATEGORIA] = ORIGEM_MANUAL
+            gerenciador._reescrever_tabela('despesas', despesas)
+            
+            if 'CNPJ_CPF' in despesas.columns:
+                indice = obter_indice(os.path.join(self.diretorio_dados, NOME_ARQUIVO_INDICE))
+                if indice.confirmar_categoria(despesas.loc[index, 'CNPJ_CPF'], categoria):
+                    indice.salvar()
+            
+            return {
+                'sucesso': True,
+                'despesa_atualizada': {
+                    'data': data,
+                    'razao_social': razao_social,
+                    'categoria': categoria,
+                    'valor': valor
+                }
+            }
+            
+        except Exception as e:
+            return {'sucesso': False, 'erro': str(e)}
+    
     def dividir_receita_cartao(self, data_original, razao_social, valor_original, divisoes):
         """
         Divide uma receita de cartão de crédito entre múltiplos pacientes.
@@ -540,34 +626,27 @@ class GerenciadorPersistenciaUnificado:
                 if not div.get('data') or not div['data'].strip():
                     return {'sucesso': False, 'erro': f'Paciente {i}: data não pode estar vazia'}
             
-            # Calcular soma e diferença
-            soma_divisoes = sum(d['valor'] for d in divisoes)
-            diferenca = abs(soma_divisoes - valor_original)
-            
-            # Carregar receitas existentes
-            receitas = self.carregar_receitas()
+            # Calcular soma e diferença em centavos
+            centavos_divisoes = [para_centavos(d['valor']) for d in divisoes]
+            centavos_original = para_centavos(valor_original)
+            soma_divisoes = centavos_para_reais(sum(centavos_divisoes))
+            diferenca = centavos_para_reais(abs(sum(centavos_divisoes) - centavos_original))
             
-            if receitas.empty:
-                return {'sucesso': False, 'erro': 'Nenhuma receita encontrada para dividir'}
+            # Encontrar receita original (valor comparado em centavos) e a
+            # partição da conta onde ela está gravada
+            encontrada = self._localizar_receita(data_original, razao_social, centavos_original)
             
-            # Encontrar receita original
-            mask = (
-                (receitas['Data'] == data_original) &
-                (receitas['Razao_Social_Original'] == razao_social) &
-                (receitas['Valor'] == valor_original)
-            )
-            
-            receita_original = receitas[mask]
-            
-            if receita_original.empty:
+            if encontrada is None:
                 return {'sucesso': False, 'erro': 'Receita original não encontrada'}
             
-            # Obter índice da receita original
-            index_original = receita_original.index[0]
+            gerenciador, receitas, index_original = encontrada
             
             # Obter dados da receita original para preservar
             razao_social_limpa = receitas.loc[index_original, 'Razao_Social_Limpa']
             arquivo_origem = receitas.loc[index_original, 'Arquivo_Origem']
+            fitid_original = receitas.loc[index_original, 'FITID'] if 'FITID' in receitas.columns else ''
+            fitid_original = '' if pd.isna(fitid_original) else str(fitid_original)
+            conta = {coluna: receitas.loc[index_original, coluna] for coluna in COLUNAS_CONTA if coluna in receitas.columns}
             data_processamento = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
             
             # Remover receita original
@@ -576,19 +655,23 @@ class GerenciadorPersistenciaUnificado:
             # Criar novas receitas para cada paciente
             novas_receitas = []
             
-            for divisao in divisoes:
+            for numero, (divisao, centavos) in enumerate(zip(divisoes, centavos_divisoes), 1):
                 nova_receita = {
                     'Data': divisao['data'],
                     'Razao_Social_Original': razao_social,
                     'Razao_Social_Limpa': razao_social_limpa,
-                    'Valor': divisao['valor'],
+                    'Valor': centavos_para_reais(centavos),
+                    COLUNA_CENTAVOS: centavos,
                     'Paciente': divisao['paciente'],
                     'Fonte_Pagamento': 'Cartão de Crédito',
                     'Tipo_Preenchimento': 'cartao_credito_dividido',
                     'Requer_Preenchimento_Manual': False,
                     'Motivo_Categorizacao': f'Divisão de cartão - original: {data_original} R$ {valor_original:.2f}',
                     'Data_Processamento': data_processamento,
-                    'Arquivo_Origem': arquivo_origem
+                    'Arquivo_Origem': arquivo_origem,
+                    # O FITID original continua no índice: reimportar o extrato não recria a receita
+                    'FITID': f'{fitid_original}{SEPARADOR_FITID_DIVISAO}{numero}' if fitid_original else '',
+                    **conta
                 }
                 novas_receitas.append(nova_receita)
             
@@ -597,7 +680,7 @@ class GerenciadorPersistenciaUnificado:
             receitas = pd.concat([receitas, df_novas], ignore_index=True)
             
             # Salvar
-            receitas.to_csv(self.arquivo_receitas, index=False, encoding='utf-8')
+            gerenciador._reescrever_tabela('receitas', receitas)
             
             return {
                 'sucesso': True,
@@ -611,6 +694,460 @@ class GerenciadorPersistenciaUnificado:
         except Exception as e:
             return {'sucesso': False, 'erro': f'Erro ao dividir receita: {str(e)}'}
     
+    # ==================== PARTIÇÕES POR CONTA ====================
+    
+    def listar_particoes(self):
+        """
+        Lista as contas com tabelas em dados_persistentes/contas.
+        
+        Returns:
+            list: Identificadores das partições (vazia em um gerenciador de conta)
+        """
+        diretorio = os.path.join(self.diretorio_dados, DIRETORIO_CONTAS)
+        if self.particao or not os.path.isdir(diretorio):
+            return []
+        
+        return sorted(
+            nome for nome in os.listdir(diretorio)
+            if os.path.isdir(os.path.join(diretorio, nome))
+        )
+    
+    def particao_da_conta(self, particao):
+        """Gerenciador das tabelas de uma conta (a própria raiz para PARTICAO_RAIZ)."""
+        if not particao or particao == self.particao:
+            return self
+        
+        if particao not in self._particoes:
+            self._particoes[particao] = GerenciadorPersistenciaUnificado(self.diretorio_dados, particao)
+        return self._particoes[particao]
+    
+    def _gerenciadores(self):
+        """Gerenciadores cujas tabelas compõem esta visão (a raiz inclui todas as contas)."""
+        return [self] + [self.particao_da_conta(particao) for particao in self.listar_particoes()]
+    
+    def _em_paralelo(self, funcao):
+        """Aplica funcao(gerenciador) a cada partição da visão, em threads."""
+        gerenciadores = self._gerenciadores()
+        if len(gerenciadores) == 1:
+            return [funcao(gerenciadores[0])]
+        
+        with ThreadPoolExecutor(max_workers=min(len(gerenciadores), MAX_LEITURAS_PARALELAS)) as executor:
+            return list(executor.map(funcao, gerenciadores))
+    
+    def _arquivo_tabela(self, tabela):
+        return self.arquivo_despesas if tabela == 'despesas' else self.arquivo_receitas
+    
+    def _carregar_tabela(self, tabela):
+        """Lê a tabela só desta partição."""
+        arquivo = self._arquivo_tabela(tabela)
+        try:
+            if os.path.exists(arquivo):
+                dados = pd.read_csv(arquivo, encoding='utf-8', dtype=TIPOS_TEXTO)
+                return garantir_coluna_centavos(dados)
+            else:
+                return pd.DataFrame()
+        except Exception as e:
+            print(f"Erro ao carregar {tabela} ({self.particao or 'raiz'}): {e}")
+            return pd.DataFrame()
+    
+    def _carregar_agregado(self, tabela):
+        """Lê a tabela de todas as partições em paralelo e concatena."""
+        partes = [parte for parte in self._em_paralelo(lambda g: g._carregar_tabela(tabela)) if not parte.empty]
+        
+        if not partes:
+            return pd.DataFrame()
+        
+        dados = partes[0] if len(partes) == 1 else pd.concat(partes, ignore_index=True)
+        
+        # Tabelas antigas (sem conta) misturadas com as particionadas
+        if any(coluna in dados.columns for coluna in COLUNAS_CONTA):
+            dados = garantir_colunas_conta(dados)
+        return dados
+    
+    def _separar_por_particao(self, registros):
+        """
+        Agrupa os registros pela partição da conta de origem.
+        
+        Returns:
+            dict: {identificador da partição: registros da conta}
+        """
+        particoes = particoes_da_tabela(registros)
+        if (particoes == PARTICAO_RAIZ).all():
+            return {PARTICAO_RAIZ: registros}
+        
+        return {particao: registros[particoes == particao] for particao in particoes.unique()}
+    
+    def _esvaziar_tabela(self, tabela):
+        """Recria a tabela desta partição vazia (com o esquema completo)."""
+        colunas = COLUNAS_DESPESAS if tabela == 'despesas' else COLUNAS_RECEITAS
+        pd.DataFrame(columns=colunas).to_csv(self._arquivo_tabela(tabela), index=False, encoding='utf-8')
+        self._reiniciar_indice_fitid(tabela)
+    
+    def _salvar_por_particao(self, tabela, grupos, arquivo_origem, modo, mes_ano):
+        """
+        Salva cada grupo de registros nas tabelas da sua conta.
+        
+        Args:
+            tabela (str): 'despesas' ou 'receitas'
+            grupos (dict): Saída de _separar_por_particao
+            arquivo_origem (str): Nome do arquivo OFX de origem
+            modo (str): 'adicionar' ou 'sobrescrever'
+            mes_ano (str, optional): Mês/ano de referência (formato MM/YYYY)
+            
+        Returns:
+            dict: Resultado agregado (mesmas chaves de salvar_despesas/salvar_receitas)
+        """
+        try:
+            # Sobrescrever vale para todas as contas: as que não vieram no lote ficam vazias
+            if modo == 'sobrescrever':
+                for gerenciador in self._gerenciadores():
+                    if gerenciador.particao not in grupos:
+                        gerenciador._esvaziar_tabela(tabela)
+            
+            resultado = {'sucesso': True, f'novas_{tabela}': 0, 'meses': set()}
+            if tabela == 'receitas':
+                resultado['requer_preenchimento_manual'] = 0
+            
+            for particao, registros in grupos.items():
+                gerenciador = self.particao_da_conta(particao)
+                if tabela == 'despesas':
+                    parcial = gerenciador._salvar_despesas_particao(registros, arquivo_origem, modo, mes_ano, registrar=False)
+                else:
+                    parcial = gerenciador._salvar_receitas_particao(registros, arquivo_origem, modo, mes_ano, registrar=False)
+                if not parcial['sucesso']:
+                    return parcial
+                
+                resultado[f'novas_{tabela}'] += parcial[f'novas_{tabela}']
+                resultado['meses'].update(parcial['meses'])
+                if tabela == 'receitas':
+                    resultado['requer_preenchimento_manual'] += parcial['requer_preenchimento_manual']
+            
+            resultado.update({
+                f'total_{tabela}': sum(self._em_paralelo(
+                    lambda g: g._contar_registros(g._arquivo_tabela(tabela))
+                )),
+                'modo': modo,
+                'arquivo_origem': arquivo_origem,
+                'contas': sorted(particao for particao in grupos if particao),
+                'meses': sorted(resultado['meses'])
+            })
+            
+            # Um registro no histórico para o arquivo inteiro
+            registrar = self._registrar_processamento_despesas if tabela == 'despesas' else self._registrar_processamento_receitas
+            registrar(arquivo_origem, resultado[f'novas_{tabela}'], resultado[f'total_{tabela}'])
+            return resultado
+            
+        except Exception as e:
+            return {
+                'sucesso': False,
+                'erro': str(e),
+                f'novas_{tabela}': 0,
+                f'total_{tabela}': 0
+            }
+    
+    def _confirmar_documentos(self, tabela, registros):
+        """Alimenta o índice de documentos (indice_documentos.json) com os registros gravados."""
+        try:
+            regras = obter_regras(os.path.join(self.diretorio_dados, NOME_ARQUIVO_REGRAS))
+            indice = obter_indice(os.path.join(self.diretorio_dados, NOME_ARQUIVO_INDICE))
+            if tabela == 'despesas':
+                alteradas = indice.registrar_despesas(registros, regras)
+            else:
+                alteradas = indice.registrar_receitas(registros, regras)
+            if alteradas:
+                indice.salvar()
+        except Exception as e:
+            print(f"Erro ao atualizar índice de documentos: {e}")
+    
+    def _localizar_receita(self, data, razao_social, centavos):
+        """
+        Procura a receita na raiz e nas contas.
+        
+        Returns:
+            tuple: (gerenciador da partição, receitas da partição, índice) ou
+            None se não houver receita com esses dados
+        """
+        return self._localizar_registro('receitas', data, razao_social, centavos)
+    
+    def _localizar_registro(self, tabela, data, razao_social, centavos):
+        """
+        Procura o registro (data, razão social original e valor) na raiz e nas contas.
+        
+        Returns:
+            tuple: (gerenciador da partição, tabela da partição, índice) ou
+            None se não houver registro com esses dados
+        """
+        for gerenciador in self._gerenciadores():
+            registros = gerenciador._carregar_tabela(tabela)
+            if registros.empty:
+                continue
+            
+            mask = (
+                (registros['Data'] == data) &
+                (registros['Razao_Social_Original'] == razao_social) &
+                (registros[COLUNA_CENTAVOS] == centavos)
+            )
+            if mask.any():
+                return gerenciador, registros, registros.index[mask][0]
+        
+        return None
+    
+    def obter_resumo_por_conta(self):
+        """
+        Totais de despesas e receitas de cada conta (partições lidas em paralelo).
+        
+        Returns:
+            dict: {identificador da partição ('' para a raiz): totais}
+        """
+        def resumir(gerenciador):
+            despesas = gerenciador._carregar_tabela('despesas')
+            receitas = gerenciador._carregar_tabela('receitas')
+            
+            def total(tabela):
+                return centavos_para_reais(int(tabela[COLUNA_CENTAVOS].sum())) if not tabela.empty else 0
+            
+            return gerenciador.particao, {
+                'total_despesas': len(despesas),
+                'valor_despesas': total(despesas),
+                'total_receitas': len(receitas),
+                'valor_receitas': total(receitas)
+            }
+        
+        return dict(self._em_paralelo(resumir))
+    
+    # ==================== DEDUPLICAÇÃO E ÍNDICE DE FITID ====================
+    
+    def _normalizar_fitids(self, df):
+        """Retorna a coluna FITID como texto ('' quando ausente)."""
+        if 'FITID' not in df.columns:
+            return pd.Series('', index=df.index)
+        return df['FITID'].fillna('').astype(str).str.strip()
+    
+    def _assinatura_tabela(self, tabela):
+        """Tamanho e mtime (ns) do CSV da tabela ((0, 0) se ele não existir)."""
+        try:
+            estado = os.stat(self._arquivo_tabela(tabela))
+        except FileNotFoundError:
+            return (0, 0)
+        return (estado.st_size, estado.st_mtime_ns)
+    
+    def _carregar_indice_fitid(self, tabela):
+        """
+        Carrega o conjunto de FITIDs já salvos.
+        
+        O índice só vale para a tabela com a mesma assinatura (tamanho e
+        mtime) gravada no seu cabeçalho. Se o arquivo de índice não existir
+        ou a tabela tiver mudado por fora dele (apagada, restaurada de um
+        backup, reescrita por uma edição), ele é reconstruído a partir da
+        coluna FITID da tabela persistente.
+        
+        Args:
+            tabela (str): 'despesas' ou 'receitas'
+            
+        Returns:
+            set: FITIDs já salvos
+        """
+        assinatura = self._assinatura_tabela(tabela)
+        em_memoria = self._indices_fitid.get(tabela)
+        if em_memoria is not None and em_memoria[0] == assinatura:
+            return em_memoria[1]
+        
+        fitids = None
+        try:
+            with open(self.arquivos_indice_fitid[tabela], 'r', encoding='utf-8') as f:
+                if f.readline() == CABECALHO_INDICE_FITID.format(*assinatura):
+                    fitids = {linha.strip() for linha in f if linha.strip()}
+        except FileNotFoundError:
+            pass
+        
+        if fitids is None:
+            arquivo_dados = self._arquivo_tabela(tabela)
+            fitids = set()
+            try:
+                if os.path.exists(arquivo_dados) and os.path.getsize(arquivo_dados) > 0:
+                    coluna = pd.read_csv(arquivo_dados, encoding='utf-8', dtype={'FITID': str},
+                                         usecols=lambda c: c == 'FITID')
+                    if 'FITID' in coluna.columns:
+                        # Receitas divididas guardam o FITID original antes do separador
+                        fitids = set(
+                            coluna['FITID'].dropna().astype(str).str.strip()
+                            .str.split(SEPARADOR_FITID_DIVISAO).str[0]
+                        )
+                        fitids.discard('')
+            except Exception as e:
+                print(f"Erro ao reconstruir índice de FITID ({tabela}): {e}")
+            
+            self._gravar_indice_fitid(tabela, fitids)
+            return fitids
+        
+        self._indices_fitid[tabela] = (assinatura, fitids)
+        return fitids
+    
+    def _gravar_indice_fitid(self, tabela, fitids):
+        """Grava o índice inteiro, com a assinatura atual da tabela no cabeçalho."""
+        assinatura = self._assinatura_tabela(tabela)
+        arquivo_indice = self.arquivos_indice_fitid[tabela]
+        temporario = f'{arquivo_indice}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            f.write(CABECALHO_INDICE_FITID.format(*assinatura))
+            f.writelines(f'{fitid}\n' for fitid in fitids)
+        os.replace(temporario, arquivo_indice)
+        
+        self._indices_fitid[tabela] = (assinatura, fitids)
+    
+    def _registrar_fitids(self, tabela, registros):
+        """
+        Acrescenta ao índice os FITIDs dos registros recém-acrescentados à
+        tabela e o sincroniza com a nova assinatura dela.
+        """
+        em_memoria = self._indices_fitid.get(tabela)
+        if em_memoria is None:
+            # Índice reconstruído da tabela já inclui os registros novos
+            self._carregar_indice_fitid(tabela)
+            return
+        
+        fitids = em_memoria[1]
+        novos = [f for f in self._normalizar_fitids(registros) if f and f not in fitids]
+        fitids.update(novos)
+        assinatura = self._assinatura_tabela(tabela)
+        
+        try:
+            with open(self.arquivos_indice_fitid[tabela], 'r+', encoding='utf-8') as f:
+                f.write(CABECALHO_INDICE_FITID.format(*assinatura))
+                f.seek(0, os.SEEK_END)
+                f.writelines(f'{fitid}\n' for fitid in novos)
+        except FileNotFoundError:
+            self._gravar_indice_fitid(tabela, fitids)
+            return
+        
+        self._indices_fitid[tabela] = (assinatura, fitids)
+    
+    def _reassinar_indice_fitid(self, tabela, fitids):
+        """
+        Grava no cabeçalho do índice a assinatura atual da tabela, depois de
+        uma reescrita que não mudou os FITIDs (edição, divisão de receita,
+        recategorização): o índice continua válido sem ser reconstruído.
+        
+        Args:
+            tabela (str): 'despesas' ou 'receitas'
+            fitids (set): Índice carregado antes da reescrita
+        """
+        assinatura = self._assinatura_tabela(tabela)
+        try:
+            with open(self.arquivos_indice_fitid[tabela], 'r+', encoding='utf-8') as f:
+                f.write(CABECALHO_INDICE_FITID.format(*assinatura))
+        except FileNotFoundError:
+            self._gravar_indice_fitid(tabela, fitids)
+            return
+        
+        self._indices_fitid[tabela] = (assinatura, fitids)
+    
+    def _reescrever_tabela(self, tabela, dados):
+        """Regrava o CSV inteiro da tabela (mesmos FITIDs) e reassina o índice."""
+        fitids = self._carregar_indice_fitid(tabela)
+        dados.to_csv(self._arquivo_tabela(tabela), index=False, encoding='utf-8')
+        self._reassinar_indice_fitid(tabela, fitids)
+    
+    def _reiniciar_indice_fitid(self, tabela, registros=None):
+        """Recria o índice de uma tabela (após sobrescrever ou limpar dados)."""
+        fitids = set()
+        if registros is not None:
+            fitids = {f for f in self._normalizar_fitids(registros) if f}
+        
+        self._gravar_indice_fitid(tabela, fitids)
+    
+    def _remover_duplicatas(self, novos, tabela, arquivo_dados):
+        """
+        Remove registros já salvos.
+        
+        Registros com FITID são verificados no índice de FITIDs (custo
+        proporcional apenas aos novos registros). Somente os registros sem
+        FITID usam a chave composta Data, Valor_Centavos e Razao_Social_Original
+        contra a tabela existente.
+        
+        Args:
+            novos (pd.DataFrame): Registros a salvar
+            tabela (str): 'despesas' ou 'receitas'
+            arquivo_dados (str): CSV persistente da tabela
+            
+        Returns:
+            pd.DataFrame: Registros que ainda não existem
+        """
+        fitids = self._normalizar_fitids(novos)
+        com_fitid = fitids != ''
+        
+        # FITID já salvo ou repetido dentro do próprio lote
+        vistos = self._carregar_indice_fitid(tabela)
+        manter = ~com_fitid | (~fitids.isin(vistos) & ~fitids.duplicated())
+        
+        sem_fitid = ~com_fitid
+        if sem_fitid.any() and os.path.exists(arquivo_dados):
+            chaves_duplicata = ['Data', COLUNA_CENTAVOS, 'Razao_Social_Original']
+            existentes = pd.read_csv(arquivo_dados, encoding='utf-8',
+                                     usecols=lambda c: c in chaves_duplicata or c == 'Valor')
+            # Tabelas antigas não têm a coluna em centavos: derivar de Valor
+            existentes = garantir_coluna_centavos(existentes).drop(columns='Valor', errors='ignore')
+            
+            if not existentes.empty and all(c in existentes.columns for c in chaves_duplicata):
+                merged = pd.merge(
+                    novos.loc[sem_fitid, chaves_duplicata].reset_index(),
+                    existentes.drop_duplicates(),
+                    on=chaves_duplicata,
+                    how='left',
+                    indicator=True
+                )
+                duplicados = merged.loc[merged['_merge'] == 'both', 'index']
+                manter &= ~novos.index.isin(duplicados)
+        
+        return novos[manter]
+    
+    def _acrescentar_registros(self, novos, arquivo_dados):
+        """
+        Acrescenta registros ao final do CSV sem reler a tabela.
+        
+        Se os novos registros trouxerem colunas que o arquivo ainda não
+        tem (ex.: FITID em dados antigos), o arquivo é reescrito uma vez com
+        o esquema ampliado.
+        
+        Returns:
+            int: Total de registros no arquivo após a operação
+        """
+        colunas_existentes = None
+        if os.path.exists(arquivo_dados) and os.path.getsize(arquivo_dados) > 0:
+            colunas_existentes = pd.read_csv(arquivo_dados, encoding='utf-8', nrows=0).columns.tolist()
+        
+        if not colunas_existentes:
+            novos.to_csv(arquivo_dados, index=False, encoding='utf-8')
+            return len(novos)
+        
+        if set(novos.columns) <= set(colunas_existentes):
+            if not novos.empty:
+                novos.reindex(columns=colunas_existentes).to_csv(
+                    arquivo_dados, mode='a', header=False, index=False, encoding='utf-8'
+                )
+            return self._contar_registros(arquivo_dados)
+        
+        # Migração de esquema: reescrever com as novas colunas
+        existentes = pd.read_csv(arquivo_dados, encoding='utf-8', dtype=TIPOS_TEXTO)
+        existentes = garantir_coluna_centavos(existentes)
+        todos = pd.concat([existentes, novos], ignore_index=True)
+        todos.to_csv(arquivo_dados, index=False, encoding='utf-8')
+        return len(todos)
+    
+    def _meses_registros(self, registros):
+        """Meses (Mes_Ano) dos registros gravados, sem repetição."""
+        if registros.empty or 'Mes_Ano' not in registros.columns:
+            return []
+        return sorted(registros['Mes_Ano'].dropna().astype(str).unique())
+    
+    def _contar_registros(self, arquivo_dados):
+        """Conta as linhas de dados do CSV (sem o cabeçalho) sem carregar a tabela."""
+        linhas = 0
+        with open(arquivo_dados, 'rb') as f:
+            for bloco in iter(lambda: f.read(1024 * 1024), b''):
+                linhas += bloco.count(b'\n')
+        return max(linhas - 1, 0)
+    
     # ==================== MÉTODOS GERAIS ====================
     
     def obter_resumo_geral(self):
@@ -718,15 +1255,18 @@ class GerenciadorPersistenciaUnificado:
             backup_dir = os.path.join(self.diretorio_dados, 'backups')
             os.makedirs(backup_dir, exist_ok=True)
             
-            # Backup das despesas
-            if os.path.exists(self.arquivo_despesas):
-                backup_despesas = os.path.join(backup_dir, f'despesas_backup_{timestamp}.csv')
-                pd.read_csv(self.arquivo_despesas).to_csv(backup_despesas, index=False, encoding='utf-8')
-            
-            # Backup das receitas
-            if os.path.exists(self.arquivo_receitas):
-                backup_receitas = os.path.join(backup_dir, f'receitas_backup_{timestamp}.csv')
-                pd.read_csv(self.arquivo_receitas).to_csv(backup_receitas, index=False, encoding='utf-8')
+            for gerenciador in self._gerenciadores():
+                sufixo = f'_{gerenciador.particao}' if gerenciador.particao else ''
+                
+                # Backup das despesas
+                if os.path.exists(gerenciador.arquivo_despesas):
+                    backup_despesas = os.path.join(backup_dir, f'despesas{sufixo}_backup_{timestamp}.csv')
+                    pd.read_csv(gerenciador.arquivo_despesas, dtype=TIPOS_TEXTO).to_csv(backup_despesas, index=False, encoding='utf-8')
+                
+                # Backup das receitas
+                if os.path.exists(gerenciador.arquivo_receitas):
+                    backup_receitas = os.path.join(backup_dir, f'receitas{sufixo}_backup_{timestamp}.csv')
+                    pd.read_csv(gerenciador.arquivo_receitas, dtype=TIPOS_TEXTO).to_csv(backup_receitas, index=False, encoding='utf-8')
             
             # Backup do histórico
             if os.path.exists(self.arquivo_historico):
@@ -762,23 +1302,13 @@ class GerenciadorPersistenciaUnificado:
             # Fazer backup antes de limpar
             backup_result = self.fazer_backup()
             
-            if tipo in ['todos', 'despesas']:
-                # Reinicializar arquivo de despesas
-                df_despesas_vazio = pd.DataFrame(columns=[
-                    'Data', 'Descricao', 'Valor', 'Razao_Social_Original', 
-                    'Data_Processamento', 'Arquivo_Origem'
-                ])
-                df_despesas_vazio.to_csv(self.arquivo_despesas, index=False, encoding='utf-8')
-            
-            if tipo in ['todos', 'receitas']:
-                # Reinicializar arquivo de receitas
-                df_receitas_vazio = pd.DataFrame(columns=[
-                    'Data', 'Razao_Social_Original', 'Razao_Social_Limpa', 'Valor',
-                    'Paciente', 'Fonte_Pagamento', 'Tipo_Preenchimento',
-                    'Requer_Preenchimento_Manual', 'Motivo_Categorizacao',
-                    'Data_Processamento', 'Arquivo_Origem'
-                ])
-                df_receitas_vazio.to_csv(self.arquivo_receitas, index=False, encoding='utf-8')
+            # Reinicializar as tabelas da raiz e de todas as contas
+            for gerenciador in self._gerenciadores():
+                if tipo in ['todos', 'despesas']:
+                    gerenciador._esvaziar_tabela('despesas')
+                
+                if tipo in ['todos', 'receitas']:
+                    gerenciador._esvaziar_tabela('receitas')
             
             if tipo == 'todos':
                 # Reinicializar histórico
@@ -2,6 +2,13 @@ import pandas as pd
 import os
 from datetime import datetime
 import json
+from dinheiro import COLUNA_CENTAVOS, centavos_para_reais, serie_centavos
+
+# Colunas monetárias de resultados_mensais.csv (em reais, duas casas)
+COLUNAS_MONETARIAS = [
+    'Receita_Bruta', 'Aluguel', 'Luz', 'Fisioterapeutas', 'Limpeza', 'Tributos',
+    'Diversos', 'Total_Operacionais', 'Resultado_Bruto', 'Retirada', 'Resultado_Liquido'
+]
 
 class GerenciadorResultado:
     """
@@ -53,8 +60,9 @@ class GerenciadorResultado:
             dict: Resultado calculado
         """
         try:
+            # Todas as contas são feitas em centavos inteiros (somas exatas)
             # Calcular receita bruta
-            receita_bruta = receitas_df['Valor'].sum() if not receitas_df.empty else 0
+            receita_bruta = int(self._centavos(receitas_df).sum()) if not receitas_df.empty else 0
             
             # Calcular despesas operacionais por categoria
             despesas_operacionais = {
@@ -69,12 +77,13 @@ class GerenciadorResultado:
             retirada = 0
             
             if not despesas_df.empty:
+                centavos_despesas = self._centavos(despesas_df)
                 for categoria in despesas_operacionais.keys():
-                    valor = despesas_df[despesas_df['Descricao'] == categoria]['Valor'].sum()
+                    valor = int(centavos_despesas[despesas_df['Descricao'] == categoria].sum())
                     despesas_operacionais[categoria] = abs(valor)  # Garantir valor positivo
                 
                 # Calcular retirada
-                retirada = abs(despesas_df[despesas_df['Descricao'] == 'Retirada']['Valor'].sum())
+                retirada = abs(int(centavos_despesas[despesas_df['Descricao'] == 'Retirada'].sum()))
             
             # Calcular totais
             total_operacionais = sum(despesas_operacionais.values())
@@ -83,12 +92,15 @@ class GerenciadorResultado:
             
             return {
                 'mes_ano': mes_ano,
-                'receita_bruta': receita_bruta,
-                'despesas_operacionais': despesas_operacionais,
-                'total_operacionais': total_operacionais,
-                'resultado_bruto': resultado_bruto,
-                'retirada': retirada,
-                'resultado_liquido': resultado_liquido,
+                'receita_bruta': centavos_para_reais(receita_bruta),
+                'despesas_operacionais': {
+                    categoria: centavos_para_reais(valor)
+                    for categoria, valor in despesas_operacionais.items()
+                },
+                'total_operacionais': centavos_para_reais(total_operacionais),
+                'resultado_bruto': centavos_para_reais(resultado_bruto),
+                'retirada': centavos_para_reais(retirada),
+                'resultado_liquido': centavos_para_reais(resultado_liquido),
                 'data_fechamento': datetime.now().strftime('%d/%m/%Y %H:%M:%S')
             }
             
@@ -104,6 +116,12 @@ class GerenciadorResultado:
                 'resultado_liquido': 0
             }
     
+    def _centavos(self, df):
+        """Valores de uma tabela em centavos (Valor_Centavos ou derivado de Valor)."""
+        if COLUNA_CENTAVOS in df.columns:
+            return pd.to_numeric(df[COLUNA_CENTAVOS], errors='coerce').fillna(0).astype('int64')
+        return serie_centavos(df['Valor'])
+    
     def salvar_fechamento(self, resultado_calculado, observacoes=''):
         """
         Salva fechamento mensal.
@@ -160,6 +178,7 @@ class GerenciadorResultado:
             
             # Registrar no histórico
             self._registrar_fechamento(resultado_calculado)
+            self._desmarcar_mes_desatualizado(mes_ano)
             
             return {
                 'sucesso': True,
@@ -222,6 +241,7 @@ class GerenciadorResultado:
             
             # Salvar
             df_novo.to_csv(self.arquivo_resultados, index=False, encoding='utf-8')
+            self._desmarcar_mes_desatualizado(mes_ano)
             
             return {
                 'sucesso': True,
@@ -245,7 +265,13 @@ class GerenciadorResultado:
         """
         try:
             if os.path.exists(self.arquivo_resultados):
-                return pd.read_csv(self.arquivo_resultados, encoding='utf-8')
+                resultados = pd.read_csv(self.arquivo_resultados, encoding='utf-8')
+                # Normalizar para centavos exatos (fechamentos antigos podem
+                # ter resíduos de float, ex.: 5896.709999999999)
+                for coluna in COLUNAS_MONETARIAS:
+                    if coluna in resultados.columns:
+                        resultados[coluna] = centavos_para_reais(serie_centavos(resultados[coluna]))
+                return resultados
             else:
                 return pd.DataFrame()
         except Exception as e:
@@ -312,13 +338,16 @@ class GerenciadorResultado:
                 'meses': []
             }
         
+        def total(coluna):
+            return centavos_para_reais(int(serie_centavos(resultados_ano[coluna]).sum()))
+        
         return {
             'ano': ano,
             'meses_fechados': len(resultados_ano),
-            'receita_bruta_total': resultados_ano['Receita_Bruta'].sum(),
-            'despesas_operacionais_total': resultados_ano['Total_Operacionais'].sum(),
-            'retirada_total': resultados_ano['Retirada'].sum(),
-            'resultado_liquido_total': resultados_ano['Resultado_Liquido'].sum(),
+            'receita_bruta_total': total('Receita_Bruta'),
+            'despesas_operacionais_total': total('Total_Operacionais'),
+            'retirada_total': total('Retirada'),
+            'resultado_liquido_total': total('Resultado_Liquido'),
             'meses': resultados_ano['Mes_Ano'].tolist()
         }
     
@@ -343,6 +372,67 @@ class GerenciadorResultado:
         except Exception as e:
             print(f"Erro ao registrar fechamento: {e}")
     
+    def marcar_meses_desatualizados(self, meses, motivo=''):
+        """
+        Marca fechamentos cujos dados mudaram depois do fechamento (ex.:
+        recategorização do histórico). A marca some quando o mês é fechado
+        de novo ou o fechamento é excluído.
+        
+        Args:
+            meses (iterable): Meses no formato MM/YYYY
+            motivo (str): Descrição da alteração
+            
+        Returns:
+            list: Meses marcados (apenas os que têm fechamento salvo)
+        """
+        resultados = self.carregar_resultados()
+        if resultados.empty:
+            return []
+        
+        fechados = set(resultados['Mes_Ano'])
+        marcados = sorted((mes for mes in set(meses) if mes in fechados), key=lambda mes: (mes[3:], mes[:2]))
+        if not marcados:
+            return []
+        
+        try:
+            historico = self.carregar_historico()
+            desatualizados = historico.setdefault('meses_desatualizados', {})
+            for mes_ano in marcados:
+                desatualizados[mes_ano] = {
+                    'data_hora': datetime.now().isoformat(),
+                    'motivo': motivo
+                }
+            
+            with open(self.arquivo_historico, 'w', encoding='utf-8') as f:
+                json.dump(historico, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"Erro ao marcar meses desatualizados: {e}")
+            return []
+        
+        return marcados
+    
+    def obter_meses_desatualizados(self):
+        """
+        Fechamentos que precisam ser refeitos.
+        
+        Returns:
+            dict: {mes_ano: {'data_hora', 'motivo'}}
+        """
+        return self.carregar_historico().get('meses_desatualizados', {})
+    
+    def _desmarcar_mes_desatualizado(self, mes_ano):
+        """Remove a marca de desatualizado de um mês (após refazer ou excluir o fechamento)."""
+        try:
+            historico = self.carregar_historico()
+            if mes_ano not in historico.get('meses_desatualizados', {}):
+                return
+            
+            del historico['meses_desatualizados'][mes_ano]
+            with open(self.arquivo_historico, 'w', encoding='utf-8') as f:
+                json.dump(historico, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"Erro ao atualizar meses desatualizados: {e}")
+    
     def carregar_historico(self):
         """Carrega histórico de fechamentos."""
         try:
@@ -376,6 +466,7 @@ class GerenciadorResultado:
             
             # Salvar
             resultados_filtrados.to_csv(self.arquivo_resultados, index=False, encoding='utf-8')
+            self._desmarcar_mes_desatualizado(mes_ano)
             
             return {
                 'sucesso': True,
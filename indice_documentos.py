@@ -0,0 +1,377 @@
+import os
+import re
+import json
+import threading
+
+import pandas as pd
+
+NOME_ARQUIVO_INDICE = 'indice_documentos.json'
+
+# Formato do arquivo em disco
+VERSAO_FORMATO = '1'
+
+# Origem das receitas confirmadas à mão (vale mesmo que as regras mudem)
+ORIGEM_MANUAL = 'manual'
+
+# Tipos de preenchimento de receitas confirmadas à mão
+TIPOS_RECEITA_MANUAIS = ['manual_preenchido']
+
+RE_NAO_DIGITO = re.compile(r'\D')
+
+
+def normalizar_documento(valor):
+    """
+    Só os dígitos de um CNPJ (14) ou CPF (11).
+
+    Returns:
+        str: Documento normalizado ou '' se não for um CNPJ/CPF
+    """
+    if not isinstance(valor, str):
+        return ''
+    digitos = RE_NAO_DIGITO.sub('', valor)
+    return digitos if len(digitos) in (11, 14) else ''
+
+
+def coluna_documentos(documentos):
+    """
+    Normaliza uma coluna de documentos (uma vez por valor distinto).
+
+    Args:
+        documentos (pd.Series): CNPJ/CPF (texto, categórico ou vazio)
+
+    Returns:
+        pd.Series: Documentos normalizados ('' onde não há documento)
+    """
+    codigos, unicos = pd.factorize(documentos.astype(object), use_na_sentinel=False)
+    normalizados = pd.Series([normalizar_documento(documento) for documento in unicos], dtype=object)
+    return pd.Series(normalizados.take(codigos).to_numpy(), index=documentos.index)
+
+
+class IndiceDocumentos:
+    """
+    Índice CNPJ/CPF -> categoria (despesas) e CNPJ/CPF -> paciente (receitas).
+
+    O documento do pagador não muda entre PIX, TED e boleto, ao contrário
+    da grafia da razão social; com o índice, pagadores já confirmados são
+    categorizados por um acesso a dicionário, antes das regras por trecho.
+
+    O índice é alimentado pelas linhas gravadas (ver registrar_despesas e
+    registrar_receitas). Cada entrada guarda a origem: a palavra-chave da
+    regra de despesa, a chave do mapeamento pagador -> paciente ou
+    ORIGEM_MANUAL. Entradas cuja regra/mapeamento não existe mais nas regras
+    atuais são ignoradas. Um documento confirmado com valores diferentes
+    (ex.: CNPJ de intermediador de pagamento) fica ambíguo (None) e não é
+    usado, até uma confirmação manual.
+
+    Formato do arquivo:
+        {'despesas': {documento: [categoria, palavra-chave | ORIGEM_MANUAL] | None},
+         'receitas': {documento: [paciente, fonte, origem] | None}}
+    """
+
+    def __init__(self, arquivo=None):
+        """
+        Args:
+            arquivo (str, optional): JSON do índice; sem arquivo, só em memória
+        """
+        self.arquivo = arquivo
+        self.entradas = {'despesas': {}, 'receitas': {}}
+
+        self._alterados = {'despesas': set(), 'receitas': set()}
+        self._assinatura = None
+        self._trava = threading.RLock()
+
+        self._recarregar_se_mudou()
+
+    def _ler_arquivo(self):
+        try:
+            with open(self.arquivo, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Erro ao carregar índice de documentos ({self.arquivo}): {e}")
+            return None
+
+        if dados.get('formato') != VERSAO_FORMATO:
+            return None
+        return dados
+
+    def _recarregar_se_mudou(self):
+        """Relê o arquivo se outro processo o gravou (mantém as alterações não salvas)."""
+        if not self.arquivo:
+            return
+
+        try:
+            estado = os.stat(self.arquivo)
+        except FileNotFoundError:
+            return
+
+        assinatura = (estado.st_mtime_ns, estado.st_size)
+        if assinatura == self._assinatura:
+            return
+
+        with self._trava:
+            dados = self._ler_arquivo()
+            self._assinatura = assinatura
+            if dados is None:
+                return
+
+            for tabela, entradas in self.entradas.items():
+                novas = dados.get(tabela, {})
+                for documento in self._alterados[tabela]:
+                    novas[documento] = entradas.get(documento)
+                self.entradas[tabela] = novas
+
+    # Consulta
+
+    def categorias_despesas(self, documentos, regras_validas):
+        """
+        Categoria de cada documento (uma consulta por documento distinto).
+
+        Args:
+            documentos (pd.Series): Documentos (texto)
+            regras_validas (set): Pares (categoria, palavra-chave) das regras atuais
+
+        Returns:
+            tuple: (categorias, palavras) como pd.Series com o mesmo índice;
+            None onde o documento não está no índice ou a entrada não vale mais
+            (a palavra é ORIGEM_MANUAL nas categorias confirmadas à mão)
+        """
+        self._recarregar_se_mudou()
+        entradas = self.entradas['despesas']
+
+        def entrada_valida(documento):
+            entrada = entradas.get(normalizar_documento(documento))
+            if entrada and (entrada[1] == ORIGEM_MANUAL or tuple(entrada) in regras_validas):
+                return entrada
+            return None
+
+        codigos, unicos = pd.factorize(documentos.fillna('').astype(str))
+        validas = [entrada_valida(documento) for documento in unicos]
+        categorias = pd.Series([entrada[0] if entrada else None for entrada in validas], dtype=object)
+        palavras = pd.Series([entrada[1] if entrada else None for entrada in validas], dtype=object)
+        return (
+            pd.Series(categorias.take(codigos).to_numpy(), index=documentos.index),
+            pd.Series(palavras.take(codigos).to_numpy(), index=documentos.index)
+        )
+
+    def paciente_receita(self, documento, mapeamento_razao_paciente):
+        """
+        Paciente e fonte confirmados para o documento.
+
+        Args:
+            documento (str): Documento normalizado
+            mapeamento_razao_paciente (dict): Mapeamento atual pagador -> paciente
+
+        Returns:
+            tuple | None: (paciente, fonte de pagamento, origem) ou None
+        """
+        if not documento:
+            return None
+
+        entrada = self.entradas['receitas'].get(documento)
+        if not entrada:
+            return None
+
+        paciente, fonte, origem = entrada
+        if origem != ORIGEM_MANUAL and mapeamento_razao_paciente.get(origem) != paciente:
+            return None
+        return paciente, fonte, origem
+
+    def atualizar(self):
+        """Relê o arquivo se ele mudou (chamar antes de uma série de paciente_receita)."""
+        self._recarregar_se_mudou()
+
+    # Alimentação
+
+    def _registrar(self, tabela, documento, valor, valida, sobrepor=False):
+        """
+        Grava a entrada do documento.
+
+        Uma entrada válida com valor diferente torna o documento ambíguo,
+        exceto com sobrepor (confirmação manual).
+        """
+        entradas = self.entradas[tabela]
+        atual = entradas.get(documento)
+
+        if sobrepor or documento not in entradas or (atual is not None and not valida(atual)):
+            novo = valor
+        elif atual is None or list(atual) == valor:
+            return False
+        else:
+            novo = None
+
+        entradas[documento] = novo
+        self._alterados[tabela].add(documento)
+        return True
+
+    def registrar_despesas(self, despesas, regras):
+        """
+        Confirma no índice as despesas gravadas que uma regra categorizou.
+
+        Documentos com categoria confirmada à mão (confirmar_categoria) não
+        são alterados.
+
+        Args:
+            despesas (pd.DataFrame): Despesas com CNPJ_CPF e Razao_Social_Original
+            regras (RegrasCompiladas): Regras atuais (a palavra-chave que
+                casou com a razão social é guardada como origem)
+
+        Returns:
+            int: Entradas novas ou alteradas
+        """
+        if despesas.empty or 'CNPJ_CPF' not in despesas.columns:
+            return 0
+
+        self._recarregar_se_mudou()
+        validas = set(regras.casador_despesas.palavras)
+        entradas = self.entradas['despesas']
+        pares = despesas[['CNPJ_CPF', 'Razao_Social_Original']].fillna('').astype(str).drop_duplicates()
+
+        alteradas = 0
+        with self._trava:
+            for documento, razao_social in pares.itertuples(index=False):
+                documento = normalizar_documento(documento)
+                if not documento or (entradas.get(documento) or [None, None])[1] == ORIGEM_MANUAL:
+                    continue
+                regra = regras.casador_despesas.buscar_regra(razao_social.upper().strip())
+                if regra is None:
+                    continue
+                alteradas += self._registrar(
+                    'despesas', documento, list(regra), lambda entrada: tuple(entrada) in validas
+                )
+        return alteradas
+
+    def registrar_receitas(self, receitas, regras):
+        """
+        Confirma no índice as receitas gravadas com paciente confirmado: as
+        preenchidas à mão e as do mapeamento pagador -> paciente.
+
+        Args:
+            receitas (pd.DataFrame): Receitas com CNPJ_CPF
+            regras (RegrasCompiladas): Regras atuais (para achar a chave do
+                mapeamento que identificou o paciente)
+
+        Returns:
+            int: Entradas novas ou alteradas
+        """
+        if receitas.empty or 'CNPJ_CPF' not in receitas.columns:
+            return 0
+
+        self._recarregar_se_mudou()
+        colunas = ['CNPJ_CPF', 'Razao_Social_Limpa', 'Paciente', 'Fonte_Pagamento', 'Tipo_Preenchimento']
+        linhas = receitas.reindex(columns=colunas).fillna('').astype(str).drop_duplicates()
+
+        def valida(entrada):
+            paciente, _, origem = entrada
+            return origem == ORIGEM_MANUAL or regras.mapeamento_razao_paciente.get(origem) == paciente
+
+        alteradas = 0
+        with self._trava:
+            for documento, razao_limpa, paciente, fonte, tipo in linhas.itertuples(index=False):
+                documento = normalizar_documento(documento)
+                if not documento or not paciente.strip():
+                    continue
+
+                if tipo in TIPOS_RECEITA_MANUAIS:
+                    origem = ORIGEM_MANUAL
+                elif tipo == 'automatico_mapeado':
+                    busca = regras.casador_flexivel.buscar(razao_limpa.upper())
+                    origem = regras.mapeamento_flexivel.get(busca) if busca is not None else None
+                    if regras.mapeamento_razao_paciente.get(origem) != paciente:
+                        continue
+                else:
+                    continue
+
+                alteradas += self._registrar('receitas', documento, [paciente, fonte, origem], valida)
+        return alteradas
+
+    def confirmar_categoria(self, documento, categoria):
+        """
+        Confirmação manual da categoria de despesa de um documento (sobrepõe
+        a entrada e vale mesmo sem regra que a produza).
+
+        Returns:
+            bool: True se a entrada mudou
+        """
+        documento = normalizar_documento(documento)
+        if not documento or not categoria.strip():
+            return False
+
+        self._recarregar_se_mudou()
+        with self._trava:
+            return self._registrar('despesas', documento, [categoria, ORIGEM_MANUAL], None, sobrepor=True)
+
+    def confirmar_paciente(self, documento, paciente, fonte_pagamento):
+        """
+        Confirmação manual do paciente de um documento (sobrepõe a entrada).
+
+        Returns:
+            bool: True se a entrada mudou
+        """
+        documento = normalizar_documento(documento)
+        if not documento or not paciente.strip():
+            return False
+
+        self._recarregar_se_mudou()
+        with self._trava:
+            return self._registrar(
+                'receitas', documento, [paciente, fonte_pagamento, ORIGEM_MANUAL], None, sobrepor=True
+            )
+
+    def salvar(self):
+        """
+        Grava o índice (se houver arquivo e alterações), somando as entradas
+        que outro processo tenha gravado nesse meio tempo.
+
+        Returns:
+            bool: True se o arquivo foi gravado
+        """
+        if not self.arquivo:
+            return False
+
+        with self._trava:
+            if not any(self._alterados.values()):
+                return False
+
+            # Alterações deste processo por cima do arquivo atual
+            self._assinatura = None
+            self._recarregar_se_mudou()
+            dados = {'formato': VERSAO_FORMATO, **self.entradas}
+
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.arquivo)), exist_ok=True)
+                temporario = f'{self.arquivo}.tmp'
+                with open(temporario, 'w', encoding='utf-8') as f:
+                    json.dump(dados, f, ensure_ascii=False)
+                os.replace(temporario, self.arquivo)
+            except Exception as e:
+                print(f"Erro ao salvar índice de documentos ({self.arquivo}): {e}")
+                return False
+
+            estado = os.stat(self.arquivo)
+            self._assinatura = (estado.st_mtime_ns, estado.st_size)
+            self._alterados = {'despesas': set(), 'receitas': set()}
+            return True
+
+
+# Índices compartilhados pelo processo (um por arquivo)
+_indices = {}
+_trava_indices = threading.Lock()
+
+
+def obter_indice(arquivo):
+    """
+    Índice compartilhado pelo processo para o arquivo.
+
+    Args:
+        arquivo (str): Caminho do indice_documentos.json
+
+    Returns:
+        IndiceDocumentos: Índice do arquivo
+    """
+    chave = os.path.abspath(arquivo)
+    with _trava_indices:
+        if chave not in _indices:
+            _indices[chave] = IndiceDocumentos(arquivo)
+        return _indices[chave]
@@ -0,0 +1,298 @@
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from extrator_ofx import ExtratorOFX, ConteudoOFX, MembroZip, listar_fontes_ofx, nome_fonte
+from cache_ofx import CacheOFX
+from dinheiro import COLUNA_CENTAVOS, centavos_para_reais
+
+EXTENSOES_OFX = ('.ofx', '.gz', '.zip')
+
+
+def chave_natural(caminho):
+    """
+    Chave de ordenação natural pelo nome do arquivo.
+    
+    Garante que '..._Parte2.ofx' venha antes de '..._Parte10.ofx'. Aceita
+    também MembroZip e ConteudoOFX (ordenados pelo nome de origem).
+    """
+    nome = nome_fonte(caminho).lower()
+    return [int(parte) if parte.isdigit() else parte for parte in re.split(r'(\d+)', nome)]
+
+
+def _montar_resultado(nome_arquivo, transacoes, transacoes_filtradas, inicio, em_cache=False, avisos=()):
+    """Monta o resultado de um arquivo com suas estatísticas."""
+    for transacao in transacoes:
+        transacao['Arquivo_Origem'] = nome_arquivo
+    
+    # Totais somados em centavos (exatos), como nas páginas
+    creditos = [t[COLUNA_CENTAVOS] for t in transacoes if t[COLUNA_CENTAVOS] > 0]
+    debitos = [t[COLUNA_CENTAVOS] for t in transacoes if t[COLUNA_CENTAVOS] < 0]
+    
+    return {
+        'sucesso': True,
+        'arquivo': nome_arquivo,
+        'transacoes': transacoes,
+        'transacoes_filtradas': transacoes_filtradas,
+        'avisos': list(avisos),
+        'estatisticas': {
+            'arquivo': nome_arquivo,
+            'transacoes_validas': len(transacoes),
+            'transacoes_filtradas': len(transacoes_filtradas),
+            'creditos': len(creditos),
+            'debitos': len(debitos),
+            'total_creditos': centavos_para_reais(sum(creditos)),
+            'total_debitos': centavos_para_reais(sum(debitos)),
+            'tempo_segundos': time.perf_counter() - inicio,
+            'em_cache': em_cache
+        }
+    }
+
+
+def _processar_arquivo_isolado(caminho_arquivo, cache=None, chave_cache=None):
+    """
+    Processa um único arquivo OFX com um ExtratorOFX próprio.
+    
+    Executado dentro dos processos do pool: nenhum estado é compartilhado
+    entre arquivos, e erros são devolvidos no resultado em vez de derrubar
+    o lote inteiro.
+    
+    Args:
+        caminho_arquivo: Caminho do arquivo OFX, MembroZip ou ConteudoOFX
+        cache (CacheOFX, optional): Cache onde gravar o resultado
+        chave_cache (str, optional): Chave do arquivo no cache
+        
+    Returns:
+        dict: Transações, lançamentos filtrados e estatísticas do arquivo
+    """
+    nome_arquivo = nome_fonte(caminho_arquivo)
+    inicio = time.perf_counter()
+    
+    try:
+        extrator = ExtratorOFX()
+        transacoes = extrator.processar_arquivo(caminho_arquivo, cache=cache, chave_cache=chave_cache)
+        
+        return _montar_resultado(nome_arquivo, transacoes, extrator.transacoes_filtradas, inicio,
+                                 avisos=extrator.avisos)
+        
+    except Exception as e:
+        return {
+            'sucesso': False,
+            'arquivo': nome_arquivo,
+            'erro': str(e),
+            'transacoes': [],
+            'transacoes_filtradas': [],
+            'avisos': [],
+            'estatisticas': {
+                'arquivo': nome_arquivo,
+                'transacoes_validas': 0,
+                'transacoes_filtradas': 0,
+                'creditos': 0,
+                'debitos': 0,
+                'total_creditos': 0,
+                'total_debitos': 0,
+                'tempo_segundos': time.perf_counter() - inicio,
+                'em_cache': False,
+                'erro': str(e)
+            }
+        }
+
+
+class ProcessadorLoteOFX:
+    """
+    Ingestão de vários arquivos OFX em paralelo (ProcessPoolExecutor).
+    
+    Cada arquivo é processado em um processo separado com seu próprio
+    ExtratorOFX; os resultados são combinados na ordem natural dos nomes
+    dos arquivos (Parte1, Parte2, ..., Parte10), independente da ordem em
+    que os processos terminam.
+    
+    Com um CacheOFX, arquivos já processados são resolvidos direto do cache
+    e só os demais vão para o pool.
+    
+    Arquivos .zip entram como um item por membro .ofx: cada processo abre o
+    .zip e descompacta só o seu membro em fluxo, então vários membros são
+    lidos em paralelo sem arquivos temporários e com memória constante.
+    Conteúdos em memória (ConteudoOFX, ex.: uploads) também são aceitos.
+    
+    Com usar_processos=False os arquivos vão para um pool de threads: é o
+    modo do app Streamlit, onde subir processos a cada rerun custa mais que
+    os poucos arquivos enviados e os uploads não precisam ser copiados
+    para outros processos.
+    """
+    
+    def __init__(self, max_workers=None, cache=None, usar_processos=True):
+        """
+        Args:
+            max_workers (int, optional): Máximo de arquivos em paralelo
+            cache (CacheOFX, optional): Cache de arquivos já processados
+            usar_processos (bool): ProcessPoolExecutor (CLI, lotes grandes)
+                ou ThreadPoolExecutor (app)
+        """
+        self.max_workers = max_workers
+        self.cache = cache
+        self.usar_processos = usar_processos
+    
+    def listar_arquivos(self, entradas):
+        """
+        Resolve a lista de extratos a processar.
+        
+        Args:
+            entradas (str | ConteudoOFX | list): Diretório, caminho de arquivo
+                (.ofx, .gz ou .zip), ConteudoOFX ou lista deles
+            
+        Returns:
+            list: Extratos (caminhos, MembroZip ou ConteudoOFX) em ordem natural
+        """
+        if isinstance(entradas, (str, os.PathLike, ConteudoOFX, MembroZip)):
+            entradas = [entradas]
+        
+        fontes = []
+        for entrada in entradas:
+            if isinstance(entrada, (ConteudoOFX, MembroZip)):
+                fontes.append(entrada)
+                continue
+            
+            entrada = os.fspath(entrada)
+            if os.path.isdir(entrada):
+                for nome in os.listdir(entrada):
+                    caminho = os.path.join(entrada, nome)
+                    if os.path.isfile(caminho) and nome.lower().endswith(EXTENSOES_OFX):
+                        fontes.append(caminho)
+            else:
+                fontes.append(entrada)
+        
+        # Um item por membro de .zip (arquivos inválidos seguem como estão e
+        # o erro aparece no resultado do arquivo)
+        arquivos = []
+        for fonte in fontes:
+            try:
+                arquivos.extend(listar_fontes_ofx(fonte))
+            except Exception:
+                arquivos.append(fonte)
+        
+        # Remover repetidos preservando o primeiro e ordenar de forma natural
+        arquivos = list(dict.fromkeys(arquivos))
+        return sorted(arquivos, key=chave_natural)
+    
+    def processar(self, entradas):
+        """
+        Processa um lote de arquivos OFX.
+        
+        Args:
+            entradas (str | list): Diretório, caminho de arquivo ou lista de caminhos
+            
+        Returns:
+            dict: Resultado da operação com:
+                - sucesso (bool): True se todos os arquivos foram processados
+                - transacoes (list): Transações de todos os arquivos, com
+                  'Arquivo_Origem', na ordem natural dos arquivos
+                - transacoes_filtradas (list): Lançamentos informativos removidos
+                - filtros_acionados (dict): Quantos lançamentos cada padrão
+                  informativo filtrou
+                - por_arquivo (list): Estatísticas de cada arquivo
+                - erros (list): Arquivos que falharam e o motivo
+                - avisos (list): Problemas de leitura ({'arquivo', 'aviso'}),
+                  ex.: blocos <STMTTRN> sem fechamento que foram pulados
+                - tempo_total (float): Duração do lote em segundos
+        """
+        inicio = time.perf_counter()
+        arquivos = self.listar_arquivos(entradas)
+        
+        if not arquivos:
+            return {
+                'sucesso': False,
+                'erro': 'Nenhum arquivo OFX encontrado',
+                'transacoes': [],
+                'transacoes_filtradas': [],
+                'por_arquivo': [],
+                'erros': [],
+                'avisos': [],
+                'tempo_total': 0
+            }
+        
+        resultados = [None] * len(arquivos)
+        pendentes = []
+        extrator = ExtratorOFX() if self.cache is not None else None
+        
+        for i, caminho in enumerate(arquivos):
+            chave = None
+            if self.cache is not None:
+                inicio_arquivo = time.perf_counter()
+                try:
+                    chave = self.cache.calcular_chave(caminho, extrator)
+                    entrada = self.cache.obter(chave)
+                except Exception:
+                    entrada = None
+                if entrada is not None:
+                    resultados[i] = _montar_resultado(
+                        nome_fonte(caminho), entrada['transacoes'],
+                        entrada['transacoes_filtradas'], inicio_arquivo, em_cache=True,
+                        avisos=entrada['avisos']
+                    )
+                    continue
+            pendentes.append((i, caminho, chave))
+        
+        caches = [self.cache] * len(pendentes)
+        caminhos = [caminho for _, caminho, _ in pendentes]
+        chaves = [chave for _, _, chave in pendentes]
+        
+        if len(pendentes) <= 1 or self.max_workers == 1:
+            # Evita o custo de subir processos para um único arquivo
+            processados = list(map(_processar_arquivo_isolado, caminhos, caches, chaves))
+        else:
+            pool = ProcessPoolExecutor if self.usar_processos else ThreadPoolExecutor
+            with pool(max_workers=self.max_workers) as executor:
+                # map devolve na ordem de entrada: o merge é determinístico
+                processados = list(executor.map(_processar_arquivo_isolado, caminhos, caches, chaves))
+        
+        for (i, _, _), resultado in zip(pendentes, processados):
+            resultados[i] = resultado
+        
+        transacoes = []
+        transacoes_filtradas = []
+        por_arquivo = []
+        erros = []
+        avisos = []
+        
+        for resultado in resultados:
+            transacoes.extend(resultado['transacoes'])
+            transacoes_filtradas.extend(resultado['transacoes_filtradas'])
+            por_arquivo.append(resultado['estatisticas'])
+            if not resultado['sucesso']:
+                erros.append({'arquivo': resultado['arquivo'], 'erro': resultado['erro']})
+            avisos.extend({'arquivo': resultado['arquivo'], 'aviso': aviso} for aviso in resultado['avisos'])
+        
+        return {
+            'sucesso': not erros,
+            'transacoes': transacoes,
+            'transacoes_filtradas': transacoes_filtradas,
+            'filtros_acionados': dict(Counter(f.get('padrao') for f in transacoes_filtradas)),
+            'por_arquivo': por_arquivo,
+            'erros': erros,
+            'avisos': avisos,
+            'total_arquivos': len(arquivos),
+            'total_transacoes': len(transacoes),
+            'tempo_total': time.perf_counter() - inicio
+        }
+
+
+# Teste rápido
+if __name__ == "__main__":
+    import sys
+    
+    processador = ProcessadorLoteOFX(cache=CacheOFX())
+    resultado = processador.processar(sys.argv[1:] or '.')
+    
+    print(f"\n=== LOTE: {len(resultado['por_arquivo'])} arquivos em {resultado['tempo_total']:.2f}s ===")
+    for stats in resultado['por_arquivo']:
+        print(f"- {stats['arquivo']}: {stats['transacoes_validas']} válidas, "
+              f"{stats['transacoes_filtradas']} filtradas ({stats['tempo_segundos']:.2f}s"
+              f"{', cache' if stats['em_cache'] else ''})")
+    for erro in resultado['erros']:
+        print(f"ERRO {erro['arquivo']}: {erro['erro']}")
+    for aviso in resultado['avisos']:
+        print(f"AVISO {aviso['arquivo']}: {aviso['aviso']}")
+    print(f"Total de transações: {len(resultado['transacoes'])}")
+    print(f"Filtros acionados: {resultado['filtros_acionados']}")
@@ -10,6 +10,11 @@ import shutil
 from datetime import datetime
 from pathlib import Path
 
+from contas import DIRETORIO_CONTAS
+from estatisticas_regras import NOME_ARQUIVO_ESTATISTICAS
+from indice_documentos import NOME_ARQUIVO_INDICE
+from memo_categorizacao import ARQUIVOS_MEMO
+
 def limpar_dados_sistema():
     """
     Limpa todos os dados do sistema mantendo os backups.
@@ -37,9 +42,21 @@ def limpar_dados_sistema():
         'resultados_mensais.csv',
         'historico_processamentos.json',
         'historico_fechamentos.json',
-        'configuracoes.json'
+        'configuracoes.json',
+        # Estado derivado dos dados importados
+        NOME_ARQUIVO_INDICE,
+        NOME_ARQUIVO_ESTATISTICAS,
+        *ARQUIVOS_MEMO.values(),
+        'estado_incremental.json',
+        'inbox_consumidos.json'
     ]
     
+    # Índices de FITIDs: sem a tabela, um índice antigo barraria a reimportação
+    arquivos_principais += sorted(caminho.name for caminho in dir_dados.glob('fitids_*.idx'))
+    
+    # Pastas removidas inteiras: tabelas de cada conta e cache de OFX processados
+    pastas_principais = [DIRETORIO_CONTAS, 'cache_ofx']
+    
     print("📋 Arquivos que serão REMOVIDOS:")
     print("-" * 80)
     
@@ -53,6 +70,16 @@ def limpar_dados_sistema():
         else:
             print(f"  ⚪ {arquivo} (não existe)")
     
+    for pasta in pastas_principais:
+        caminho = dir_dados / pasta
+        if caminho.is_dir():
+            conteudo = [item for item in caminho.rglob('*') if item.is_file()]
+            tamanho = sum(item.stat().st_size for item in conteudo)
+            print(f"  ❌ {pasta}/ ({len(conteudo)} arquivo(s), {tamanho:,} bytes)")
+            arquivos_encontrados.append(caminho)
+        else:
+            print(f"  ⚪ {pasta}/ (não existe)")
+    
     print()
     
     # Listar backups que serão MANTIDOS
@@ -99,7 +126,10 @@ def limpar_dados_sistema():
     
     for arquivo in arquivos_encontrados:
         try:
-            arquivo.unlink()
+            if arquivo.is_dir():
+                shutil.rmtree(arquivo)
+            else:
+                arquivo.unlink()
             print(f"  ✅ Removido: {arquivo.name}")
             removidos += 1
         except Exception as e:
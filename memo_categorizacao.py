@@ -0,0 +1,188 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+
+# Entradas mantidas por memo (razões sociais distintas)
+TAMANHO_MEMO = 50_000
+
+# Formato do arquivo em disco (mudar invalida memos gravados por versões antigas)
+VERSAO_FORMATO = '3'
+
+# Arquivos dos memos persistentes em dados_persistentes
+ARQUIVOS_MEMO = {
+    'despesas': 'memo_despesas.json',
+    'receitas': 'memo_receitas.json'
+}
+
+
+class MemoCategorizacao:
+    """
+    Memo LRU limitado de categorizações por razão social.
+
+    A chave é a razão social original (sem nenhum tratamento) e todas as
+    entradas pertencem a uma versão do conjunto de regras: ao consultar com
+    uma versão diferente (regras editadas), o memo é esvaziado. Acertos e
+    falhas são contados em self.acertos e self.falhas.
+
+    Com um arquivo, o memo é carregado dele na criação e gravado por
+    salvar(), sobrevivendo entre sessões.
+    """
+
+    def __init__(self, capacidade=TAMANHO_MEMO, arquivo=None):
+        """
+        Args:
+            capacidade (int): Número máximo de entradas
+            arquivo (str, optional): JSON para persistir o memo entre sessões
+        """
+        self.capacidade = capacidade
+        self.arquivo = arquivo
+
+        self.versao = None
+        self.acertos = 0
+        self.falhas = 0
+
+        self._entradas = OrderedDict()
+        self._alterado = False
+        self._trava = threading.Lock()
+
+        if arquivo:
+            self._carregar()
+
+    def _verificar_versao(self, versao):
+        if versao != self.versao:
+            self._entradas.clear()
+            self.versao = versao
+            self._alterado = True
+
+    def obter(self, razao_social, versao):
+        """
+        Busca a categorização memorizada.
+
+        Args:
+            razao_social (str): Razão social original
+            versao (str): Versão das regras em vigor
+
+        Returns:
+            Valor memorizado ou None se não houver
+        """
+        with self._trava:
+            self._verificar_versao(versao)
+            valor = self._entradas.get(razao_social)
+            if valor is None:
+                self.falhas += 1
+                return None
+
+            self._entradas.move_to_end(razao_social)
+            self.acertos += 1
+            return valor
+
+    def guardar(self, razao_social, versao, valor):
+        """Memoriza o valor, descartando a entrada usada há mais tempo se cheio."""
+        with self._trava:
+            self._verificar_versao(versao)
+            self._entradas[razao_social] = valor
+            self._entradas.move_to_end(razao_social)
+            if len(self._entradas) > self.capacidade:
+                self._entradas.popitem(last=False)
+            self._alterado = True
+
+    def estatisticas(self):
+        """
+        Returns:
+            dict: acertos, falhas, taxa_acerto (0 a 1) e entradas
+        """
+        consultas = self.acertos + self.falhas
+        return {
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+            'entradas': len(self._entradas)
+        }
+
+    def limpar(self):
+        with self._trava:
+            self._entradas.clear()
+            self.acertos = self.falhas = 0
+            self._alterado = True
+
+    def _carregar(self):
+        try:
+            with open(self.arquivo, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Erro ao carregar memo de categorização ({self.arquivo}): {e}")
+            return
+
+        if dados.get('formato') != VERSAO_FORMATO:
+            return
+
+        self.versao = dados.get('versao')
+        entradas = dados.get('entradas', [])[-self.capacidade:]
+        self._entradas = OrderedDict((chave, valor) for chave, valor in entradas)
+
+    def salvar(self):
+        """
+        Grava o memo no arquivo (se houver arquivo e alterações).
+
+        Returns:
+            bool: True se o arquivo foi gravado
+        """
+        if not self.arquivo or not self._alterado:
+            return False
+
+        with self._trava:
+            dados = {
+                'formato': VERSAO_FORMATO,
+                'versao': self.versao,
+                # Da entrada usada há mais tempo para a mais recente
+                'entradas': list(self._entradas.items())
+            }
+            self._alterado = False
+
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.arquivo)), exist_ok=True)
+            temporario = f'{self.arquivo}.tmp'
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(dados, f, ensure_ascii=False)
+            os.replace(temporario, self.arquivo)
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar memo de categorização ({self.arquivo}): {e}")
+            return False
+
+
+# Memos compartilhados pelo processo (um por categorizador, arquivo e regras)
+_memos = {}
+_trava_memos = threading.Lock()
+
+
+def obter_memo(nome, arquivo=None, capacidade=TAMANHO_MEMO, arquivo_regras=None):
+    """
+    Memo compartilhado pelo processo: categorizadores criados a cada rerun
+    do Streamlit reaproveitam as entradas dos anteriores.
+
+    Cada arquivo de regras tem o seu memo: categorizadores com regras
+    diferentes no mesmo processo não esvaziam nem leem o memo um do outro.
+
+    Args:
+        nome (str): 'despesas' ou 'receitas'
+        arquivo (str, optional): JSON para persistir entre sessões
+        capacidade (int): Número máximo de entradas
+        arquivo_regras (str, optional): Arquivo de regras dos categorizadores
+            que usam o memo
+
+    Returns:
+        MemoCategorizacao: Memo do nome/arquivo/regras
+    """
+    chave = (
+        nome,
+        os.path.abspath(arquivo) if arquivo else None,
+        os.path.abspath(arquivo_regras) if arquivo_regras else None
+    )
+    with _trava_memos:
+        if chave not in _memos:
+            _memos[chave] = MemoCategorizacao(capacidade, arquivo)
+        return _memos[chave]
@@ -0,0 +1,384 @@
+import os
+import json
+import time
+import queue
+import hashlib
+import threading
+from datetime import datetime
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+from extrator_ofx import ExtratorOFX, listar_fontes_ofx, montar_lote_colunar, nome_fonte, suporta_leitura_incremental
+from estado_incremental import EstadoIncremental
+from categorizador_despesas import CategorizadorDespesas
+from categorizador_receitas_simples import CategorizadorReceitasSimples
+from regras_categorizacao import NOME_ARQUIVO_REGRAS
+from memo_categorizacao import ARQUIVOS_MEMO, obter_memo
+from estatisticas_regras import NOME_ARQUIVO_ESTATISTICAS, EstatisticasRegras
+from gerenciador_persistencia_unificado import GerenciadorPersistenciaUnificado
+from ingestao_lote import chave_natural
+
+EXTENSOES_INBOX = ('.ofx', '.zip', '.gz')
+
+# Um arquivo só é processado depois de ficar este tempo sem mudar de
+# tamanho/data de modificação (evita ler arquivos ainda sendo copiados)
+TEMPO_ESTABILIZACAO = 2.0
+INTERVALO_VERIFICACAO = 0.5
+
+# Capacidade da fila de arquivos prontos (acima disso o agendador espera)
+TAMANHO_FILA = 100
+
+TAMANHO_BLOCO_HASH = 1024 * 1024
+
+
+class RegistroConsumidos:
+    """
+    Registro durável dos arquivos da inbox já ingeridos.
+
+    A chave é o SHA-256 do conteúdo: o mesmo extrato copiado de novo (ou
+    com outro nome) não é reprocessado, e o registro sobrevive a
+    reinicializações do monitor.
+    """
+
+    def __init__(self, arquivo_registro):
+        self.arquivo_registro = arquivo_registro
+        self._trava = threading.Lock()
+
+        try:
+            with open(arquivo_registro, 'r', encoding='utf-8') as f:
+                self._arquivos = json.load(f).get('arquivos', {})
+        except FileNotFoundError:
+            self._arquivos = {}
+
+    def contem(self, chave):
+        with self._trava:
+            return chave in self._arquivos
+
+    def registrar(self, chave, informacoes):
+        """Marca um arquivo como consumido (escrita atômica do registro)."""
+        with self._trava:
+            self._arquivos[chave] = dict(informacoes, consumido_em=datetime.now().isoformat())
+
+            temporario = f'{self.arquivo_registro}.tmp'
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump({'arquivos': self._arquivos}, f, indent=2, ensure_ascii=False)
+            os.replace(temporario, self.arquivo_registro)
+
+    def total(self):
+        with self._trava:
+            return len(self._arquivos)
+
+
+class _ManipuladorInbox(FileSystemEventHandler):
+    """Repassa ao monitor os arquivos criados, alterados ou movidos para a inbox."""
+
+    def __init__(self, monitor):
+        super().__init__()
+        self.monitor = monitor
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.monitor.agendar(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.monitor.agendar(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.monitor.agendar(event.dest_path)
+
+
+class MonitorInbox:
+    """
+    Ingestão em segundo plano de extratos colocados em uma pasta (inbox).
+
+    Fluxo: watchdog detecta o arquivo → o agendador espera o arquivo parar
+    de mudar (debounce) → o caminho entra em uma fila limitada →
+    trabalhadores extraem (ExtratorOFX), categorizam e acrescentam os
+    registros via GerenciadorPersistenciaUnificado → o arquivo é marcado
+    no RegistroConsumidos.
+
+    A gravação nas tabelas é serializada; extração e categorização rodam
+    em paralelo nos trabalhadores. Arquivos que já estavam na inbox ao
+    iniciar também são agendados (os já consumidos são ignorados pelo hash).
+
+    Arquivos .ofx são lidos de forma incremental (EstadoIncremental): do
+    extrato diário cumulativo só entram as transações posteriores à marca
+    da conta, gravada junto com as tabelas.
+    """
+
+    def __init__(self, diretorio_inbox='inbox', diretorio_dados='dados_persistentes', num_trabalhadores=2,
+                 tamanho_fila=TAMANHO_FILA, tempo_estabilizacao=TEMPO_ESTABILIZACAO):
+        self.diretorio_inbox = diretorio_inbox
+        self.num_trabalhadores = num_trabalhadores
+        self.tempo_estabilizacao = tempo_estabilizacao
+
+        self.gerenciador = GerenciadorPersistenciaUnificado(diretorio_dados)
+        self.registro = RegistroConsumidos(os.path.join(diretorio_dados, 'inbox_consumidos.json'))
+        self.arquivo_regras = os.path.join(diretorio_dados, NOME_ARQUIVO_REGRAS)
+        self.memos = {nome: obter_memo(nome, os.path.join(diretorio_dados, arquivo),
+                                       arquivo_regras=self.arquivo_regras)
+                      for nome, arquivo in ARQUIVOS_MEMO.items()}
+        self.estatisticas_regras = EstatisticasRegras(os.path.join(diretorio_dados, NOME_ARQUIVO_ESTATISTICAS))
+        self.estado_incremental = EstadoIncremental(os.path.join(diretorio_dados, 'estado_incremental.json'))
+
+        self.fila = queue.Queue(maxsize=tamanho_fila)
+        self._pendentes = {}  # caminho -> (tamanho, mtime, instante da última mudança)
+        self._na_fila = set()
+        self._trava = threading.Lock()
+        self._trava_persistencia = threading.Lock()
+        self._parar = threading.Event()
+        self._threads = []
+        self._observador = None
+
+        self.estatisticas = {
+            'arquivos_processados': 0,
+            'arquivos_ignorados': 0,
+            'erros': 0,
+            'novas_despesas': 0,
+            'novas_receitas': 0
+        }
+
+    # ==================== CICLO DE VIDA ====================
+
+    def iniciar(self):
+        """Inicia o observador da pasta, o agendador e os trabalhadores."""
+        os.makedirs(self.diretorio_inbox, exist_ok=True)
+        self._parar.clear()
+
+        self._threads = [threading.Thread(target=self._agendador, name='inbox-agendador', daemon=True)]
+        for i in range(self.num_trabalhadores):
+            self._threads.append(
+                threading.Thread(target=self._trabalhador, name=f'inbox-trabalhador-{i + 1}', daemon=True)
+            )
+        for thread in self._threads:
+            thread.start()
+
+        self._observador = Observer()
+        self._observador.schedule(_ManipuladorInbox(self), self.diretorio_inbox, recursive=False)
+        self._observador.start()
+
+        # Arquivos que chegaram enquanto o monitor estava parado
+        for nome in sorted(os.listdir(self.diretorio_inbox), key=chave_natural):
+            self.agendar(os.path.join(self.diretorio_inbox, nome))
+
+        print(f"📥 Monitorando {os.path.abspath(self.diretorio_inbox)} "
+              f"({self.num_trabalhadores} trabalhadores, {self.registro.total()} arquivos já consumidos)")
+
+    def parar(self):
+        """Para o monitor, terminando os arquivos já em processamento."""
+        if self._observador is not None:
+            self._observador.stop()
+            self._observador.join()
+            self._observador = None
+
+        self._parar.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def executar(self):
+        """Executa o monitor até Ctrl+C."""
+        self.iniciar()
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print("\nParando monitor...")
+        finally:
+            self.parar()
+            print(f"Resumo: {self.estatisticas}")
+
+    # ==================== AGENDAMENTO (DEBOUNCE) ====================
+
+    def agendar(self, caminho):
+        """
+        Registra um arquivo da inbox para processamento.
+
+        O arquivo só vai para a fila depois de ficar TEMPO_ESTABILIZACAO
+        segundos sem mudar; novos eventos reiniciam a espera.
+        """
+        nome = os.path.basename(caminho)
+        if nome.startswith('.') or not nome.lower().endswith(EXTENSOES_INBOX):
+            return
+
+        with self._trava:
+            if caminho not in self._na_fila:
+                self._pendentes[caminho] = (None, None, time.monotonic())
+
+    def _agendador(self):
+        """Move para a fila os arquivos pendentes que pararam de mudar."""
+        while not self._parar.is_set():
+            self._parar.wait(INTERVALO_VERIFICACAO)
+            agora = time.monotonic()
+            prontos = []
+
+            with self._trava:
+                for caminho, (tamanho, mtime, desde) in list(self._pendentes.items()):
+                    try:
+                        info = os.stat(caminho)
+                    except FileNotFoundError:
+                        del self._pendentes[caminho]
+                        continue
+
+                    if (info.st_size, info.st_mtime) != (tamanho, mtime):
+                        self._pendentes[caminho] = (info.st_size, info.st_mtime, agora)
+                    elif agora - desde >= self.tempo_estabilizacao:
+                        del self._pendentes[caminho]
+                        self._na_fila.add(caminho)
+                        prontos.append(caminho)
+
+            # Fora da trava: com a fila cheia, put espera os trabalhadores
+            for caminho in sorted(prontos, key=chave_natural):
+                while not self._parar.is_set():
+                    try:
+                        self.fila.put(caminho, timeout=INTERVALO_VERIFICACAO)
+                        break
+                    except queue.Full:
+                        continue
+
+    def _trabalhador(self):
+        while not self._parar.is_set() or not self.fila.empty():
+            try:
+                caminho = self.fila.get(timeout=INTERVALO_VERIFICACAO)
+            except queue.Empty:
+                continue
+
+            try:
+                resultado = self.processar_arquivo(caminho)
+                if resultado['sucesso']:
+                    if not resultado.get('ignorado'):
+                        print(f"✅ {resultado['arquivo']}: {resultado['novas_despesas']} despesas, "
+                              f"{resultado['novas_receitas']} receitas novas")
+                        for aviso in resultado['avisos']:
+                            print(f"⚠️ {resultado['arquivo']}: {aviso}")
+                else:
+                    print(f"❌ {resultado['arquivo']}: {resultado['erro']}")
+            finally:
+                with self._trava:
+                    self._na_fila.discard(caminho)
+                self.fila.task_done()
+
+    # ==================== PROCESSAMENTO ====================
+
+    def processar_arquivo(self, caminho):
+        """
+        Ingere um arquivo da inbox (.ofx, .zip ou .gz de extratos).
+
+        Args:
+            caminho (str): Caminho do arquivo
+
+        Returns:
+            dict: Resultado da operação
+        """
+        nome = os.path.basename(caminho)
+
+        try:
+            chave = self._hash_arquivo(caminho)
+
+            if self.registro.contem(chave):
+                with self._trava:
+                    self.estatisticas['arquivos_ignorados'] += 1
+                return {'sucesso': True, 'arquivo': nome, 'ignorado': True}
+
+            # .gz e membros de .zip são lidos em fluxo, sem descompactar no disco
+            extratos = [
+                (nome_fonte(fonte), self._categorizar(fonte))
+                for fonte in listar_fontes_ofx(caminho)
+            ]
+
+            novas_despesas = novas_receitas = 0
+            with self._trava_persistencia:
+                # Cópia com o mesmo conteúdo consumida por outro trabalhador nesse meio-tempo
+                if self.registro.contem(chave):
+                    with self._trava:
+                        self.estatisticas['arquivos_ignorados'] += 1
+                    return {'sucesso': True, 'arquivo': nome, 'ignorado': True}
+
+                for origem, (despesas, receitas, marca, _) in extratos:
+                    if not despesas.empty:
+                        resultado = self.gerenciador.salvar_despesas(despesas, origem, modo='adicionar')
+                        if not resultado['sucesso']:
+                            raise RuntimeError(f"Erro ao salvar despesas de {origem}: {resultado['erro']}")
+                        novas_despesas += resultado['novas_despesas']
+
+                    if not receitas.empty:
+                        resultado = self.gerenciador.salvar_receitas(receitas, origem, modo='adicionar')
+                        if not resultado['sucesso']:
+                            raise RuntimeError(f"Erro ao salvar receitas de {origem}: {resultado['erro']}")
+                        novas_receitas += resultado['novas_receitas']
+
+                    if marca is not None:
+                        self.estado_incremental.registrar(*marca)
+
+                # Só depois de persistir: uma falha no meio faz o arquivo ser reprocessado
+                self.registro.registrar(chave, {
+                    'arquivo': nome,
+                    'extratos': [origem for origem, _ in extratos],
+                    'novas_despesas': novas_despesas,
+                    'novas_receitas': novas_receitas
+                })
+
+            with self._trava:
+                self.estatisticas['arquivos_processados'] += 1
+                self.estatisticas['novas_despesas'] += novas_despesas
+                self.estatisticas['novas_receitas'] += novas_receitas
+
+            return {
+                'sucesso': True,
+                'arquivo': nome,
+                'novas_despesas': novas_despesas,
+                'novas_receitas': novas_receitas,
+                'avisos': [aviso for _, (_, _, _, avisos) in extratos for aviso in avisos]
+            }
+
+        except Exception as e:
+            with self._trava:
+                self.estatisticas['erros'] += 1
+            return {'sucesso': False, 'arquivo': nome, 'erro': str(e)}
+
+    def _categorizar(self, fonte):
+        """
+        Extrai e categoriza um extrato.
+
+        Returns:
+            tuple: (despesas, receitas, marca incremental a registrar ou
+            None, avisos da leitura)
+        """
+        extrator = ExtratorOFX()
+        if suporta_leitura_incremental(fonte):
+            novas = extrator.processar_arquivo_incremental(fonte, self.estado_incremental)
+            for transacao in novas:
+                transacao['Arquivo_Origem'] = nome_fonte(fonte)
+            lote = montar_lote_colunar(novas)
+        else:
+            lote = extrator.processar_arquivo_colunar(fonte)
+
+        # Categorizadores novos a cada arquivo: edições nas regras valem sem reiniciar
+        despesas = CategorizadorDespesas(
+            arquivo_regras=self.arquivo_regras, memo=self.memos['despesas'],
+            estatisticas=self.estatisticas_regras
+        ).processar_debitos(lote)
+        receitas = CategorizadorReceitasSimples(
+            self.arquivo_regras, memo=self.memos['receitas']
+        ).processar_creditos(lote)
+
+        # Sem escolha manual de mês: cada registro vai para o mês da própria data
+        for tabela in (despesas, receitas):
+            if not tabela.empty:
+                tabela['Mes_Ano'] = tabela['Data'].str[3:]
+
+        return despesas, receitas, extrator.marca_incremental, extrator.avisos
+
+    def _hash_arquivo(self, caminho):
+        sha = hashlib.sha256()
+        with open(caminho, 'rb') as file:
+            for bloco in iter(lambda: file.read(TAMANHO_BLOCO_HASH), b''):
+                sha.update(bloco)
+        return sha.hexdigest()
+
+
+if __name__ == "__main__":
+    import sys
+
+    MonitorInbox(sys.argv[1] if len(sys.argv) > 1 else 'inbox').executar()
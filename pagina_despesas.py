@@ -1,8 +1,13 @@
+import os
 import streamlit as st
 import pandas as pd
 from categorizador_despesas import CategorizadorDespesas
+from extrator_ofx import montar_lote_colunar
+from dinheiro import COLUNA_CENTAVOS, centavos_para_reais, resumir_centavos
 from gerenciador_persistencia_unificado import GerenciadorPersistenciaUnificado
 from estilo_unificado import aplicar_estilo_pagina, card_categoria
+from estatisticas_regras import NOME_ARQUIVO_ESTATISTICAS, EstatisticasRegras
+from regras_categorizacao import obter_regras
 
 def pagina_despesas():
     """Página de Despesas - Categorização automática e gestão persistente."""
@@ -26,9 +31,9 @@ def pagina_despesas():
         
         if not despesas_categorizadas.empty:
             # Estatísticas da categorização
-            total_debitos = len([t for t in transacoes if t['Valor'] < 0])
+            total_debitos = int((montar_lote_colunar(transacoes)['Valor'] < 0).sum())
             retiradas = len(despesas_categorizadas[despesas_categorizadas['Descricao'] == 'Retirada'])
-            valor_total = despesas_categorizadas['Valor'].sum()
+            valor_total = centavos_para_reais(int(despesas_categorizadas[COLUNA_CENTAVOS].sum()))
             
             st.header("📊 Categorização Automática")
             
@@ -49,13 +54,11 @@ def pagina_despesas():
             # Resumo por categoria
             st.subheader("📋 Resumo por Categoria")
             
-            resumo_categoria = despesas_categorizadas.groupby('Descricao').agg({
-                'Valor': ['sum', 'count']
-            }).round(2)
+            resumo_categoria = resumir_centavos(despesas_categorizadas, 'Descricao', None)
             
             for categoria in resumo_categoria.index:
-                total = resumo_categoria.loc[categoria, ('Valor', 'sum')]
-                quantidade = resumo_categoria.loc[categoria, ('Valor', 'count')]
+                total = resumo_categoria.loc[categoria, 'total']
+                quantidade = resumo_categoria.loc[categoria, 'quantidade']
             
                 st.markdown(
                     card_categoria(categoria, total, quantidade, "despesa"), 
@@ -174,6 +177,27 @@ def pagina_despesas():
                 card_categoria(categoria, total, quantidade, "despesa"),
                 unsafe_allow_html=True)
         
+        # Uso das regras acumulado nas importações (CLI e monitor da inbox)
+        relatorio = EstatisticasRegras(
+            os.path.join(gerenciador.diretorio_dados, NOME_ARQUIVO_ESTATISTICAS)
+        ).relatorio(obter_regras().despesas)
+        
+        if relatorio['total_debitos']:
+            with st.expander(f"📈 Uso das Regras ({relatorio['cobertura']:.0%} dos débitos categorizados por regra)"):
+                for categoria, dados in relatorio['por_categoria'].items():
+                    palavras = ', '.join(f"{palavra} ({uso['quantidade']})" for palavra, uso in dados['palavras'].items())
+                    st.write(f"**{categoria}**: {dados['quantidade']} débitos, R$ {dados['valor']:,.2f} — {palavras}")
+                
+                if relatorio['categorias_sem_uso']:
+                    st.warning(f"Regras sem uso: {', '.join(relatorio['categorias_sem_uso'])}")
+                for categoria, palavras in relatorio['palavras_sem_uso'].items():
+                    if categoria not in relatorio['categorias_sem_uso']:
+                        st.caption(f"Palavras sem uso em {categoria}: {', '.join(palavras)}")
+                
+                if relatorio['sem_regra']:
+                    st.markdown("**Diversos de maior valor (candidatos a novas regras)**")
+                    st.dataframe(pd.DataFrame(relatorio['sem_regra']), use_container_width=True, hide_index=True)
+        
         # Filtros
         st.subheader("🔍 Filtrar Despesas Salvas")
         
@@ -246,6 +270,30 @@ def pagina_despesas():
             df_display['Valor'] = df_display['Valor'].apply(lambda x: f"R$ {x:,.2f}")
             
             st.dataframe(df_display, use_container_width=True, hide_index=True)
+            
+            # Correção manual: a categoria passa a valer para o CNPJ/CPF da despesa
+            with st.expander("✏️ Corrigir categoria de uma despesa"):
+                opcoes = {
+                    f"{linha['Data']} - {linha['Razao_Social_Original']} - R$ {linha['Valor']:,.2f}": indice
+                    for indice, linha in df_filtrado.iterrows()
+                }
+                escolhida = st.selectbox("Despesa", list(opcoes), key="despesa_corrigir")
+                nova_categoria = st.selectbox(
+                    "Nova categoria",
+                    sorted(set(obter_regras().despesas) | set(despesas_salvas['Descricao'].dropna().astype(str))),
+                    key="categoria_corrigir"
+                )
+                
+                if st.button("💾 Salvar categoria", key="salvar_categoria"):
+                    despesa = df_filtrado.loc[opcoes[escolhida]]
+                    resultado = gerenciador.atualizar_despesa_por_dados(
+                        despesa['Data'], despesa['Razao_Social_Original'], despesa['Valor'], nova_categoria
+                    )
+                    if resultado['sucesso']:
+                        st.success("✅ Categoria atualizada! Ela não muda ao recategorizar o histórico, e as próximas despesas do mesmo CNPJ/CPF usarão esta categoria.")
+                        st.rerun()
+                    else:
+                        st.error(f"❌ Erro: {resultado['erro']}")
         else:
             st.warning("⚠️ Nenhuma despesa encontrada com os filtros aplicados.")
         
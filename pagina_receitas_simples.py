@@ -1,6 +1,6 @@
 import streamlit as st
 import pandas as pd
-from categorizador_receitas_simples import CategorizadorReceitasSimples
+from categorizador_receitas_simples import CategorizadorReceitasSimples, paciente_sugerido
 from gerenciador_persistencia_unificado import GerenciadorPersistenciaUnificado
 from estilo_unificado import aplicar_estilo_pagina, card_categoria
 
@@ -468,8 +468,10 @@ def pagina_receitas():
                         col1, col2 = st.columns(2)
                         
                         with col1:
-                            # Campos atuais
-                            paciente_atual = receita['Paciente'] if receita['Paciente'] else ""
+                            # Campos atuais (ou o paciente sugerido pela busca aproximada)
+                            paciente_atual = receita['Paciente'] if receita['Paciente'] else paciente_sugerido(receita)
+                            if paciente_atual and not receita['Paciente']:
+                                st.caption(f"💡 {receita['Motivo_Categorizacao']}")
                             
                             # Input para preenchimento
                             novo_paciente = st.text_input(
@@ -50,11 +50,13 @@ def pagina_resultado():
             
             # Lista de fechamentos
             st.subheader("📅 Fechamentos Disponíveis")
+            desatualizados = gerenciador_resultado.obter_meses_desatualizados()
             for _, resultado in resultados_salvos.iterrows():
                 mes_ano = resultado['Mes_Ano']
                 resultado_liquido = resultado['Resultado_Liquido']
                 cor = "🟢" if resultado_liquido >= 0 else "🔴"
-                st.write(f"{cor} {mes_ano}: R$ {resultado_liquido:,.2f}")
+                aviso = " 🔄 desatualizado" if mes_ano in desatualizados else ""
+                st.write(f"{cor} {mes_ano}: R$ {resultado_liquido:,.2f}{aviso}")
         else:
             st.info("Nenhum fechamento realizado ainda")
     
@@ -97,6 +99,10 @@ def pagina_resultado():
         
         if fechamento_existente:
             st.warning(f"⚠️ Já existe fechamento para {mes_ano}")
+            desatualizado = gerenciador_resultado.obter_meses_desatualizados().get(mes_ano)
+            if desatualizado:
+                st.error(f"🔄 Fechamento desatualizado: {desatualizado['motivo'] or 'dados alterados após o fechamento'}. "
+                         "Sobrescreva para recalcular.")
             st.json(fechamento_existente)
             sobrescrever = st.checkbox("Sobrescrever fechamento existente")
         else:
@@ -398,7 +404,7 @@ def pagina_resultado():
                 
                 colunas_exibir = ['Mes_Ano', 'Receita_Bruta', 'Total_Operacionais', 'Retirada', 'Resultado_Liquido']
                 st.dataframe(
-                    dados_ano[colunas_exibir].round(2),
+                    dados_ano[colunas_exibir],
                     use_container_width=True,
                     hide_index=True
                 )
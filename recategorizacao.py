@@ -0,0 +1,276 @@
+import os
+
+import pandas as pd
+
+from dinheiro import COLUNA_CENTAVOS, centavos_para_reais, serie_centavos
+from categorizador_despesas import CategorizadorDespesas
+from categorizador_receitas_simples import CategorizadorReceitasSimples
+from gerenciador_persistencia_unificado import GerenciadorPersistenciaUnificado, COLUNA_ORIGEM_CATEGORIA, TIPOS_TEXTO
+from gerenciador_resultado import GerenciadorResultado
+from indice_documentos import ORIGEM_MANUAL, coluna_documentos
+from regras_categorizacao import NOME_ARQUIVO_REGRAS
+
+# Linhas lidas por vez de cada tabela
+TAMANHO_BLOCO = 50_000
+
+# Receitas que ainda têm o resultado das regras (sem edição manual).
+# 'sugestao_aproximada' está pendente, mas a sugestão vem das regras.
+# 'manual' é a receita pendente de preenchimento; só entra se continuar vazia.
+TIPOS_RECEITA_AUTOMATICOS = ['automatico', 'automatico_mapeado', 'sugestao_aproximada',
+                             'automatico_documento', 'fonte_pagamento']
+TIPO_RECEITA_PENDENTE = 'manual'
+
+# Coluna da tabela de receitas -> chave do resultado de _aplicar_regras_categorizacao
+COLUNAS_RESULTADO_RECEITA = {
+    'Paciente': 'paciente',
+    'Fonte_Pagamento': 'fonte_pagamento',
+    'Tipo_Preenchimento': 'tipo_preenchimento',
+    'Requer_Preenchimento_Manual': 'requer_preenchimento_manual',
+    'Motivo_Categorizacao': 'motivo'
+}
+
+# Colunas que decidem se a receita mudou (tipo e motivo sozinhos não contam:
+# o mesmo paciente achado pelo CNPJ/CPF em vez do mapeamento não é mudança)
+COLUNAS_DECISIVAS_RECEITA = ['Paciente', 'Fonte_Pagamento', 'Requer_Preenchimento_Manual']
+
+
+class RecategorizadorHistorico:
+    """
+    Reaplica as regras de categorização atuais às tabelas persistentes.
+
+    Cada tabela (da raiz e de cada conta) é lida em blocos; as categorias
+    são recalculadas por coluna e só as linhas cujo resultado muda são
+    alteradas. O arquivo novo é escrito ao lado do original e trocado por
+    os.replace, apenas se houve mudança. Os meses com fechamento salvo que
+    tiveram linhas alteradas são marcados como desatualizados.
+    """
+
+    def __init__(self, diretorio_dados='dados_persistentes', tamanho_bloco=TAMANHO_BLOCO):
+        self.diretorio_dados = diretorio_dados
+        self.tamanho_bloco = tamanho_bloco
+
+        self.gerenciador = GerenciadorPersistenciaUnificado(diretorio_dados)
+        self.gerenciador_resultado = GerenciadorResultado(diretorio_dados)
+
+        arquivo_regras = os.path.join(diretorio_dados, NOME_ARQUIVO_REGRAS)
+        self.categorizador_despesas = CategorizadorDespesas(arquivo_regras=arquivo_regras)
+        self.categorizador_receitas = CategorizadorReceitasSimples(arquivo_regras)
+
+    def recategorizar(self, tabelas=('despesas', 'receitas'), aplicar=True):
+        """
+        Recategoriza o histórico salvo.
+
+        Args:
+            tabelas (tuple): 'despesas' e/ou 'receitas'
+            aplicar (bool): False só calcula o diff, sem gravar nada
+
+        Returns:
+            dict: Resultado com, por tabela, 'linhas_alteradas',
+            'por_categoria' ({categoria: {'antes', 'depois'}} com quantidade
+            e valor, só das categorias que mudaram) e 'transicoes'
+            ({'antiga → nova': quantidade}); e 'meses_desatualizados'
+        """
+        try:
+            resultado = {'sucesso': True, 'aplicado': aplicar}
+            meses_alterados = set()
+
+            for tabela in tabelas:
+                diff = self._novo_diff()
+                for gerenciador in self.gerenciador._gerenciadores():
+                    meses_alterados |= self._recategorizar_arquivo(gerenciador, tabela, diff, aplicar)
+                resultado[tabela] = self._finalizar_diff(diff)
+
+            resultado['meses_desatualizados'] = []
+            if aplicar and meses_alterados:
+                resultado['meses_desatualizados'] = self.gerenciador_resultado.marcar_meses_desatualizados(
+                    meses_alterados, 'Recategorização do histórico após mudança nas regras'
+                )
+
+            return resultado
+
+        except Exception as e:
+            return {'sucesso': False, 'erro': str(e)}
+
+    def _recategorizar_arquivo(self, gerenciador, tabela, diff, aplicar):
+        """
+        Recategoriza o CSV de uma partição bloco a bloco.
+
+        Returns:
+            set: Meses (MM/YYYY, pela Data) com linhas alteradas
+        """
+        arquivo = gerenciador._arquivo_tabela(tabela)
+        if not os.path.exists(arquivo) or os.path.getsize(arquivo) == 0:
+            return set()
+
+        meses = set()
+        alteradas = 0
+        temporario = f'{arquivo}.recategorizacao.tmp'
+        cabecalho = True
+
+        try:
+            blocos = pd.read_csv(arquivo, encoding='utf-8', dtype=TIPOS_TEXTO, chunksize=self.tamanho_bloco)
+            for bloco in blocos:
+                if tabela == 'despesas':
+                    mudou = self._recategorizar_despesas(bloco, diff)
+                else:
+                    mudou = self._recategorizar_receitas(bloco, diff)
+
+                if mudou.any():
+                    alteradas += int(mudou.sum())
+                    meses.update(bloco.loc[mudou, 'Data'].astype(str).str[3:])
+
+                if aplicar:
+                    bloco.to_csv(temporario, mode='w' if cabecalho else 'a', header=cabecalho,
+                                 index=False, encoding='utf-8')
+                    cabecalho = False
+
+            if aplicar and alteradas:
+                # Os FITIDs não mudam: o índice só recebe a nova assinatura
+                fitids = gerenciador._carregar_indice_fitid(tabela)
+                os.replace(temporario, arquivo)
+                gerenciador._reassinar_indice_fitid(tabela, fitids)
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+        return meses
+
+    def _recategorizar_despesas(self, bloco, diff):
+        """
+        Atualiza a Descricao das despesas do bloco (categorias corrigidas à
+        mão não são tocadas); devolve a máscara das linhas alteradas.
+        """
+        if bloco.empty or 'Descricao' not in bloco.columns:
+            return pd.Series(False, index=bloco.index)
+
+        antigas = bloco['Descricao'].fillna('').astype(str)
+        elegiveis = pd.Series(True, index=bloco.index)
+        if COLUNA_ORIGEM_CATEGORIA in bloco.columns:
+            elegiveis = bloco[COLUNA_ORIGEM_CATEGORIA].fillna('').astype(str) != ORIGEM_MANUAL
+
+        novas = antigas.copy()
+        if elegiveis.any():
+            razoes = bloco.loc[elegiveis, 'Razao_Social_Original'].fillna('').astype(str)
+            documentos = None
+            if 'CNPJ_CPF' in bloco.columns:
+                documentos = coluna_documentos(bloco.loc[elegiveis, 'CNPJ_CPF'])
+            novas[elegiveis] = self.categorizador_despesas.categorizar_coluna(razoes, documentos)
+
+        mudou = antigas != novas
+        self._acumular_diff(diff, bloco, antigas, novas, mudou)
+        if mudou.any():
+            bloco.loc[mudou, 'Descricao'] = novas[mudou]
+        return mudou
+
+    def _recategorizar_receitas(self, bloco, diff):
+        """
+        Atualiza as receitas automáticas do bloco (pacientes, fontes e tipos
+        editados à mão não são tocados); devolve a máscara das linhas alteradas.
+        """
+        if bloco.empty or 'Tipo_Preenchimento' not in bloco.columns:
+            return pd.Series(False, index=bloco.index)
+
+        def vazio(coluna):
+            return bloco[coluna].fillna('').astype(str).str.strip() == ''
+
+        tipos = bloco['Tipo_Preenchimento'].fillna('').astype(str)
+        elegiveis = tipos.isin(TIPOS_RECEITA_AUTOMATICOS) | (
+            (tipos == TIPO_RECEITA_PENDENTE) & vazio('Paciente') & vazio('Fonte_Pagamento')
+        )
+        mudou = pd.Series(False, index=bloco.index)
+        if not elegiveis.any():
+            return mudou
+
+        razoes = bloco.loc[elegiveis, 'Razao_Social_Original'].fillna('').astype(str)
+        if 'CNPJ_CPF' in bloco.columns:
+            documentos = coluna_documentos(bloco.loc[elegiveis, 'CNPJ_CPF'])
+        else:
+            documentos = pd.Series('', index=razoes.index)
+
+        # Um resultado por par (documento, razão social) distinto; o documento
+        # já confirmado vale antes das regras, como em processar_creditos
+        codigos, unicos = pd.factorize(documentos + '|' + razoes)
+        self.categorizador_receitas.indice.atualizar()
+        resultados = []
+        for par in unicos:
+            documento, razao = par.split('|', 1)
+            resultado = self.categorizador_receitas._categorizar_documento(documento)
+            if resultado is None:
+                resultado = self.categorizador_receitas._categorizar_razao_social(razao)[1]
+            resultados.append(resultado)
+
+        novos = pd.DataFrame({
+            coluna: pd.Series([r[chave] for r in resultados], dtype=object).take(codigos).to_numpy()
+            for coluna, chave in COLUNAS_RESULTADO_RECEITA.items()
+        }, index=razoes.index)
+
+        for coluna in COLUNAS_DECISIVAS_RECEITA:
+            antigos = bloco.loc[elegiveis, coluna].fillna('').astype(str)
+            mudou.loc[elegiveis] |= antigos != novos[coluna].astype(str)
+
+        antigas = tipos
+        novas = tipos.copy()
+        novas[elegiveis] = novos['Tipo_Preenchimento']
+        self._acumular_diff(diff, bloco, antigas, novas, mudou)
+
+        if mudou.any():
+            linhas = mudou[mudou].index
+            for coluna in COLUNAS_RESULTADO_RECEITA:
+                bloco[coluna] = bloco[coluna].astype(object)
+                bloco.loc[linhas, coluna] = novos.loc[linhas, coluna]
+        return mudou
+
+    def _novo_diff(self):
+        return {'linhas_alteradas': 0, 'antes': {}, 'depois': {}, 'transicoes': {}}
+
+    def _acumular_diff(self, diff, bloco, antigas, novas, mudou):
+        """Soma ao diff quantidade e centavos por categoria antes/depois e as transições."""
+        centavos = serie_centavos(bloco['Valor'])
+        if COLUNA_CENTAVOS in bloco.columns:
+            # Linhas antigas sem centavos usam o valor em reais
+            centavos = pd.to_numeric(bloco[COLUNA_CENTAVOS], errors='coerce').fillna(centavos).astype('int64')
+
+        for lado, categorias in (('antes', antigas), ('depois', novas)):
+            agrupado = centavos.groupby(categorias).agg(['count', 'sum'])
+            for categoria, (quantidade, soma) in agrupado.iterrows():
+                atual = diff[lado].setdefault(categoria, [0, 0])
+                atual[0] += int(quantidade)
+                atual[1] += int(soma)
+
+        if mudou.any():
+            diff['linhas_alteradas'] += int(mudou.sum())
+            transicoes = (antigas[mudou] + ' → ' + novas[mudou].astype(str)).value_counts()
+            for transicao, quantidade in transicoes.items():
+                diff['transicoes'][transicao] = diff['transicoes'].get(transicao, 0) + int(quantidade)
+
+    def _finalizar_diff(self, diff):
+        """Mantém só as categorias que mudaram, com valores em reais."""
+        por_categoria = {}
+        for categoria in sorted(set(diff['antes']) | set(diff['depois'])):
+            antes = diff['antes'].get(categoria, [0, 0])
+            depois = diff['depois'].get(categoria, [0, 0])
+            if antes != depois:
+                por_categoria[categoria or '(vazio)'] = {
+                    'antes': {'quantidade': antes[0], 'valor': centavos_para_reais(antes[1])},
+                    'depois': {'quantidade': depois[0], 'valor': centavos_para_reais(depois[1])}
+                }
+
+        return {
+            'linhas_alteradas': diff['linhas_alteradas'],
+            'por_categoria': por_categoria,
+            'transicoes': dict(sorted(diff['transicoes'].items(), key=lambda item: -item[1]))
+        }
+
+
+# Teste rápido (só calcula o diff, sem gravar)
+if __name__ == "__main__":
+    resultado = RecategorizadorHistorico().recategorizar(aplicar=False)
+
+    if not resultado['sucesso']:
+        print(f"Erro: {resultado['erro']}")
+    else:
+        for tabela in ('despesas', 'receitas'):
+            print(f"\n=== {tabela.upper()}: {resultado[tabela]['linhas_alteradas']} linhas mudariam ===")
+            for categoria, dados in resultado[tabela]['por_categoria'].items():
+                print(f"- {categoria}: {dados['antes']['quantidade']} → {dados['depois']['quantidade']} "
+                      f"(R$ {dados['antes']['valor']:,.2f} → R$ {dados['depois']['valor']:,.2f})")
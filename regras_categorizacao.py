@@ -0,0 +1,179 @@
+import os
+import json
+import hashlib
+import threading
+
+from casamento_aproximado import IndiceTrigramas
+from casamento_padroes import CasadorPalavrasChave
+
+NOME_ARQUIVO_REGRAS = 'regras_categorizacao.json'
+
+ARQUIVO_REGRAS = os.path.join('dados_persistentes', NOME_ARQUIVO_REGRAS)
+
+# Regras gravadas no arquivo na primeira execução.
+# 'despesas': {categoria: [palavras-chave]} (vale a primeira categoria que casar)
+# 'receitas': regras de fonte de pagamento e mapeamentos pagador -> paciente
+REGRAS_PADRAO = {
+    'despesas': {
+        'Retirada': ['CAISSA', 'FILIPE DE SOUZA RIBEIRO'],
+        'Limpeza': ['GISELE CRISTINA DA SILVA', 'MARIA MAGDALIA PEREIRA'],
+        'Luz': ['LIGHT'],
+        'Aluguel': ['PJBANK'],
+        'Fisioterapeutas': ['BEATRIZ PRETA RICART', 'RAFAELA MAGALHAES DE FRANCA'],
+        'Tributos': ['TRIB COD BARRAS', 'GPS'],
+    },
+    'receitas': {
+        'fonte_pagamento': {
+            'REDE': 'Cartão de Crédito'
+        },
+        # Formato: 'RAZÃO SOCIAL PAGADORA': 'NOME DO PACIENTE REAL'
+        'mapeamento_razao_paciente': {
+            'CARLOS HENRIQUE FRANGO': 'ANNA LUÍZA MONDIN MONTANHA',
+            'FELIPE CUNHA MATOS': 'LETÍCIA P. S. MATTOS',
+            'KARLOS ALEXANDRE OLIVEIRA': 'TÂNIA MARA BARRETO ALVES',
+            'KAREN SILVA DE MELO': 'DONA AUGUSTA',
+            'MATHEUS SILVA BERNARDES': 'ESTER ROCHA SANTOS DE OLIVEIRA',
+            'ALESSANDRA CRISTINE VAZ SANTOS': 'SÔNIA CRISTINA VAZ SANTOS',
+            'SOLUÇÃO ELETRONICA MOTO PEÇA': 'APARECIDA',
+            'LMCC DA COSTA LUANA': 'LUANA MACHADO DE CAMPOS',
+            'GPBR PARTICIPACOES LTDA': 'GYMPASS',
+            'PIX QRS NATALIA SIL': 'NATÁLIA SILVEIRA RODRIGUES DE OLIVEIRA',
+            'ELSON DA SILVA LIMA': 'LÚCIA KURDIAN',
+            'RAFAEL GOHN ALVES': 'PATRÍCIA REYNOZO',
+            'RICARDO DA COSTA SILVA': 'GLAUCE LEANDRO E LUCINEIA LEANDRO',
+            'LORRAN MORAES SARENTO': 'LAÍS CECÍLIO DA COSTA',
+            'ADRIANA CRISTINE VAZ SANTOS': 'SÔNIA CRISTINA VAZ SANTOS',
+            'GILBERTO ALVES SILVA': 'LARISSSA DA VEIGA AMARAL',
+        },
+        # Busca parcial: trecho da razão social -> chave completa do mapeamento
+        'mapeamento_flexivel': {
+            'FELIPE CUNHA': 'FELIPE CUNHA MATOS',
+            'KARLOS ALEXANDRE': 'KARLOS ALEXANDRE OLIVEIRA',
+            'CARLOS HENRIQUE': 'CARLOS HENRIQUE FRANGO',
+            'SOLUCAO ELETRONICA': 'SOLUÇÃO ELETRONICA MOTO PEÇA',
+            'KAREN SILVA': 'KAREN SILVA DE MELO',
+            'MATHEUS SILVA': 'MATHEUS SILVA BERNARDES',
+            'LMCC DA COSTA': 'LMCC DA COSTA LUANA',
+            'GPBR PARTICIPACOES': 'GPBR PARTICIPACOES LTDA',
+            'ALESSANDRA CRISTINE': 'ALESSANDRA CRISTINE VAZ SANTOS',
+            'NATALIA SIL': 'PIX QRS NATALIA SIL',
+            'ELSON DA SILVA': 'ELSON DA SILVA LIMA',
+            'RAFAEL GOHN': 'RAFAEL GOHN ALVES',
+            'RICARDO DA COSTA': 'RICARDO DA COSTA SILVA',
+            'LORRAN MORAES': 'LORRAN MORAES SARENTO',
+            'ADRIANA CRISTINE': 'ADRIANA CRISTINE VAZ SANTOS',
+            'GILBERTO ALVES': 'GILBERTO ALVES SILVA',
+        },
+    },
+}
+
+
+class RegrasCompiladas:
+    """
+    Regras de categorização de um arquivo e as estruturas de busca
+    compiladas a partir delas.
+
+    Attributes:
+        versao (str): SHA-256 do conteúdo do arquivo (muda a cada edição)
+        despesas (dict): {categoria: [palavras-chave]}
+        fonte_pagamento (dict): Trecho da razão social -> fonte de pagamento
+        mapeamento_razao_paciente (dict): Razão social pagadora -> paciente
+        mapeamento_flexivel (dict): Trecho de busca -> chave do mapeamento
+        casador_despesas (CasadorPalavrasChave): Autômato das despesas
+        casador_fonte_pagamento (CasadorPalavrasChave): Autômato dos trechos
+            de fonte_pagamento (devolve o primeiro trecho que casar)
+        casador_flexivel (CasadorPalavrasChave): Autômato do mapeamento
+            flexível (devolve o trecho de busca que casou primeiro)
+        indice_pagadores (IndiceTrigramas): Busca aproximada dos pagadores
+            do mapeamento_razao_paciente (devolve o paciente)
+    """
+
+    def __init__(self, regras, versao, anteriores=None):
+        """
+        Args:
+            regras (dict): Conteúdo do regras_categorizacao.json
+            versao (str): SHA-256 do conteúdo
+            anteriores (RegrasCompiladas, optional): Regras da versão anterior
+                do mesmo arquivo; uma cópia do índice de pagadores delas é
+                atualizada só com os pagadores que entraram, mudaram ou saíram
+                (o índice anterior segue intacto para as sessões que ainda o usam)
+        """
+        receitas = regras.get('receitas', {})
+
+        self.versao = versao
+        self.despesas = regras.get('despesas', {})
+        self.fonte_pagamento = receitas.get('fonte_pagamento', {})
+        self.mapeamento_razao_paciente = receitas.get('mapeamento_razao_paciente', {})
+        self.mapeamento_flexivel = receitas.get('mapeamento_flexivel', {})
+
+        self.casador_despesas = CasadorPalavrasChave(self.despesas)
+        self.casador_fonte_pagamento = CasadorPalavrasChave({trecho: [trecho] for trecho in self.fonte_pagamento})
+        self.casador_flexivel = CasadorPalavrasChave({busca: [busca] for busca in self.mapeamento_flexivel})
+
+        indice = anteriores.indice_pagadores.copia() if anteriores else IndiceTrigramas()
+        self.indice_pagadores = indice.sincronizar(self.mapeamento_razao_paciente)
+
+
+# Regras compiladas por arquivo: {caminho absoluto: (mtime_ns, tamanho, RegrasCompiladas)}
+_cache_regras = {}
+_trava_cache = threading.Lock()
+
+
+def _conteudo_padrao():
+    return json.dumps(REGRAS_PADRAO, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def obter_regras(arquivo_regras=ARQUIVO_REGRAS):
+    """
+    Regras compiladas do arquivo, recompiladas só quando ele muda.
+
+    A cada chamada o arquivo é verificado por os.stat (mtime e tamanho);
+    só quando um deles muda o conteúdo é relido, e só é recompilado se o
+    hash do conteúdo também mudou. Assim uma edição no JSON vale na próxima
+    execução da página, sem reiniciar o Streamlit e sem recompilar a cada
+    rerun. Se o arquivo não existir, ele é criado com REGRAS_PADRAO.
+
+    Args:
+        arquivo_regras (str): Caminho do regras_categorizacao.json
+
+    Returns:
+        RegrasCompiladas: Regras em vigor (as últimas válidas, se o arquivo
+        editado tiver erro de sintaxe)
+    """
+    caminho = os.path.abspath(arquivo_regras)
+
+    with _trava_cache:
+        if not os.path.exists(caminho):
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            with open(caminho, 'wb') as f:
+                f.write(_conteudo_padrao())
+
+        estado = os.stat(caminho)
+        assinatura = (estado.st_mtime_ns, estado.st_size)
+
+        em_cache = _cache_regras.get(caminho)
+        if em_cache and em_cache[:2] == assinatura:
+            return em_cache[2]
+
+        with open(caminho, 'rb') as f:
+            conteudo = f.read()
+        versao = hashlib.sha256(conteudo).hexdigest()
+
+        if em_cache and em_cache[2].versao == versao:
+            # Arquivo regravado sem alteração (ex.: touch): só atualiza o stat
+            compiladas = em_cache[2]
+        else:
+            try:
+                compiladas = RegrasCompiladas(
+                    json.loads(conteudo.decode('utf-8')), versao, em_cache[2] if em_cache else None
+                )
+            except Exception as e:
+                print(f"Erro ao carregar regras de categorização ({arquivo_regras}): {e}")
+                if em_cache:
+                    compiladas = em_cache[2]
+                else:
+                    padrao = _conteudo_padrao()
+                    compiladas = RegrasCompiladas(REGRAS_PADRAO, hashlib.sha256(padrao).hexdigest())
+
+        _cache_regras[caminho] = (*assinatura, compiladas)
+        return compiladas
@@ -0,0 +1,92 @@
+import json
+import math
+import random
+
+from benchmark_aproximado import buscar_exaustivo, gerar_pagadores, variar
+from casamento_aproximado import IndiceTrigramas, normalizar_nome, trigramas
+from categorizador_receitas_simples import CategorizadorReceitasSimples, paciente_sugerido
+from memo_categorizacao import MemoCategorizacao
+
+
+def _dice(a, b):
+    grupo_a, grupo_b = trigramas(normalizar_nome(a)), trigramas(normalizar_nome(b))
+    return 2 * len(grupo_a & grupo_b) / (len(grupo_a) + len(grupo_b))
+
+
+def test_aceita_no_limiar_e_recusa_abaixo():
+    conhecido = 'FELIPE CUNHA MATOS'
+    texto = 'FELIPE CUNHA DE MATTOS'
+    similaridade = _dice(conhecido, texto)
+
+    indice = IndiceTrigramas(limiar=similaridade)
+    indice.adicionar(conhecido, 'LETÍCIA')
+    valor, nome, confianca = indice.buscar(texto)
+    assert (valor, nome) == ('LETÍCIA', conhecido)
+    assert math.isclose(confianca, similaridade)
+
+    assert indice.buscar(texto, limiar=similaridade + 0.01) is None
+
+
+def test_nomes_de_pacientes_diferentes_quase_empatados_sao_ambiguos():
+    indice = IndiceTrigramas(limiar=0.7)
+    indice.sincronizar({'MARIA SILVA SANTOS': 'MARIA S', 'MARIA SILVA SANTANA': 'MARIA A'})
+
+    assert indice.buscar('MARIA SILVA SANT') is None
+    assert indice.buscar('MARIA SILVA SANTOS')[0] == 'MARIA S'
+
+
+def test_sincronizar_remove_quem_saiu_do_mapeamento():
+    indice = IndiceTrigramas()
+    indice.sincronizar({'FELIPE CUNHA MATOS': 'LETÍCIA', 'SOLUCAO ELETRONICA MOTO PECA': 'APARECIDA'})
+    indice.sincronizar({'SOLUCAO ELETRONICA MOTO PECA': 'APARECIDA'})
+
+    assert len(indice) == 1
+    assert indice.buscar('FELIPE CUNHA MATOS') is None
+
+
+def test_copia_nao_altera_o_indice_publicado():
+    publicado = IndiceTrigramas()
+    publicado.sincronizar({'FELIPE CUNHA MATOS': 'LETÍCIA'})
+
+    nova = publicado.copia().sincronizar({'SOLUCAO ELETRONICA MOTO PECA': 'APARECIDA'})
+
+    assert publicado.buscar('FELIPE CUNHA MATOS')[0] == 'LETÍCIA'
+    assert publicado.buscar('SOLUCAO ELETRONICA MOTO PECA') is None
+    assert nova.buscar('FELIPE CUNHA MATOS') is None
+    assert nova.buscar('SOLUCAO ELETRONICA MOTO PECA')[0] == 'APARECIDA'
+
+
+def test_busca_igual_a_exaustiva():
+    aleatorio = random.Random(7)
+    pagadores = gerar_pagadores(500, aleatorio)
+    nomes = list(pagadores)
+
+    indice = IndiceTrigramas()
+    indice.sincronizar(pagadores)
+
+    for _ in range(200):
+        texto = variar(aleatorio.choice(nomes), aleatorio)
+        obtido = indice.buscar(texto)
+        referencia = buscar_exaustivo(pagadores, texto, indice.limiar)
+        assert (obtido is None) == (referencia is None)
+        if obtido:
+            assert obtido[0] == referencia[0]
+            assert math.isclose(obtido[2], referencia[1])
+
+
+def test_pagador_parecido_vira_sugestao_pendente(tmp_path):
+    arquivo_regras = tmp_path / 'regras_categorizacao.json'
+    arquivo_regras.write_text(json.dumps({'receitas': {
+        'mapeamento_razao_paciente': {'FELIPE CUNHA MATOS': 'LETÍCIA'}
+    }}), encoding='utf-8')
+
+    categorizador = CategorizadorReceitasSimples(str(arquivo_regras), memo=MemoCategorizacao())
+    resultado = categorizador._aplicar_regras_categorizacao('FELIPE CUNHA DE MATTOS')
+
+    assert resultado['paciente'] == ''
+    assert resultado['requer_preenchimento_manual']
+    assert resultado['tipo_preenchimento'] == 'sugestao_aproximada'
+    assert paciente_sugerido({
+        'Tipo_Preenchimento': resultado['tipo_preenchimento'],
+        'Motivo_Categorizacao': resultado['motivo']
+    }) == 'LETÍCIA'
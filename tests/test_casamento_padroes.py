@@ -0,0 +1,49 @@
+import random
+
+from casamento_padroes import CasadorPalavrasChave
+
+
+def _laco_ingenuo(regras, texto):
+    """Referência: primeira regra (categoria, palavra) contida no texto."""
+    for categoria, palavras in regras.items():
+        for palavra in palavras:
+            if palavra.upper() in texto:
+                return categoria, palavra
+    return None
+
+
+def test_prioridade_igual_ao_laco_nas_regras():
+    regras = {
+        'Aluguel': ['IMOBILIARIA', 'ALUGUEL'],
+        'Condomínio': ['CONDOMINIO', 'ALUGUEL CONDOMINIO'],
+        'Mercado': ['MERCADO', 'SUPERMERCADO'],
+    }
+    casador = CasadorPalavrasChave(regras)
+
+    for texto in ('PIX ALUGUEL CONDOMINIO ED SOL', 'SUPERMERCADO EXTRA', 'CONDOMINIO IMOBILIARIA X', 'FARMACIA'):
+        assert casador.buscar_regra(texto) == _laco_ingenuo(regras, texto)
+
+
+def test_igual_ao_laco_ingenuo_em_regras_aleatorias():
+    # Alfabeto pequeno: muitas palavras sobrepostas e sufixos umas das outras
+    aleatorio = random.Random(11)
+    alfabeto = 'ABC '
+
+    def palavra(minimo=1, maximo=5):
+        return ''.join(aleatorio.choice(alfabeto) for _ in range(aleatorio.randint(minimo, maximo)))
+
+    for _ in range(50):
+        regras = {f'C{i}': [palavra() for _ in range(aleatorio.randint(1, 4))] for i in range(6)}
+        casador = CasadorPalavrasChave(regras)
+        for _ in range(40):
+            texto = palavra(0, 30)
+            assert casador.buscar_regra(texto) == _laco_ingenuo(regras, texto)
+
+
+def test_palavra_vazia_casa_com_qualquer_texto():
+    regras = {'A': ['XYZ'], 'B': [''], 'C': ['ABC']}
+    casador = CasadorPalavrasChave(regras)
+
+    assert casador.buscar('ABC') == 'B'
+    assert casador.buscar('XYZ') == 'A'
+    assert CasadorPalavrasChave({'A': ['XYZ']}).buscar('ABC') is None
@@ -0,0 +1,74 @@
+import json
+
+from categorizador_despesas import CategorizadorDespesas
+from extrator_ofx import ExtratorOFX, montar_lote_colunar
+from filtro_informativos import FiltroInformativos
+from indice_documentos import IndiceDocumentos
+from memo_categorizacao import MemoCategorizacao
+from tests.test_extrator_ofx import _extrato, _transacao
+
+REGRAS = {
+    'Aluguel': ['IMOBILIARIA'],
+    'Laboratório': ['LABORATORIO', 'LAB '],
+    'Impostos': ['RECEITA FEDERAL', 'DARF'],
+}
+
+MEMOS = [
+    (-1500.00, 'PAGAMENTO IMOBILIARIA CENTRO 11222333000181'),
+    (-320.45, 'SISPAG LABORATORIO ALFA 22333444000190'),
+    (980.00, 'PIX RECEBIDO LABORATORIO BETA 33444555000102'),
+    (-89.90, 'PAGAMENTO PADARIA DO BAIRRO 12345678901'),
+    (-45.10, 'SISPAG LABORATORIO ALFA 22333444000190'),
+    (-1200.00, 'DARF RECEITA FEDERAL 00394460000141'),
+]
+
+
+def _categorizador(tmp_path, estatisticas=None):
+    arquivo_regras = tmp_path / 'regras_categorizacao.json'
+    arquivo_regras.write_text(json.dumps({'despesas': REGRAS}), encoding='utf-8')
+    return CategorizadorDespesas(
+        arquivo_despesas=str(tmp_path / 'despesas.csv'), arquivo_regras=str(arquivo_regras),
+        memo=MemoCategorizacao(), estatisticas=estatisticas, indice=IndiceDocumentos()
+    )
+
+
+def _transacoes_extraidas(tmp_path):
+    caminho = tmp_path / 'extrato.ofx'
+    transacoes = [_transacao(f'F{i}', valor, memo) for i, (valor, memo) in enumerate(MEMOS)]
+    caminho.write_bytes(_extrato(('0341', '111', transacoes)))
+    return ExtratorOFX(FiltroInformativos([])).processar_arquivo(str(caminho))
+
+
+def test_lote_vetorizado_equivale_a_categorizar_linha_a_linha(tmp_path):
+    transacoes = _transacoes_extraidas(tmp_path)
+    categorizador = _categorizador(tmp_path)
+
+    despesas = categorizador.processar_debitos(transacoes)
+
+    debitos = [t for t in transacoes if t['Tipo'] == 'Debito']
+    assert despesas['FITID'].tolist() == [t['FITID'] for t in debitos]
+    assert despesas['Descricao'].tolist() == [
+        _categorizador(tmp_path).categorizar_despesa(t['Razao Social']) for t in debitos
+    ]
+    assert despesas['Descricao'].tolist() == ['Aluguel', 'Laboratório', 'Diversos', 'Laboratório', 'Impostos']
+    assert despesas['Valor'].tolist() == [-t['Valor'] for t in debitos]
+    assert despesas['Valor_Centavos'].tolist() == [-t['Valor_Centavos'] for t in debitos]
+    assert despesas['Data'].tolist() == [t['Data'] for t in debitos]
+    assert despesas['Conta'].tolist() == ['111'] * len(debitos)
+    # Um único carimbo de processamento por lote
+    assert despesas['Data_Processamento'].nunique() == 1
+    assert despesas.index.tolist() == list(range(len(debitos)))
+
+    # Lote colunar e gerador seguem o mesmo caminho da lista
+    colunar = categorizador.processar_debitos(montar_lote_colunar(transacoes))
+    gerador = categorizador.processar_debitos(iter(transacoes))
+    for resultado in (colunar, gerador):
+        assert resultado.drop(columns='Data_Processamento').equals(despesas.drop(columns='Data_Processamento'))
+
+
+def test_sem_debitos_devolve_tabela_vazia(tmp_path):
+    creditos = [t for t in _transacoes_extraidas(tmp_path) if t['Tipo'] == 'Credito']
+
+    assert _categorizador(tmp_path).processar_debitos(creditos).empty
+    assert _categorizador(tmp_path).processar_debitos([]).empty
+
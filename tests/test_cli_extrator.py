@@ -0,0 +1,37 @@
+import pytest
+
+from cli_extrator import SAIDA_FALHA, SAIDA_OK, PipelineImportacao, main
+from tests.test_incremental import DIA_1, _extrato
+
+
+def test_meses_so_das_transacoes_novas(tmp_path):
+    dados = str(tmp_path / 'dados')
+    extrato = _extrato(tmp_path / 'd1.ofx', DIA_1)
+
+    resumo = PipelineImportacao(dados, usar_cache=False, incremental=False).importar([extrato])
+    assert resumo['meses'] == ['03/2025']
+
+    # Mesmo arquivo de novo: nada gravado, nenhum mês para fechar
+    resumo = PipelineImportacao(dados, usar_cache=False, incremental=False).importar([extrato])
+    assert (resumo['novas_despesas'], resumo['novas_receitas'], resumo['meses']) == (0, 0, [])
+
+
+def test_codigos_de_saida(tmp_path, capsys):
+    dados = str(tmp_path / 'dados')
+    extrato = str(_extrato(tmp_path / 'd1.ofx', DIA_1))
+
+    assert main([extrato, '--dados', dados, '--sem-cache', '--fechar']) == SAIDA_OK
+    assert '03/2025' in capsys.readouterr().out
+
+    # Mês já fechado: só com --sobrescrever-fechamento
+    assert main(['--dados', dados, '--fechar', '03/2025']) == SAIDA_FALHA
+    assert 'Já existe fechamento para 03/2025' in capsys.readouterr().err
+    assert main(['--dados', dados, '--fechar', '03/2025', '--sobrescrever-fechamento']) == SAIDA_OK
+
+    assert main([str(tmp_path / 'inexistente.ofx'), '--dados', dados]) == SAIDA_FALHA
+    assert capsys.readouterr().err.startswith('❌')
+
+    # Argumentos inválidos saem pelo argparse (código 2)
+    with pytest.raises(SystemExit) as saida:
+        main(['--dados', dados, '--fechar', '13/2025'])
+    assert saida.value.code == 2
@@ -0,0 +1,72 @@
+from estatisticas_regras import EstatisticasRegras
+from tests.test_categorizador_despesas import REGRAS, _categorizador, _transacoes_extraidas
+
+
+def test_uso_das_regras_somado_na_mesma_passada(tmp_path):
+    estatisticas = EstatisticasRegras()
+    _categorizador(tmp_path, estatisticas).processar_debitos(_transacoes_extraidas(tmp_path))
+
+    dados = estatisticas.carregar()
+    assert (dados['total_debitos'], dados['total_centavos']) == (5, 315545)
+    assert dados['regras']['Laboratório'] == {'LABORATORIO': [2, 36555]}
+    assert dados['regras']['Aluguel'] == {'IMOBILIARIA': [1, 150000]}
+    assert list(dados['sem_regra'].values()) == [[1, 8990]]
+
+
+def test_totais_acumulados_no_arquivo_entre_importacoes(tmp_path):
+    arquivo = str(tmp_path / 'estatisticas_regras.json')
+
+    primeira = EstatisticasRegras(arquivo)
+    primeira.registrar(('Aluguel', 'IMOBILIARIA'), 'IMOBILIARIA CENTRO', 1, 150000)
+    primeira.registrar(None, 'PADARIA DO BAIRRO', 2, 3000)
+    assert primeira.salvar()
+    # Nada pendente: salvar de novo não soma duas vezes
+    assert not primeira.salvar()
+
+    # Outro processo acumula no mesmo arquivo
+    segunda = EstatisticasRegras(arquivo)
+    segunda.registrar(('Aluguel', 'IMOBILIARIA'), 'IMOBILIARIA CENTRO', 1, 150000)
+    segunda.registrar(None, 'PADARIA DO BAIRRO', 1, 1500)
+    assert segunda.salvar()
+
+    dados = EstatisticasRegras(arquivo).carregar()
+    assert (dados['total_debitos'], dados['total_centavos']) == (5, 304500)
+    assert dados['regras'] == {'Aluguel': {'IMOBILIARIA': [2, 300000]}}
+    assert dados['sem_regra'] == {'PADARIA DO BAIRRO': [3, 4500]}
+
+    segunda.limpar()
+    assert EstatisticasRegras(arquivo).carregar()['total_debitos'] == 0
+
+
+def test_sem_arquivo_nada_e_gravado(tmp_path):
+    estatisticas = EstatisticasRegras()
+    estatisticas.registrar(None, 'PADARIA', 1, 100)
+
+    assert not estatisticas.salvar()
+    assert estatisticas.carregar()['total_debitos'] == 1
+
+
+def test_relatorio_cobertura_regras_sem_uso_e_diversos_por_valor(tmp_path):
+    estatisticas = EstatisticasRegras(str(tmp_path / 'estatisticas_regras.json'))
+    estatisticas.registrar(('Laboratório', 'LABORATORIO'), 'LABORATORIO ALFA', 3, 30000)
+    estatisticas.registrar(('Laboratório', 'LABORATORIO'), 'LABORATORIO BETA', 1, 5000)
+    estatisticas.registrar(('Aluguel', 'IMOBILIARIA'), 'IMOBILIARIA CENTRO', 1, 150000)
+    estatisticas.registrar(None, 'PADARIA DO BAIRRO', 4, 2000)
+    estatisticas.registrar(None, 'OFICINA MECANICA', 1, 45000)
+    estatisticas.registrar(None, 'BANCA DE JORNAL', 1, 500)
+    estatisticas.salvar()
+
+    relatorio = estatisticas.relatorio(REGRAS, limite=2)
+
+    assert relatorio['total_debitos'] == 11
+    assert relatorio['valor_total'] == 2325.00
+    assert relatorio['cobertura'] == 5 / 11
+    assert list(relatorio['por_categoria']) == ['Laboratório', 'Aluguel']
+    assert relatorio['por_categoria']['Laboratório']['quantidade'] == 4
+    assert relatorio['por_categoria']['Laboratório']['valor'] == 350.00
+    assert relatorio['por_categoria']['Laboratório']['palavras'] == {'LABORATORIO': {'quantidade': 4, 'valor': 350.00}}
+    assert relatorio['categorias_sem_uso'] == ['Impostos']
+    assert relatorio['palavras_sem_uso'] == {'Laboratório': ['LAB '], 'Impostos': ['RECEITA FEDERAL', 'DARF']}
+    # Diversos ordenados por valor, não por quantidade
+    assert [item['razao_social'] for item in relatorio['sem_regra']] == ['OFICINA MECANICA', 'PADARIA DO BAIRRO']
+    assert relatorio['atualizado_em'] is not None
@@ -0,0 +1,284 @@
+import gzip
+import tempfile
+import zipfile
+
+import pandas as pd
+import pytest
+
+import extrator_ofx
+from cache_ofx import CacheOFX
+from extrator_ofx import (
+    ConteudoOFX, ExtratorOFX, detectar_codificacao, extrair_cnpj_cpf_coluna, formatar_datas,
+    listar_fontes_ofx, montar_lote_colunar, nome_fonte
+)
+from filtro_informativos import FiltroInformativos
+from indice_documentos import normalizar_documento
+
+
+def _conta(banco, conta):
+    return (
+        "<BANKACCTFROM>\n"
+        f"<BANKID>{banco}\n"
+        "<BRANCHID>1234\n"
+        f"<ACCTID>{conta}\n"
+        "<ACCTTYPE>CHECKING\n"
+        "</BANKACCTFROM>\n"
+    )
+
+
+def _transacao(fitid, valor, memo):
+    return (
+        "<STMTTRN>\n"
+        f"<TRNTYPE>{'CREDIT' if valor > 0 else 'DEBIT'}\n"
+        "<DTPOSTED>20250310100000[-03:EST]\n"
+        f"<TRNAMT>{valor:.2f}\n"
+        f"<FITID>{fitid}\n"
+        f"<MEMO>{memo}\n"
+        "</STMTTRN>\n"
+    )
+
+
+def _extrato(*contas):
+    """OFX com um <STMTRS> por conta: contas = [(banco, conta, [transações])]."""
+    partes = ["OFXHEADER:100\nDATA:OFXSGML\nVERSION:102\nENCODING:USASCII\nCHARSET:1252\n\n",
+              "<OFX>\n<BANKMSGSRSV1>\n"]
+    for banco, conta, transacoes in contas:
+        partes.append("<STMTTRNRS>\n<STMTRS>\n<CURDEF>BRL\n")
+        partes.append(_conta(banco, conta))
+        partes.append("<BANKTRANLIST>\n<DTSTART>20250301\n<DTEND>20250331\n")
+        partes.extend(transacoes)
+        partes.append("</BANKTRANLIST>\n</STMTRS>\n</STMTTRNRS>\n")
+    partes.append("</BANKMSGSRSV1>\n</OFX>\n")
+    return ''.join(partes).encode('latin1')
+
+
+def _transacoes(prefixo, quantidade):
+    return [
+        _transacao(f'{prefixo}{i}', (-1) ** i * (10 + i), f'PIX TRANSF FORNECEDOR {prefixo} {i} 12345678901')
+        for i in range(quantidade)
+    ]
+
+
+@pytest.fixture
+def extrator():
+    return ExtratorOFX(FiltroInformativos([]))
+
+
+def _ler(extrator, caminho, **opcoes):
+    return [
+        (t['FITID'], t['Valor'], t['Razao Social'], t['Banco'], t['Conta'])
+        for t in extrator.iter_transacoes(caminho, **opcoes)
+    ]
+
+
+def test_streaming_mmap_e_blocos_pequenos_sao_equivalentes(tmp_path, extrator):
+    dados = _extrato(('0341', '111', _transacoes('A', 40)), ('0237', '222', _transacoes('B', 25)))
+    caminho = tmp_path / 'extrato.ofx'
+    caminho.write_bytes(dados)
+    compactado = tmp_path / 'extrato.ofx.gz'
+    compactado.write_bytes(gzip.compress(dados))
+
+    referencia = _ler(extrator, str(caminho))
+    assert len(referencia) == 65
+
+    assert _ler(extrator, str(caminho), usar_mmap=True) == referencia
+    assert _ler(extrator, str(compactado)) == referencia
+    for tamanho_bloco in (1, 7, 64, 333):
+        assert _ler(extrator, str(caminho), tamanho_bloco=tamanho_bloco) == referencia
+        assert _ler(extrator, str(compactado), tamanho_bloco=tamanho_bloco) == referencia
+
+
+def test_cada_extrato_do_arquivo_leva_a_propria_conta(tmp_path, extrator):
+    caminho = tmp_path / 'extrato.ofx'
+    caminho.write_bytes(_extrato(('0341', '111', _transacoes('A', 2)), ('0237', '222', _transacoes('B', 3))))
+
+    for opcoes in ({}, {'usar_mmap': True}, {'tamanho_bloco': 5}):
+        contas = [(banco, conta) for _, _, _, banco, conta in _ler(extrator, str(caminho), **opcoes)]
+        assert contas == [('0341', '111')] * 2 + [('0237', '222')] * 3
+
+
+def test_bloco_sem_fechamento_e_pulado(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(extrator_ofx, 'TAMANHO_MAXIMO_TRANSACAO', 200)
+
+    quebrado = "<STMTTRN>\n<TRNTYPE>DEBIT\n<MEMO>" + 'X' * 1000 + "\n"
+    transacoes = _transacoes('A', 2) + [quebrado] + _transacoes('B', 2)
+    caminho = tmp_path / 'extrato.ofx'
+    caminho.write_bytes(_extrato(('0341', '111', transacoes)))
+
+    for opcoes in ({}, {'usar_mmap': True}, {'tamanho_bloco': 16}):
+        extrator = ExtratorOFX(FiltroInformativos([]))
+        fitids = [fitid for fitid, *_ in _ler(extrator, str(caminho), **opcoes)]
+        assert fitids == ['A0', 'A1', 'B0', 'B1']
+
+        # O aviso vai para as estatísticas, não para a saída do processo
+        avisos = extrator.obter_estatisticas_filtros()['avisos']
+        assert len(avisos) == 1 and 'sem </STMTTRN>' in avisos[0]
+        assert capsys.readouterr().out == ''
+
+
+@pytest.mark.parametrize('memo, documento', [
+    ('PIX RECEBIDO RICARDO DA COSTA SILVA 688.556.307-25', '68855630725'),
+    ('PAGAMENTO CLINICA 33.304.901/0001-10', '33304901000110'),
+    ('SISPAG PIX QR-CODE LOJA 14.380.201-21', None),
+])
+def test_documento_formatado_so_com_11_ou_14_digitos(extrator, memo, documento):
+    assert extrator.extrair_cnpj_cpf(memo) == documento
+    assert extrair_cnpj_cpf_coluna(pd.Series([memo])).iloc[0] == (documento or '')
+    if documento:
+        assert normalizar_documento(documento) == documento
+
+
+def test_acerto_do_cache_restaura_conta_e_filtros(tmp_path):
+    filtro = [{'nome': 'aplicacao', 'texto': 'APLICACAO AUTOMATICA'}]
+    transacoes = _transacoes('A', 3) + [_transacao('I0', -5, 'APLICACAO AUTOMATICA CDB')]
+    caminho = tmp_path / 'extrato.ofx'
+    caminho.write_bytes(_extrato(('0341', '111', transacoes)))
+    cache = CacheOFX(str(tmp_path / 'cache'))
+
+    estados = []
+    for _ in range(2):
+        extrator = ExtratorOFX(FiltroInformativos(filtro))
+        extrator.processar_arquivo(str(caminho), cache=cache)
+        stats = extrator.obter_estatisticas_filtros()
+        estados.append((extrator.conta_atual, stats['transacoes_filtradas'], stats['filtros_acionados']))
+
+    assert cache.obter_estatisticas()['entradas'] == 1
+    assert estados[0] == estados[1]
+    assert estados[1][0]['Conta'] == '111'
+    assert estados[1][2] == {'aplicacao': 1}
+
+
+def test_iter_transacoes_gera_sob_demanda_sem_acumular(tmp_path):
+    caminho = tmp_path / 'extrato.ofx'
+    caminho.write_bytes(_extrato(('0341', '111', _transacoes('A', 6))))
+
+    extrator = ExtratorOFX(FiltroInformativos([]))
+    gerador = extrator.iter_transacoes(str(caminho))
+    assert next(gerador)['FITID'] == 'A0'
+    assert extrator.transacoes == []
+
+    debitos = list(extrator.iter_transacoes(str(caminho), tipo='Debito'))
+    assert [t['FITID'] for t in debitos] == ['A1', 'A3', 'A5']
+    assert extrator.transacoes == []
+
+    lista = ExtratorOFX(FiltroInformativos([])).processar_arquivo(str(caminho))
+    assert lista == list(ExtratorOFX(FiltroInformativos([])).iter_transacoes(str(caminho)))
+
+
+def test_bloco_extrai_todas_as_tags_em_uma_passada(extrator):
+    bloco = (
+        "<STMTTRN>\n<TRNTYPE>DEBIT\n<DTPOSTED>20250310100000[-03:EST]\n<TRNAMT>-1234.56\n"
+        "<FITID>F123\n<CHECKNUM>000987\n"
+        "<MEMO>PAGAMENTO FORNECEDOR ALFA LTDA 33304901000110\n</STMTTRN>\n"
+    ).encode('latin1')
+
+    transacao = extrator._processar_bloco(bloco)
+
+    assert transacao['Data'] == '10/03/2025'
+    assert transacao['Valor'] == -1234.56
+    assert transacao['Valor_Centavos'] == -123456
+    assert transacao['Tipo'] == 'Debito'
+    assert transacao['Lancamentos'] == 'PAGAMENTO FORNECEDOR ALFA LTDA 33304901000110'
+    assert transacao['CNPJ/CPF'] == '33304901000110'
+    assert transacao['Razao Social'] == 'PAGAMENTO FORNECEDOR ALFA LTDA'
+    assert (transacao['FITID'], transacao['Num_Documento'], transacao['Tipo_OFX']) == ('F123', '000987', 'DEBIT')
+
+    assert extrator._processar_bloco(bloco.replace(b'<TRNAMT>-1234.56\n', b'')) is None
+
+
+def test_lote_colunar_tipado_e_equivalente_as_transacoes(tmp_path):
+    caminho = tmp_path / 'extrato.ofx'
+    caminho.write_bytes(_extrato(('0341', '111', _transacoes('A', 5))))
+    transacoes = ExtratorOFX(FiltroInformativos([])).processar_arquivo(str(caminho))
+
+    lote = ExtratorOFX(FiltroInformativos([])).processar_arquivo_colunar(str(caminho))
+
+    assert pd.api.types.is_datetime64_any_dtype(lote['Data'])
+    assert lote['Valor'].dtype == 'float64'
+    assert lote['Valor_Centavos'].dtype == 'int64'
+    for coluna in ('Tipo', 'Razao Social', 'CNPJ/CPF', 'Prefixo_Memo'):
+        assert isinstance(lote[coluna].dtype, pd.CategoricalDtype), coluna
+    assert montar_lote_colunar(lote) is lote
+
+    assert formatar_datas(lote['Data']).tolist() == [t['Data'] for t in transacoes]
+    for coluna in ('Razao Social', 'CNPJ/CPF', 'Tipo', 'FITID', 'Valor_Centavos'):
+        assert lote[coluna].astype(object).tolist() == [t[coluna] for t in transacoes], coluna
+
+
+@pytest.mark.parametrize('cabecalho, codificacao', [
+    (b'OFXHEADER:100\nDATA:OFXSGML\nENCODING:USASCII\nCHARSET:1252\n', 'cp1252'),
+    (b'OFXHEADER:100\nENCODING:UTF-8\nCHARSET:NONE\n', 'utf-8'),
+    (b'OFXHEADER:100\nENCODING:USASCII\nCHARSET:ISO-8859-1\n', 'latin1'),
+    (b'<?xml version="1.0" encoding="ISO-8859-1"?>\n<?OFX OFXHEADER="200"?>', 'iso8859-1'),
+    (b'\xef\xbb\xbf<?xml version="1.0"?>', 'utf-8'),
+    (b'<OFX>\n', None),
+])
+def test_codificacao_lida_do_cabecalho(cabecalho, codificacao):
+    assert detectar_codificacao(cabecalho) == codificacao
+
+
+def test_memo_decodificado_na_codificacao_declarada(tmp_path):
+    memo = 'PAGAMENTO JOÃO CONCEIÇÃO'
+    latin1 = tmp_path / 'latin1.ofx'
+    latin1.write_bytes(_extrato(('0341', '111', [_transacao('A0', -10, memo)])))
+    # Declarado como 1252, mas exportado em UTF-8 (comum em bancos)
+    utf8 = tmp_path / 'utf8.ofx'
+    utf8.write_bytes(latin1.read_bytes().replace(memo.encode('latin1'), memo.encode('utf-8')))
+
+    for caminho in (latin1, utf8):
+        for opcoes in ({}, {'usar_mmap': True}):
+            extrator = ExtratorOFX(FiltroInformativos([]))
+            transacoes = list(extrator.iter_transacoes(str(caminho), **opcoes))
+            assert transacoes[0]['Lancamentos'] == memo
+
+
+def test_mmap_gera_as_mesmas_transacoes_e_filtros_que_o_streaming(tmp_path):
+    filtro = [{'nome': 'aplicacao', 'texto': 'APLICACAO AUTOMATICA'}]
+    transacoes = _transacoes('A', 4) + [_transacao('I0', -5, 'APLICACAO AUTOMATICA CDB')] + _transacoes('B', 3)
+    caminho = tmp_path / 'extrato.ofx'
+    caminho.write_bytes(_extrato(('0341', '111', transacoes)))
+
+    resultados = []
+    for processar in ('processar_arquivo_streaming', 'processar_arquivo_mmap'):
+        extrator = ExtratorOFX(FiltroInformativos(filtro))
+        geradas = list(getattr(extrator, processar)(str(caminho)))
+        resultados.append((geradas, extrator.transacoes_filtradas, extrator.conta_atual))
+
+    assert len(resultados[0][0]) == 7
+    assert resultados[1] == resultados[0]
+
+    vazio = tmp_path / 'vazio.ofx'
+    vazio.write_bytes(b'')
+    assert list(ExtratorOFX(FiltroInformativos([])).processar_arquivo_mmap(str(vazio))) == []
+
+
+def test_zip_gz_e_bytes_em_memoria_sem_arquivo_temporario(tmp_path, monkeypatch, extrator):
+    extratos = {
+        f'extrato{i}.ofx': _extrato(('0341', '111', _transacoes(f'M{i}', 2)))
+        for i in (10, 2, 1)
+    }
+    arquivo_zip = tmp_path / 'extratos.zip'
+    with zipfile.ZipFile(arquivo_zip, 'w') as zip_aberto:
+        for nome, dados in extratos.items():
+            zip_aberto.writestr(nome, dados)
+        zip_aberto.writestr('leiame.txt', 'ignorado')
+        zip_aberto.writestr('extrato3.ofx.gz', gzip.compress(_extrato(('0341', '111', _transacoes('M3', 1)))))
+
+    def sem_temporario(*args, **kwargs):
+        raise AssertionError('extrato gravado em arquivo temporário')
+    for funcao in ('NamedTemporaryFile', 'TemporaryFile', 'mkstemp'):
+        monkeypatch.setattr(tempfile, funcao, sem_temporario)
+
+    fontes = listar_fontes_ofx(str(arquivo_zip))
+    assert [nome_fonte(fonte) for fonte in fontes] == [
+        'extratos.zip/extrato1.ofx', 'extratos.zip/extrato2.ofx',
+        'extratos.zip/extrato3.ofx.gz', 'extratos.zip/extrato10.ofx'
+    ]
+
+    referencia = _ler(extrator, str(arquivo_zip))
+    assert [fitid for fitid, *_ in referencia] == ['M10', 'M11', 'M20', 'M21', 'M30', 'M100', 'M101']
+    assert _ler(extrator, ConteudoOFX('upload.zip', arquivo_zip.read_bytes())) == referencia
+
+    dados = extratos['extrato1.ofx']
+    compactado = ConteudoOFX('upload.ofx.gz', gzip.compress(dados))
+    assert _ler(extrator, compactado) == _ler(extrator, ConteudoOFX('upload.ofx', dados)) == referencia[:2]
@@ -0,0 +1,70 @@
+import json
+
+import pandas as pd
+import pytest
+
+from filtro_informativos import FiltroInformativos, carregar_padroes_informativos, PADROES_INFORMATIVOS_PADRAO
+
+MEMOS = [
+    'SALDO ANTERIOR',
+    '  saldo total disponível dia ',
+    'SALDO DISPONIVEL',
+    'PIX RECEBIDO SALDO ANTERIOR JOAO',
+    'posicao  do dia 10/03',
+    'PAGAMENTO BOLETO FORNECEDOR',
+    None,
+    'TED SALDO FINAL DA CONTA',
+]
+
+
+def test_classificar_coluna_equivale_a_verificar_por_memo():
+    memos = pd.Series(MEMOS, index=range(10, 10 + len(MEMOS)))
+    vetorizado = FiltroInformativos()
+    por_memo = FiltroInformativos()
+
+    nomes = vetorizado.classificar_coluna(memos)
+
+    assert nomes.index.equals(memos.index)
+    assert nomes.tolist() == [por_memo.verificar(memo or '') for memo in MEMOS]
+    assert nomes.tolist()[:3] == ['saldo_anterior', 'saldo_total_disponivel_dia', 'saldo_sem_acento']
+    assert nomes.iloc[5] is None and nomes.iloc[6] is None
+    assert vetorizado.contagem == por_memo.contagem
+    assert vetorizado.contagem['saldo_anterior'] == 2
+
+
+def test_texto_e_literal_e_regex_e_expressao():
+    filtro = FiltroInformativos([
+        {'nome': 'ponto', 'texto': 'TARIFA 1.5'},
+        {'nome': 'numeros', 'regex': r'^AVISO \d+$'},
+    ])
+
+    assert filtro.verificar('tarifa 1.5 mensal') == 'ponto'
+    # '.' no texto não é curinga
+    assert filtro.verificar('TARIFA 105') is None
+    assert filtro.verificar('AVISO 123') == 'numeros'
+    assert filtro.verificar('AVISO 123 PAGO') is None
+    assert filtro.classificar_coluna(pd.Series(['TARIFA 105', 'AVISO 7'])).tolist() == [None, 'numeros']
+
+    with pytest.raises(ValueError):
+        FiltroInformativos([{'nome': 'vazio'}])
+
+
+def test_sem_padroes_nada_e_informativo():
+    filtro = FiltroInformativos([])
+
+    assert filtro.verificar('SALDO ANTERIOR') is None
+    assert filtro.classificar_coluna(pd.Series(['SALDO ANTERIOR'])).tolist() == [None]
+    assert not filtro.contagem
+
+
+def test_padroes_do_configuracoes_json(tmp_path):
+    arquivo = tmp_path / 'configuracoes.json'
+    assert carregar_padroes_informativos(str(arquivo)) == PADROES_INFORMATIVOS_PADRAO
+
+    padroes = [{'nome': 'resgate', 'texto': 'RESGATE AUTOMATICO'}]
+    arquivo.write_text(json.dumps({'filtros_informativos': {'padroes': padroes}}), encoding='utf-8')
+    filtro = FiltroInformativos.do_arquivo(str(arquivo))
+
+    assert filtro.verificar('RESGATE AUTOMATICO CDB') == 'resgate'
+    assert filtro.verificar('SALDO ANTERIOR') is None
+    assert filtro.assinatura() != FiltroInformativos().assinatura()
@@ -0,0 +1,130 @@
+import json
+
+from cli_extrator import PipelineImportacao
+from estado_incremental import EstadoIncremental
+from extrator_ofx import ExtratorOFX
+
+CABECALHO = """OFXHEADER:100
+DATA:OFXSGML
+VERSION:102
+ENCODING:USASCII
+CHARSET:1252
+
+<OFX>
+<BANKMSGSRSV1>
+<STMTTRNRS>
+<STMTRS>
+<CURDEF>BRL
+<BANKACCTFROM>
+<BANKID>0341
+<BRANCHID>1234
+<ACCTID>567890
+</BANKACCTFROM>
+<BANKTRANLIST>
+"""
+
+RODAPE = """</BANKTRANLIST>
+</STMTRS>
+</STMTTRNRS>
+</BANKMSGSRSV1>
+</OFX>
+"""
+
+
+def _transacao(dia, fitid, valor):
+    return (
+        "<STMTTRN>\n"
+        f"<TRNTYPE>{'CREDIT' if valor > 0 else 'DEBIT'}\n"
+        f"<DTPOSTED>202503{dia:02d}100000[-03:EST]\n"
+        f"<TRNAMT>{valor:.2f}\n"
+        f"<FITID>{fitid}\n"
+        f"<MEMO>PIX TRANSF FORNECEDOR {fitid}\n"
+        "</STMTTRN>\n"
+    )
+
+
+def _extrato(caminho, transacoes):
+    """Grava um extrato com as transações (dia, fitid, valor) na ordem dada."""
+    caminho.write_text(CABECALHO + ''.join(_transacao(*t) for t in transacoes) + RODAPE, encoding='ascii')
+    return str(caminho)
+
+
+DIA_1 = [(1, 'F1', -10.0), (1, 'F2', -20.0), (2, 'F3', 30.0)]
+DIA_2 = DIA_1 + [(2, 'F4', -40.0), (3, 'F5', 50.0)]
+
+
+def test_continuacao_le_so_o_fim_do_extrato(tmp_path):
+    estado = EstadoIncremental(str(tmp_path / 'estado.json'))
+
+    extrator = ExtratorOFX()
+    novas = extrator.processar_arquivo_incremental(_extrato(tmp_path / 'd1.ofx', DIA_1), estado)
+    assert [t['FITID'] for t in novas] == ['F1', 'F2', 'F3']
+    assert extrator.estatisticas_incremental['modo'] == 'completo'
+    estado.registrar(*extrator.marca_incremental)
+
+    extrator = ExtratorOFX()
+    novas = extrator.processar_arquivo_incremental(_extrato(tmp_path / 'd2.ofx', DIA_2), estado)
+    assert [t['FITID'] for t in novas] == ['F4', 'F5']
+    assert extrator.estatisticas_incremental['modo'] == 'continuacao'
+    assert extrator.estatisticas_incremental['bytes_pulados'] > 0
+    assert extrator.marca_incremental[0] == '0341:567890'
+
+
+def test_arquivo_de_outra_linhagem_e_lido_inteiro_com_filtro(tmp_path):
+    estado = EstadoIncremental(str(tmp_path / 'estado.json'))
+
+    extrator = ExtratorOFX()
+    extrator.processar_arquivo_incremental(_extrato(tmp_path / 'd1.ofx', DIA_1), estado)
+    estado.registrar(*extrator.marca_incremental)
+
+    # Extrato reemitido a partir do dia 2: o primeiro bloco mudou
+    reemitido = [(2, 'F3', 30.0), (2, 'F4', -40.0), (3, 'F5', 50.0)]
+    extrator = ExtratorOFX()
+    novas = extrator.processar_arquivo_incremental(_extrato(tmp_path / 'd2.ofx', reemitido), estado)
+
+    assert extrator.estatisticas_incremental['modo'] == 'completo'
+    assert extrator.estatisticas_incremental['ignoradas_pela_marca'] == 1
+    assert [t['FITID'] for t in novas] == ['F4', 'F5']
+
+
+def test_marca_nao_registrada_relê_o_extrato(tmp_path):
+    # Sem registrar (ex.: falha ao gravar), o próximo arquivo volta ao início
+    estado = EstadoIncremental(str(tmp_path / 'estado.json'))
+
+    ExtratorOFX().processar_arquivo_incremental(_extrato(tmp_path / 'd1.ofx', DIA_1), estado)
+    novas = ExtratorOFX().processar_arquivo_incremental(_extrato(tmp_path / 'd2.ofx', DIA_2), estado)
+
+    assert len(novas) == 5
+
+
+def test_pipeline_grava_a_marca_depois_de_salvar(tmp_path):
+    dados = tmp_path / 'dados'
+    pipeline = PipelineImportacao(str(dados), usar_cache=False)
+
+    resumo = pipeline.importar([_extrato(tmp_path / 'd1.ofx', DIA_1)])
+    assert (resumo['novas_despesas'], resumo['novas_receitas']) == (2, 1)
+
+    with open(dados / 'estado_incremental.json', encoding='utf-8') as f:
+        marca = json.load(f)['contas']['0341:567890']
+    assert marca['ultimo_fitid'] == 'F3'
+
+    resumo = PipelineImportacao(str(dados), usar_cache=False).importar([_extrato(tmp_path / 'd2.ofx', DIA_2)])
+    assert (resumo['novas_despesas'], resumo['novas_receitas']) == (1, 1)
+    assert len(pipeline.gerenciador.carregar_despesas()) == 3
+
+
+def test_marca_mais_antiga_nao_substitui_a_mais_nova(tmp_path):
+    # Dois trabalhadores leem d1 e d2 a partir da mesma marca e d1 registra por último
+    estado = EstadoIncremental(str(tmp_path / 'estado.json'))
+
+    leitura_d1, leitura_d2 = ExtratorOFX(), ExtratorOFX()
+    leitura_d1.processar_arquivo_incremental(_extrato(tmp_path / 'd1.ofx', DIA_1), estado)
+    leitura_d2.processar_arquivo_incremental(_extrato(tmp_path / 'd2.ofx', DIA_2), estado)
+
+    assert estado.registrar(*leitura_d2.marca_incremental)
+    assert not estado.registrar(*leitura_d1.marca_incremental)
+    assert estado.obter('0341:567890')['ultimo_fitid'] == 'F5'
+
+    extrator = ExtratorOFX()
+    assert extrator.processar_arquivo_incremental(str(tmp_path / 'd2.ofx'), estado) == []
+    assert extrator.estatisticas_incremental['modo'] == 'continuacao'
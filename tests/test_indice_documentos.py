@@ -0,0 +1,42 @@
+import json
+
+import pandas as pd
+
+from categorizador_despesas import CategorizadorDespesas
+from gerenciador_persistencia_unificado import GerenciadorPersistenciaUnificado
+from memo_categorizacao import MemoCategorizacao
+
+CNPJ = '33304901000110'
+
+
+def _lote(razao_social, valor=-100.0):
+    return pd.DataFrame([{
+        'Data': pd.Timestamp('2025-03-10'), 'Valor': valor, 'Razao Social': razao_social,
+        'CNPJ/CPF': CNPJ, 'FITID': f'F{abs(valor):.0f}'
+    }])
+
+
+def test_categoria_corrigida_a_mao_vale_para_o_documento(tmp_path):
+    regras = tmp_path / 'regras_categorizacao.json'
+    regras.write_text(json.dumps({'despesas': {'Aluguel': ['IMOBILIARIA'], 'Manutenção': ['REFORMAS']}}),
+                      encoding='utf-8')
+    gerenciador = GerenciadorPersistenciaUnificado(str(tmp_path))
+
+    def categorizar(lote):
+        return CategorizadorDespesas(arquivo_regras=str(regras), memo=MemoCategorizacao()).processar_debitos(lote)
+
+    despesas = categorizar(_lote('IMOBILIARIA CENTRAL'))
+    assert despesas['Descricao'].tolist() == ['Aluguel']
+    gerenciador.salvar_despesas(despesas, 'a.ofx')
+
+    resultado = gerenciador.atualizar_despesa_por_dados('10/03/2025', 'IMOBILIARIA CENTRAL', 100.0, 'Manutenção')
+    assert resultado['sucesso']
+    assert gerenciador.carregar_despesas()['Descricao'].tolist() == ['Manutenção']
+
+    # Mesmo CNPJ com outra grafia: a confirmação manual vale antes das regras
+    despesas = categorizar(_lote('IMOBILIARIA CENTRAL LTDA', -200.0))
+    assert despesas['Descricao'].tolist() == ['Manutenção']
+
+    # E a gravação seguinte (casada pela regra de Aluguel) não desfaz a confirmação
+    gerenciador.salvar_despesas(despesas.assign(Descricao='Aluguel'), 'b.ofx')
+    assert categorizar(_lote('IMOBILIARIA CENTRAL', -300.0))['Descricao'].tolist() == ['Manutenção']
@@ -0,0 +1,43 @@
+import extrator_ofx
+from extrator_ofx import ConteudoOFX
+from ingestao_lote import ProcessadorLoteOFX
+from tests.test_extrator_ofx import _extrato, _transacao, _transacoes
+
+
+def test_threads_e_processos_dao_o_mesmo_lote():
+    fontes = [
+        ConteudoOFX(f'extrato_Parte{i}.ofx', _extrato(('0341', '111', _transacoes(f'P{i}', 5))))
+        for i in (10, 2, 1)
+    ]
+
+    em_threads = ProcessadorLoteOFX(usar_processos=False).processar(fontes)
+    em_processos = ProcessadorLoteOFX(usar_processos=True).processar(fontes)
+
+    assert em_threads['sucesso'] and em_processos['sucesso']
+    assert em_threads['transacoes'] == em_processos['transacoes']
+    assert [t['Arquivo_Origem'] for t in em_threads['transacoes'][::5]] == [
+        'extrato_Parte1.ofx', 'extrato_Parte2.ofx', 'extrato_Parte10.ofx'
+    ]
+
+
+def test_totais_somados_em_centavos():
+    # 0,10 + 0,20 somados em float daria 0,30000000000000004
+    fontes = [ConteudoOFX('extrato.ofx', _extrato(('0341', '111', [
+        _transacao('C1', 0.10, 'PIX RECEBIDO A'), _transacao('C2', 0.20, 'PIX RECEBIDO B'),
+        _transacao('D1', -0.10, 'PIX ENVIADO C'), _transacao('D2', -0.20, 'PIX ENVIADO D'),
+    ])))]
+
+    estatisticas = ProcessadorLoteOFX(usar_processos=False).processar(fontes)['por_arquivo'][0]
+    assert (estatisticas['total_creditos'], estatisticas['total_debitos']) == (0.3, -0.3)
+
+
+def test_avisos_da_leitura_vem_no_resultado(monkeypatch, capsys):
+    monkeypatch.setattr(extrator_ofx, 'TAMANHO_MAXIMO_TRANSACAO', 200)
+    quebrado = "<STMTTRN>\n<TRNTYPE>DEBIT\n<MEMO>" + 'X' * 1000 + "\n"
+    fontes = [ConteudoOFX('extrato.ofx', _extrato(('0341', '111', _transacoes('A', 2) + [quebrado])))]
+
+    lote = ProcessadorLoteOFX(usar_processos=False).processar(fontes)
+
+    assert lote['total_transacoes'] == 2
+    assert [aviso['arquivo'] for aviso in lote['avisos']] == ['extrato.ofx']
+    assert capsys.readouterr().out == ''
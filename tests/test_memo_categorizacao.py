@@ -0,0 +1,23 @@
+import json
+
+from categorizador_despesas import CategorizadorDespesas
+from memo_categorizacao import obter_memo
+
+
+def _regras(caminho, palavra):
+    caminho.write_text(json.dumps({'despesas': {'Aluguel': [palavra]}}), encoding='utf-8')
+    return str(caminho)
+
+
+def test_memo_separado_por_arquivo_de_regras(tmp_path):
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'b').mkdir()
+    regras_a = _regras(tmp_path / 'a' / 'regras_categorizacao.json', 'IMOBILIARIA')
+    regras_b = _regras(tmp_path / 'b' / 'regras_categorizacao.json', 'CONDOMINIO')
+
+    categorizador_a = CategorizadorDespesas(arquivo_regras=regras_a)
+    categorizador_b = CategorizadorDespesas(arquivo_regras=regras_b)
+
+    assert categorizador_a.memo is obter_memo('despesas', arquivo_regras=regras_a)
+    assert categorizador_a.memo is not categorizador_b.memo
+    assert obter_memo('despesas', arquivo_regras=regras_a) is not obter_memo('despesas')
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('watchdog')
+
+import monitor_inbox
+from monitor_inbox import MonitorInbox, RegistroConsumidos
+from tests.test_extrator_ofx import _extrato, _transacoes
+
+
+@pytest.fixture
+def monitor(tmp_path):
+    return MonitorInbox(str(tmp_path / 'inbox'), str(tmp_path / 'dados'), tempo_estabilizacao=0.2)
+
+
+def _arquivo(tmp_path, nome, dados):
+    caminho = tmp_path / nome
+    caminho.write_bytes(dados)
+    return str(caminho)
+
+
+def test_registro_de_consumidos_sobrevive_a_reinicializacao(tmp_path):
+    arquivo = str(tmp_path / 'consumidos.json')
+    RegistroConsumidos(arquivo).registrar('abc', {'arquivo': 'extrato.ofx'})
+
+    registro = RegistroConsumidos(arquivo)
+    assert registro.contem('abc')
+    assert not registro.contem('def')
+    assert registro.total() == 1
+
+
+def test_mesmo_conteudo_so_e_ingerido_uma_vez(tmp_path, monitor):
+    dados = _extrato(('0341', '111', _transacoes('A', 4)))
+    original = _arquivo(tmp_path, 'extrato.ofx', dados)
+    copia = _arquivo(tmp_path, 'extrato (1).ofx', dados)
+
+    primeiro = monitor.processar_arquivo(original)
+    assert primeiro['sucesso'] and not primeiro.get('ignorado')
+    assert primeiro['novas_despesas'] + primeiro['novas_receitas'] == 4
+
+    assert monitor.processar_arquivo(copia)['ignorado']
+
+    # Um novo monitor sobre os mesmos dados lê o registro do disco
+    reiniciado = MonitorInbox(str(tmp_path / 'inbox'), str(tmp_path / 'dados'))
+    assert reiniciado.processar_arquivo(original)['ignorado']
+    assert reiniciado.estatisticas['arquivos_ignorados'] == 1
+
+
+def test_agendar_ignora_ocultos_e_extensoes_desconhecidas(monitor):
+    for nome in ('.extrato.ofx', 'notas.txt', 'extrato.ofx.part'):
+        monitor.agendar(f'/inbox/{nome}')
+    assert monitor._pendentes == {}
+
+    for nome in ('extrato.OFX', 'extratos.zip', 'extrato.ofx.gz'):
+        monitor.agendar(f'/inbox/{nome}')
+    assert len(monitor._pendentes) == 3
+
+
+def test_arquivo_so_entra_na_fila_depois_de_estabilizar(tmp_path, monkeypatch, monitor):
+    monkeypatch.setattr(monitor_inbox, 'INTERVALO_VERIFICACAO', 0.02)
+    caminho = _arquivo(tmp_path, 'extrato.ofx', b'<OFX>')
+
+    agendador = threading.Thread(target=monitor._agendador, daemon=True)
+    agendador.start()
+    try:
+        monitor.agendar(caminho)
+        # Ainda sendo "copiado": cada mudança reinicia a espera
+        for parte in range(5):
+            time.sleep(0.08)
+            with open(caminho, 'ab') as arquivo:
+                arquivo.write(b'<STMTTRN>' * (parte + 1))
+            assert monitor.fila.empty()
+
+        assert monitor.fila.get(timeout=2) == caminho
+
+        # Já na fila: novos eventos do mesmo arquivo não o agendam de novo
+        monitor.agendar(caminho)
+        time.sleep(0.4)
+        assert monitor.fila.empty()
+    finally:
+        monitor._parar.set()
+        agendador.join()
@@ -0,0 +1,127 @@
+import os
+
+import pandas as pd
+
+from gerenciador_persistencia_unificado import CABECALHO_INDICE_FITID, GerenciadorPersistenciaUnificado
+
+
+def _despesas(*fitids):
+    return pd.DataFrame([
+        {
+            'Data': '05/01/2025', 'Descricao': 'Diversos', 'Valor': 10.0 + i,
+            'Razao_Social_Original': f'FORNECEDOR {i}', 'Data_Processamento': '',
+            'FITID': fitid
+        }
+        for i, fitid in enumerate(fitids)
+    ])
+
+
+def test_fitid_repetido_nao_e_salvo_de_novo(tmp_path):
+    gerenciador = GerenciadorPersistenciaUnificado(str(tmp_path))
+
+    assert gerenciador.salvar_despesas(_despesas('F1', 'F2'), 'a.ofx')['novas_despesas'] == 2
+    assert gerenciador.salvar_despesas(_despesas('F1', 'F2', 'F3'), 'a.ofx')['novas_despesas'] == 1
+
+    # Outra instância lê o índice gravado
+    outro = GerenciadorPersistenciaUnificado(str(tmp_path))
+    assert outro.salvar_despesas(_despesas('F3'), 'a.ofx')['novas_despesas'] == 0
+    assert len(outro.carregar_despesas()) == 3
+
+
+def test_fitid_repetido_dentro_do_lote(tmp_path):
+    gerenciador = GerenciadorPersistenciaUnificado(str(tmp_path))
+    assert gerenciador.salvar_despesas(_despesas('F1', 'F1'), 'a.ofx')['novas_despesas'] == 1
+
+
+def test_indice_reconstruido_quando_a_tabela_e_apagada(tmp_path):
+    gerenciador = GerenciadorPersistenciaUnificado(str(tmp_path))
+    gerenciador.salvar_despesas(_despesas('F1'), 'a.ofx')
+
+    # Como em limpar_dados_sistema.py: a tabela some, o índice fica
+    os.remove(gerenciador.arquivo_despesas)
+
+    novo = GerenciadorPersistenciaUnificado(str(tmp_path))
+    assert novo.salvar_despesas(_despesas('F1'), 'a.ofx')['novas_despesas'] == 1
+    assert len(novo.carregar_despesas()) == 1
+
+
+def test_indice_em_memoria_percebe_tabela_alterada_por_fora(tmp_path):
+    gerenciador = GerenciadorPersistenciaUnificado(str(tmp_path))
+    gerenciador.salvar_despesas(_despesas('F1'), 'a.ofx')
+
+    # Tabela restaurada vazia enquanto a instância continua viva
+    pd.DataFrame(columns=['Data', 'FITID']).to_csv(gerenciador.arquivo_despesas, index=False)
+
+    assert gerenciador.salvar_despesas(_despesas('F1'), 'a.ofx')['novas_despesas'] == 1
+
+
+def test_indice_sem_cabecalho_e_reconstruido(tmp_path):
+    gerenciador = GerenciadorPersistenciaUnificado(str(tmp_path))
+    gerenciador.salvar_despesas(_despesas('F1'), 'a.ofx')
+
+    # Índice no formato antigo (só FITIDs) e com um FITID que a tabela não tem
+    with open(gerenciador.arquivos_indice_fitid['despesas'], 'w', encoding='utf-8') as f:
+        f.write('F1\nF2\n')
+
+    novo = GerenciadorPersistenciaUnificado(str(tmp_path))
+    assert novo.salvar_despesas(_despesas('F2'), 'a.ofx')['novas_despesas'] == 1
+
+
+def _com_conta(despesas, *contas):
+    """Atribui (banco, agência, conta) às despesas, na ordem."""
+    despesas[['Banco', 'Agencia', 'Conta']] = list(contas)
+    return despesas
+
+
+def test_cada_conta_grava_na_sua_particao(tmp_path):
+    gerenciador = GerenciadorPersistenciaUnificado(str(tmp_path))
+    despesas = _com_conta(_despesas('F1', 'F2', 'F3'),
+                          ('0341', '1234', '111'), ('0237', '1', '222'), ('0341', '1234', '111'))
+
+    assert gerenciador.salvar_despesas(despesas, 'a.ofx')['novas_despesas'] == 3
+    assert gerenciador.listar_particoes() == ['0237-1-222', '0341-1234-111']
+    assert gerenciador._carregar_tabela('despesas').empty
+
+    particao = gerenciador.particao_da_conta('0341-1234-111')
+    assert sorted(particao.carregar_despesas()['FITID']) == ['F1', 'F3']
+
+    # Outra instância agrega as partições (e as tabelas antigas da raiz)
+    outro = GerenciadorPersistenciaUnificado(str(tmp_path))
+    outro.salvar_despesas(_despesas('F9'), 'antigo.ofx')
+    carregadas = outro.carregar_despesas()
+    assert sorted(carregadas['FITID']) == ['F1', 'F2', 'F3', 'F9']
+    assert carregadas.set_index('FITID').loc['F2', 'Conta'] == '222'
+    assert carregadas.set_index('FITID').loc['F9', 'Conta'] == ''
+
+    # FITID já gravado na partição não volta
+    repetida = _com_conta(_despesas('F2'), ('0237', '1', '222'))
+    assert outro.salvar_despesas(repetida, 'b.ofx')['novas_despesas'] == 0
+
+
+def test_sobrescrever_esvazia_contas_fora_do_lote(tmp_path):
+    gerenciador = GerenciadorPersistenciaUnificado(str(tmp_path))
+    gerenciador.salvar_despesas(_com_conta(_despesas('F1', 'F2'), ('0341', '1', '111'), ('0237', '1', '222')), 'a.ofx')
+
+    novas = _com_conta(_despesas('F3'), ('0341', '1', '111'))
+    assert gerenciador.salvar_despesas(novas, 'b.ofx', modo='sobrescrever')['sucesso']
+
+    assert list(gerenciador.carregar_despesas()['FITID']) == ['F3']
+
+
+def _indice_sincronizado(gerenciador, tabela):
+    with open(gerenciador.arquivos_indice_fitid[tabela], encoding='utf-8') as f:
+        return f.readline() == CABECALHO_INDICE_FITID.format(*gerenciador._assinatura_tabela(tabela))
+
+
+def test_edicao_da_tabela_reassina_o_indice(tmp_path, monkeypatch):
+    gerenciador = GerenciadorPersistenciaUnificado(str(tmp_path))
+    gerenciador.salvar_despesas(_despesas('F1', 'F2'), 'a.ofx')
+
+    resultado = gerenciador.atualizar_despesa_por_dados('05/01/2025', 'FORNECEDOR 1', 11.0, 'Aluguel')
+    assert resultado['sucesso']
+    assert _indice_sincronizado(gerenciador, 'despesas')
+
+    # Outra instância usa o índice gravado, sem reler a coluna FITID da tabela
+    novo = GerenciadorPersistenciaUnificado(str(tmp_path))
+    monkeypatch.setattr(pd, 'read_csv', None)
+    assert novo._carregar_indice_fitid('despesas') == {'F1', 'F2'}
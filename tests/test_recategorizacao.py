@@ -0,0 +1,37 @@
+import json
+
+import pandas as pd
+
+from gerenciador_persistencia_unificado import CABECALHO_INDICE_FITID, GerenciadorPersistenciaUnificado
+from recategorizacao import RecategorizadorHistorico
+from regras_categorizacao import NOME_ARQUIVO_REGRAS
+
+
+def _despesa(fitid, razao_social, valor):
+    return {
+        'Data': '05/01/2025', 'Descricao': 'Diversos', 'Valor': valor,
+        'Razao_Social_Original': razao_social, 'Data_Processamento': '', 'FITID': fitid
+    }
+
+
+def test_categoria_corrigida_a_mao_sobrevive_a_recategorizacao(tmp_path):
+    (tmp_path / NOME_ARQUIVO_REGRAS).write_text(
+        json.dumps({'despesas': {'Aluguel': ['IMOBILIARIA']}}), encoding='utf-8'
+    )
+    gerenciador = GerenciadorPersistenciaUnificado(str(tmp_path))
+    gerenciador.salvar_despesas(pd.DataFrame([
+        _despesa('F1', 'IMOBILIARIA CENTRO', -1500.0),
+        _despesa('F2', 'IMOBILIARIA NORTE', -900.0),
+    ]), 'a.ofx')
+
+    assert gerenciador.atualizar_despesa_por_dados('05/01/2025', 'IMOBILIARIA CENTRO', -1500.0, 'Manutenção')['sucesso']
+
+    resultado = RecategorizadorHistorico(str(tmp_path)).recategorizar(tabelas=('despesas',))
+    assert resultado['despesas']['transicoes'] == {'Diversos → Aluguel': 1}
+
+    categorias = gerenciador.carregar_despesas().set_index('FITID')['Descricao']
+    assert categorias.to_dict() == {'F1': 'Manutenção', 'F2': 'Aluguel'}
+
+    # A reescrita não muda os FITIDs: o índice só é reassinado
+    with open(gerenciador.arquivos_indice_fitid['despesas'], encoding='utf-8') as f:
+        assert f.readline() == CABECALHO_INDICE_FITID.format(*gerenciador._assinatura_tabela('despesas'))
@@ -0,0 +1,31 @@
+import json
+
+from categorizador_receitas_simples import CategorizadorReceitasSimples
+from memo_categorizacao import MemoCategorizacao
+
+
+def _gravar_regras(caminho, fonte_pagamento):
+    caminho.write_text(json.dumps({'receitas': {'fonte_pagamento': fonte_pagamento}}), encoding='utf-8')
+    return str(caminho)
+
+
+def _categorizar(arquivo_regras, razao_social):
+    categorizador = CategorizadorReceitasSimples(arquivo_regras, memo=MemoCategorizacao())
+    return categorizador._aplicar_regras_categorizacao(razao_social)
+
+
+def test_fonte_pagamento_vem_do_arquivo_de_regras(tmp_path):
+    arquivo = tmp_path / 'regras_categorizacao.json'
+
+    _gravar_regras(arquivo, {'REDE': 'Cartão de Crédito'})
+    resultado = _categorizar(str(arquivo), 'REDECARD SA')
+    assert (resultado['fonte_pagamento'], resultado['tipo_preenchimento']) == ('Cartão de Crédito', 'cartao_credito')
+    assert _categorizar(str(arquivo), 'UNIMED RIO')['tipo_preenchimento'] == 'automatico'
+
+    # Editar o JSON muda o resultado sem mexer no código
+    _gravar_regras(arquivo, {'UNIMED': 'Convênio', 'CIELO': 'Cartão de Crédito'})
+    resultado = _categorizar(str(arquivo), 'UNIMED RIO')
+    assert resultado['fonte_pagamento'] == 'Convênio'
+    assert resultado['paciente'] == '' and resultado['requer_preenchimento_manual']
+    assert _categorizar(str(arquivo), 'CIELO PAGAMENTOS')['tipo_preenchimento'] == 'cartao_credito'
+    assert _categorizar(str(arquivo), 'REDECARD SA')['tipo_preenchimento'] == 'automatico'